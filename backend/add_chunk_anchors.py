@@ -0,0 +1,48 @@
+from app.db import engine
+from sqlmodel import Session, select
+
+from app.models.rag import Chunk, ChunkAnchor
+from app.services.cross_reference_resolver import extract_section_anchors
+
+BACKFILL_BATCH = 500
+
+
+def run_migration():
+    print("Starting chunk anchors migration...")
+    try:
+        ChunkAnchor.__table__.create(engine, checkfirst=True)
+        print("Ensured table chunkanchor")
+    except Exception as e:
+        print(f"Skipping chunkanchor table creation: {e}")
+
+    # Index section headings of chunks ingested before the anchor index existed
+    # (chunks that already have anchors are skipped, so re-running is safe)
+    added = 0
+    last_id = 0
+    try:
+        with Session(engine) as session:
+            while True:
+                chunks = session.exec(
+                    select(Chunk)
+                    .where(Chunk.id > last_id)
+                    .where(~select(ChunkAnchor.id).where(ChunkAnchor.chunk_id == Chunk.id).exists())
+                    .order_by(Chunk.id)
+                    .limit(BACKFILL_BATCH)
+                ).all()
+                if not chunks:
+                    break
+                for chunk in chunks:
+                    anchors = extract_section_anchors(chunk.content)
+                    session.add_all(
+                        ChunkAnchor(chunk_id=chunk.id, document_id=chunk.document_id, **anchor) for anchor in anchors
+                    )
+                    added += len(anchors)
+                last_id = chunks[-1].id
+                session.commit()
+        print(f"Added {added} section anchor(s)")
+    except Exception as e:
+        print(f"Skipping chunk anchors backfill: {e}")
+    print("Chunk anchors migration complete.")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,51 @@
+from app.db import engine
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.models.rag import Chunk, ChunkFact
+from app.services.fact_extractor import extract_facts
+
+BACKFILL_BATCH = 500
+
+
+def run_migration():
+    print("Starting chunk facts migration...")
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE chunk ADD COLUMN fact_count INTEGER;"))
+        print("Added column fact_count (INTEGER) to chunk table")
+    except Exception as e:
+        print(f"Skipping column fact_count addition on chunk: {e}")
+
+    try:
+        ChunkFact.__table__.create(engine, checkfirst=True)
+        print("Ensured table chunkfact")
+    except Exception as e:
+        print(f"Skipping chunkfact table creation: {e}")
+
+    # Extract facts for chunks indexed before the fact index existed
+    filled = 0
+    try:
+        with Session(engine) as session:
+            while True:
+                chunks = session.exec(
+                    select(Chunk).where(Chunk.fact_count == None).order_by(Chunk.id).limit(BACKFILL_BATCH)
+                ).all()
+                if not chunks:
+                    break
+                for chunk in chunks:
+                    facts = extract_facts(chunk.content)
+                    chunk.fact_count = len(facts)
+                    session.add(chunk)
+                    session.add_all(
+                        ChunkFact(chunk_id=chunk.id, document_id=chunk.document_id, **fact) for fact in facts
+                    )
+                session.commit()
+                filled += len(chunks)
+        print(f"Extracted facts for {filled} chunk(s)")
+    except Exception as e:
+        print(f"Skipping chunk facts backfill: {e}")
+    print("Chunk facts migration complete.")
+
+if __name__ == "__main__":
+    run_migration()
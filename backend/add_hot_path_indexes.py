@@ -0,0 +1,39 @@
+from app.db import engine
+from sqlalchemy import text
+
+# Composite indexes backing the hottest lookups (see check_query_plans.py).
+# Mirrors the Index(...) declarations on the SQLModel tables so databases
+# created before they existed get the same indexes.
+HOT_PATH_INDEXES = [
+    ("ix_chunk_document_id_chunk_index", "chunk", "(document_id, chunk_index)"),
+    ("ix_document_project_active_processed", "document", "(project_id, is_active, processed)"),
+    ("ix_document_document_hash", "document", "(document_hash)"),
+    ("ix_message_session_id_created_at", "message", "(session_id, created_at)"),
+    ("ix_chatsession_project_id_created_at", "chatsession", "(project_id, created_at)"),
+]
+
+
+def run_migration():
+    print("Starting hot-path index migration...")
+
+    for index_name, table, columns in HOT_PATH_INDEXES:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} {columns};"))
+            print(f"Ensured index {index_name} on {table} {columns}")
+        except Exception as e:
+            print(f"Skipping index {index_name} on {table}: {e}")
+
+    # Refresh planner statistics so the new indexes are picked up immediately
+    if engine.dialect.name == "postgresql":
+        for table in sorted({t for _, t, _ in HOT_PATH_INDEXES}):
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(f"ANALYZE {table};"))
+            except Exception as e:
+                print(f"Skipping ANALYZE on {table}: {e}")
+
+    print("Hot-path index migration complete.")
+
+if __name__ == "__main__":
+    run_migration()
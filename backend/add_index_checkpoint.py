@@ -0,0 +1,15 @@
+from app.db import engine
+from sqlalchemy import text
+
+def run_migration():
+    print("Starting index checkpoint migration...")
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE document ADD COLUMN index_checkpoint JSON;"))
+        print("Added column index_checkpoint (JSON) to document table")
+    except Exception as e:
+        print(f"Skipping column index_checkpoint addition on document: {e}")
+    print("Index checkpoint migration complete.")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,48 @@
+from app.db import engine
+from sqlalchemy import text
+
+from app.services.pgvector_store import INDEXED_DIMENSIONS
+
+# Columns and indexes behind the "pgvector" vector_store_backend (see PgVectorStore).
+# `embedding` is an untyped vector so 768-dim (Google) and 384-dim (MiniLM) projects
+# can share the table; each width gets its own partial HNSW index.
+STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS vector;",
+    "ALTER TABLE chunk ADD COLUMN IF NOT EXISTS embedding vector;",
+    "ALTER TABLE chunk ADD COLUMN IF NOT EXISTS embedding_dim INTEGER;",
+    "CREATE INDEX IF NOT EXISTS ix_chunk_doc_id_version ON chunk (doc_id_version);",
+] + [
+    f"CREATE INDEX IF NOT EXISTS ix_chunk_embedding_hnsw_{dim} ON chunk "
+    f"USING hnsw ((embedding::vector({dim})) vector_cosine_ops) WHERE embedding_dim = {dim};"
+    for dim in INDEXED_DIMENSIONS
+]
+
+
+def run_migration():
+    # The RAGConfig column must exist on every database (SQLite included), otherwise
+    # every select(RAGConfig) fails; only the DDL below is Postgres-specific.
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE ragconfig ADD COLUMN vector_store_backend VARCHAR DEFAULT 'faiss';"))
+        print("Added column vector_store_backend (VARCHAR) to ragconfig table")
+    except Exception as e:
+        print(f"Skipping column vector_store_backend addition on ragconfig: {e}")
+
+    if engine.dialect.name != "postgresql":
+        print("pgvector migration requires PostgreSQL, skipping.")
+        return
+
+    print("Starting pgvector migration...")
+
+    for stmt in STATEMENTS:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(stmt))
+            print(f"Executed: {stmt}")
+        except Exception as e:
+            print(f"Skipping statement {stmt}: {e}")
+
+    print("pgvector migration complete.")
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,48 @@
+from app.db import engine
+from sqlalchemy import text
+
+# Columns and indexes behind the "postgres_fts" lexical_backend (see PostgresFTSManager).
+# content_tsv is a generated column, so Postgres keeps it in sync on every chunk write.
+STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+    "ALTER TABLE chunk ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED;",
+    "CREATE INDEX IF NOT EXISTS ix_chunk_content_tsv ON chunk USING gin (content_tsv);",
+    "CREATE INDEX IF NOT EXISTS ix_chunk_content_trgm ON chunk USING gin (content gin_trgm_ops);",
+]
+
+
+def run_migration():
+    # The RAGConfig column must exist on every database (SQLite included), otherwise
+    # every select(RAGConfig) fails; only the DDL below is Postgres-specific.
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE ragconfig ADD COLUMN lexical_backend VARCHAR DEFAULT 'bm25';"))
+        print("Added column lexical_backend (VARCHAR) to ragconfig table")
+    except Exception as e:
+        print(f"Skipping column lexical_backend addition on ragconfig: {e}")
+
+    if engine.dialect.name != "postgresql":
+        print("Postgres full-text migration requires PostgreSQL, skipping.")
+        return
+
+    print("Starting Postgres full-text migration...")
+
+    for stmt in STATEMENTS:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(stmt))
+            print(f"Executed: {stmt}")
+        except Exception as e:
+            print(f"Skipping statement {stmt}: {e}")
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE chunk;"))
+    except Exception as e:
+        print(f"Skipping ANALYZE on chunk: {e}")
+
+    print("Postgres full-text migration complete.")
+
+if __name__ == "__main__":
+    run_migration()
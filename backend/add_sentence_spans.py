@@ -0,0 +1,45 @@
+import json
+
+from app.db import engine
+from sqlalchemy import text
+
+from app.services.contextual_compressor import sentence_spans
+
+BACKFILL_BATCH = 500
+
+
+def run_migration():
+    print("Starting sentence spans migration...")
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE chunk ADD COLUMN sentence_spans JSON;"))
+        print("Added column sentence_spans (JSON) to chunk table")
+    except Exception as e:
+        print(f"Skipping column sentence_spans addition on chunk: {e}")
+
+    # Backfill existing chunks so their compression also skips segmentation
+    filled = 0
+    try:
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(
+                    text("SELECT id, content FROM chunk WHERE sentence_spans IS NULL ORDER BY id LIMIT :n"),
+                    {"n": BACKFILL_BATCH},
+                ).all()
+                if not rows:
+                    break
+                conn.execute(
+                    text("UPDATE chunk SET sentence_spans = CAST(:spans AS JSON) WHERE id = :id"),
+                    [
+                        {"id": row.id, "spans": json.dumps([list(s) for s in sentence_spans(row.content or "")])}
+                        for row in rows
+                    ],
+                )
+                filled += len(rows)
+        print(f"Backfilled sentence spans for {filled} chunk(s)")
+    except Exception as e:
+        print(f"Skipping sentence spans backfill: {e}")
+    print("Sentence spans migration complete.")
+
+if __name__ == "__main__":
+    run_migration()
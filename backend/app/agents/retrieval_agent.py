@@ -5,13 +5,13 @@ from sqlmodel import select
 from langgraph.graph import StateGraph, END
 
 # Import existing services & helpers
-from app.services.bm25_service import bm25_manager
 from app.services.rrf_service import hybrid_search_merge
 from app.services.context_pruner import context_pruner
 from app.services.reranker_service import reranker_service
 from app.services.confidence_gate import get_confidence_gate
 from app.services.query_understanding import get_query_understanding
 from app.rag.engine import RAGEngine
+from app.services.document_bitmap import document_bitmaps
 
 class AgentState(TypedDict, total=False):
     query: str
@@ -97,17 +97,26 @@ def execute_retrieval(state: AgentState, config: dict = None) -> dict:
         )
     embeddings = rag_engine._get_embeddings(rag_config)
     
-    # Load vector store from disk
+    # Load vector store (pgvector table or FAISS files on disk)
     import os
     from langchain_community.vectorstores import FAISS
-    if os.path.exists("faiss_index"):
+    if rag_engine._uses_pgvector(rag_config):
+        from app.services.pgvector_store import PgVectorStore
+        vector_store = PgVectorStore(session, embeddings)
+    elif os.path.exists("faiss_index"):
         vector_store = FAISS.load_local(
             "faiss_index", embeddings, allow_dangerous_deserialization=True
         )
     else:
         vector_store = None
         
-    inactive = rag_engine._inactive_doc_ids(project_id)
+    bitmap = document_bitmaps.get(session, project_id)
+    inactive = bitmap.inactive
+    # PgVectorStore filters active documents in SQL; FAISS takes the bitmap predicate
+    if rag_engine._uses_pgvector(rag_config):
+        search_filter = {"project_id": project_id}
+    else:
+        search_filter = rag_engine._faiss_filter(project_id, bitmap)
     
     candidate_k = max(rag_config.top_k * 5, 20)
     semantic_results = []
@@ -118,27 +127,21 @@ def execute_retrieval(state: AgentState, config: dict = None) -> dict:
         if strategy == "semantic":
             # Semantic search only
             results = vector_store.similarity_search_with_score(
-                query, k=candidate_k, filter={"project_id": project_id}
+                query, k=candidate_k, filter=search_filter
             )
-            for doc, score in results:
-                did = doc.metadata.get("doc_id")
-                if did is not None and int(did) in inactive:
-                    continue
-                semantic_results.append((doc, score))
+            semantic_results.extend(results)
                 
         elif strategy == "hybrid":
             # Semantic + BM25 hybrid search
             results = vector_store.similarity_search_with_score(
-                query, k=candidate_k, filter={"project_id": project_id}
+                query, k=candidate_k, filter=search_filter
             )
-            for doc, score in results:
-                did = doc.metadata.get("doc_id")
-                if did is not None and int(did) in inactive:
-                    continue
-                semantic_results.append((doc, score))
+            semantic_results.extend(results)
                 
-            if bm25_manager.index_exists(str(project_id)):
-                bm25_results = bm25_manager.search(str(project_id), query, top_k=candidate_k)
+            bm25_results = rag_engine._lexical_search(
+                rag_config, project_id, query, candidate_k, inactive=inactive
+            )
+            if bm25_results:
                 used_hybrid = True
                 
         elif strategy == "decomposed":
@@ -148,23 +151,21 @@ def execute_retrieval(state: AgentState, config: dict = None) -> dict:
             for sub_q in sub_queries:
                 # Semantic subquery search
                 sub_res = vector_store.similarity_search_with_score(
-                    sub_q, k=candidate_k // 2, filter={"project_id": project_id}
+                    sub_q, k=candidate_k // 2, filter=search_filter
                 )
                 for doc, score in sub_res:
-                    did = doc.metadata.get("doc_id")
-                    if did is not None and int(did) in inactive:
-                        continue
                     if doc.page_content not in seen_semantic:
                         seen_semantic.add(doc.page_content)
                         semantic_results.append((doc, score))
                 
-                # BM25 subquery search (if hybrid configured or default)
-                if bm25_manager.index_exists(str(project_id)):
-                    sub_bm25 = bm25_manager.search(str(project_id), sub_q, top_k=candidate_k // 2)
-                    for text, score in sub_bm25:
-                        if text not in seen_bm25:
-                            seen_bm25.add(text)
-                            bm25_results.append((text, score))
+                # Lexical subquery search (if hybrid configured or default)
+                sub_bm25 = rag_engine._lexical_search(
+                    rag_config, project_id, sub_q, candidate_k // 2, inactive=inactive
+                )
+                for text, score in sub_bm25:
+                    if text not in seen_bm25:
+                        seen_bm25.add(text)
+                        bm25_results.append((text, score))
             used_hybrid = True
 
     # RRF Hybrid Merge
@@ -1,14 +1,20 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 import os
 from dotenv import load_dotenv
 
 # Import models so SQLModel metadata registers all tables before create_all
 from app.models.user import User  # noqa: F401
-from app.models.rag import Project, RAGConfig, Document, Chunk  # noqa: F401
+from app.models.rag import Project, RAGConfig, Document, Chunk, ChunkFact, ChunkAnchor  # noqa: F401
 from app.models.chat import ChatSession, Message  # noqa: F401
 from app.models.usage import TokenUsage  # noqa: F401
 from app.models.query_log import QueryLog  # noqa: F401
+from app.models.job import IngestionJob  # noqa: F401
 
 load_dotenv()
 
@@ -19,11 +25,91 @@ if not DATABASE_URL:
     # Default to a local sqlite for development since no PG is running
     DATABASE_URL = "sqlite:///./ragops.db"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}, echo=True)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Statement logging is opt-in: echoing every SQL statement is far too noisy
+# (and slow) for production traffic.
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds
+# Opt-in asyncpg engine for the chat/query read path (Postgres only)
+DB_ASYNC_ENABLED = os.getenv("DB_ASYNC_ENABLED", "false").lower() == "true"
+
+
+def _engine_kwargs() -> dict:
+    """Pool settings shared by the sync and async engines; SQLite keeps its default pool."""
+    if IS_SQLITE:
+        return {"echo": DB_ECHO}
+    return {
+        "echo": DB_ECHO,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+    }
+
+
+def _async_database_url(url: str) -> Optional[str]:
+    """
+    Translate the sync DATABASE_URL into an asyncpg URL.
+    Returns None for backends without an async driver in requirements (SQLite).
+    """
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql+psycopg2://"):
+        url = "postgresql://" + url[len("postgresql+psycopg2://"):]
+    if not url.startswith("postgresql://"):
+        return None
+    url = "postgresql+asyncpg://" + url[len("postgresql://"):]
+    # asyncpg does not understand libpq's sslmode parameter
+    return url.replace("sslmode=", "ssl=")
+
+
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **_engine_kwargs(),
+)
+
+ASYNC_DATABASE_URL = _async_database_url(DATABASE_URL) if DB_ASYNC_ENABLED else None
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_kwargs()) if ASYNC_DATABASE_URL else None
+async_session_factory = (
+    sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False) if async_engine else None
+)
+
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+
+@asynccontextmanager
+async def async_read_session() -> AsyncIterator[Optional[AsyncSession]]:
+    """
+    AsyncSession for a block of read-only queries when DB_ASYNC_ENABLED and an
+    async driver is configured, otherwise None (see `exec_all`). Opened around
+    the reads only, not injected per request: auth and writes stay on the
+    request's sync Session.
+    """
+    if async_session_factory is None:
+        yield None
+        return
+    async with async_session_factory() as session:
+        yield session
+
+
+async def exec_all(statement, session: Session, async_session: Optional[AsyncSession] = None) -> list:
+    """
+    Run a read-only select on the async session if given, else on the sync
+    Session in the threadpool, so async handlers never block the event loop.
+    """
+    if async_session is not None:
+        return list((await async_session.exec(statement)).all())
+    return await run_in_threadpool(lambda: list(session.exec(statement).all()))
+
+
 def init_db():
     SQLModel.metadata.create_all(engine)
@@ -20,6 +20,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
     allow_origin_regex="https://.*\.vercel\.app",
 )
 
@@ -35,6 +36,20 @@ def on_startup():
     register_tools()
     from app.services.session_context_cache import SessionContextCache
     app.state.session_cache = SessionContextCache()
+    # In-process ingest worker for single-process setups (INGEST_EMBEDDED_WORKER)
+    from app.rag.ingest_jobs import start_embedded_worker
+    app.state.ingest_worker = start_embedded_worker()
+    # Parse pool processes load the Docling converter once, in the background
+    from app.services.document_parsing import warm_parse_pool
+    warm_parse_pool()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    worker = getattr(app.state, "ingest_worker", None)
+    if worker:
+        worker.stop(timeout=5)
+    from app.services.document_parsing import shutdown_parse_pool
+    shutdown_parse_pool()
 
 app.include_router(auth_routes.router)
 app.include_router(project_routes.router)
@@ -1,9 +1,13 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, Index
 
 class ChatSession(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_chatsession_project_id_created_at", "project_id", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int 
     project_id: Optional[int] = None # Added for Project-based RAG
@@ -14,6 +18,10 @@ class ChatSession(SQLModel, table=True):
     messages: List["Message"] = Relationship(back_populates="session")
 
 class Message(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_message_session_id_created_at", "session_id", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     session_id: Optional[int] = Field(default=None, foreign_key="chatsession.id")
     role: str # user or assistant
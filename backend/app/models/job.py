@@ -0,0 +1,40 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import Column, JSON, Index
+
+
+class IngestionJob(SQLModel, table=True):
+    """Durable ingestion work item (document processing / re-chunking), claimed by ingest workers."""
+
+    __table_args__ = (
+        # Worker claim scan: next runnable job by priority
+        Index("ix_ingestionjob_status_priority_run_after", "status", "priority", "run_after"),
+        # Per-project running count for the concurrency cap
+        Index("ix_ingestionjob_project_id_status", "project_id", "status"),
+        # Latest job for a document (status endpoint)
+        Index("ix_ingestionjob_document_id_created_at", "document_id", "created_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_type: str = Field(max_length=64)  # process_document, rechunk_document, reindex_project, compact_index, delete_project
+    document_id: Optional[int] = Field(default=None, foreign_key="document.id")
+    project_id: Optional[int] = Field(default=None, foreign_key="project.id")
+    payload: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+
+    status: str = Field(default="queued", max_length=32)  # queued, running, succeeded, failed
+    priority: int = Field(default=0)  # higher runs first
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=3)
+    run_after: datetime = Field(default_factory=datetime.utcnow)
+
+    locked_by: Optional[str] = Field(default=None, max_length=128)
+    heartbeat_at: Optional[datetime] = None
+
+    progress: float = Field(default=0.0)  # 0.0 - 1.0
+    progress_message: Optional[str] = None
+    error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
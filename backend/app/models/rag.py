@@ -1,7 +1,7 @@
 from sqlmodel import SQLModel, Field
 from typing import Optional, List
 from datetime import datetime
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, Index
 
 class Project(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -53,10 +53,20 @@ class RAGConfig(SQLModel, table=True):
     semantic_weight: float = Field(default=0.6)  # 0.6 semantic, 0.4 BM25
     use_multi_query: bool = Field(default=True)
 
+    # Vector store: "faiss" (local faiss_index/ files) or "pgvector" (chunk.embedding column)
+    vector_store_backend: str = Field(default="faiss")
+    # Lexical retrieval: "bm25" (pickled per-project index) or "postgres_fts" (chunk.content_tsv)
+    lexical_backend: str = Field(default="bm25")
+
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class Document(SQLModel, table=True):
+    __table_args__ = (
+        # Retrieval/BM25 rebuilds filter on project + active + processed
+        Index("ix_document_project_active_processed", "project_id", "is_active", "processed"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: Optional[int] = Field(default=None, foreign_key="project.id")
     filename: str
@@ -77,12 +87,19 @@ class Document(SQLModel, table=True):
 
     chunking_strategy: Optional[str] = Field(default=None)
     chunking_metrics: Optional[dict] = Field(default=None, sa_column=Column(JSON))
-    document_hash: Optional[str] = Field(default=None, max_length=64)
+    document_hash: Optional[str] = Field(default=None, max_length=64, index=True)
     parsing_method: Optional[str] = Field(default=None, max_length=64)
     redaction_log: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     parsed_chunks_json: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    # Streaming index progress for very large documents: strategy, next chunk index, settings
+    index_checkpoint: Optional[dict] = Field(default=None, sa_column=Column(JSON))
 
 class Chunk(SQLModel, table=True):
+    __table_args__ = (
+        # Also serves plain document_id lookups (leading column)
+        Index("ix_chunk_document_id_chunk_index", "document_id", "chunk_index"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     document_id: Optional[int] = Field(default=None, foreign_key="document.id")
     content: str
@@ -90,5 +107,40 @@ class Chunk(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     content_hash: Optional[str] = Field(default=None, max_length=64)
     chunk_version: int = Field(default=1)
-    doc_id_version: Optional[str] = Field(default=None, max_length=256)
+    doc_id_version: Optional[str] = Field(default=None, max_length=256, index=True)
     chunk_index: Optional[int] = Field(default=None)
+    # [[start, end], ...] sentence offsets into content, computed at ingest for query-time compression
+    sentence_spans: Optional[list] = Field(default=None, sa_column=Column(JSON))
+    # Number of ChunkFact rows extracted at ingest (None = not extracted yet)
+    fact_count: Optional[int] = Field(default=None)
+    # embedding (pgvector) / embedding_dim are added by add_pgvector_store.py and only
+    # touched through raw SQL in PgVectorStore, so SQLite and FAISS-only setups are unaffected.
+    # content_tsv (generated tsvector) is added by add_postgres_fts.py for PostgresFTSManager.
+
+class ChunkFact(SQLModel, table=True):
+    """Typed fact extracted from a chunk at ingest (see FactExtractor)."""
+    __table_args__ = (
+        Index("ix_chunkfact_document_id_fact_type", "document_id", "fact_type"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    chunk_id: int = Field(foreign_key="chunk.id", index=True)
+    document_id: int = Field(foreign_key="document.id")
+    signal_index: int  # index into ConflictDetector.FACTUAL_SIGNALS
+    fact_type: str = Field(max_length=32)
+    value: str = Field(max_length=128)  # normalised as ConflictDetector compares it
+    numeric_value: Optional[float] = None
+    unit: Optional[str] = Field(default=None, max_length=16)
+
+class ChunkAnchor(SQLModel, table=True):
+    """Numbered section a chunk opens, for direct cross-reference lookup (see CrossReferenceResolver)."""
+    __table_args__ = (
+        Index("ix_chunkanchor_document_id_number", "document_id", "number"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    chunk_id: int = Field(foreign_key="chunk.id", index=True)
+    document_id: int = Field(foreign_key="document.id")
+    kind: str = Field(max_length=16)  # section, appendix, clause, article, ...
+    number: str = Field(max_length=32)  # normalised, e.g. "4.2", "3a"
+    heading: Optional[str] = Field(default=None, max_length=256)
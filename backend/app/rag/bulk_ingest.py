@@ -0,0 +1,226 @@
+import os
+import asyncio
+import zipfile
+import logging
+from typing import List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, select
+
+from app.models.rag import Document
+from app.services.document_parsing import (
+    SpooledUpload,
+    get_parse_pool,
+    prepare_document,
+    remove_spooled,
+    spool_stream,
+)
+from app.services.document_bitmap import document_bitmaps
+from app.services.job_queue import JOB_PROCESS_DOCUMENT, PRIORITY_LOW, job_queue
+
+logger = logging.getLogger(__name__)
+
+BULK_UPLOAD_MAX_FILES = int(os.getenv("BULK_UPLOAD_MAX_FILES", "5000"))
+# Cap on the total uncompressed size of zip members in one bulk upload
+BULK_UPLOAD_MAX_EXTRACTED_BYTES = int(os.getenv("BULK_UPLOAD_MAX_EXTRACTED_MB", "2048")) * 1024 * 1024
+# Documents inserted + jobs enqueued per commit
+BULK_INSERT_BATCH = int(os.getenv("BULK_INSERT_BATCH", "200"))
+
+
+def _is_zip(item: SpooledUpload) -> bool:
+    return item.filename.lower().endswith(".zip")
+
+
+def _zip_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    members = []
+    for info in archive.infolist():
+        name = info.filename
+        base = os.path.basename(name)
+        if info.is_dir() or not base or base.startswith(".") or name.startswith("__MACOSX/"):
+            continue
+        members.append(info)
+    return members
+
+
+def check_upload_limits(items: List[SpooledUpload]) -> None:
+    """
+    Reject an upload from the zip central directories alone, before anything is
+    extracted: too many files, or members whose declared sizes add up past
+    BULK_UPLOAD_MAX_EXTRACTED_BYTES (zip bombs). Reads never go past a member's
+    declared size, so the declared total bounds what extraction writes.
+    """
+    file_count = 0
+    extracted_bytes = 0
+    for item in items:
+        if _is_zip(item):
+            with zipfile.ZipFile(item.path) as archive:
+                members = _zip_members(archive)
+            file_count += len(members)
+            extracted_bytes += sum(info.file_size for info in members)
+        else:
+            file_count += 1
+        if file_count > BULK_UPLOAD_MAX_FILES:
+            raise ValueError(f"Too many files in one bulk upload ({file_count} > {BULK_UPLOAD_MAX_FILES})")
+        if extracted_bytes > BULK_UPLOAD_MAX_EXTRACTED_BYTES:
+            raise ValueError(
+                f"Bulk upload expands to more than {BULK_UPLOAD_MAX_EXTRACTED_BYTES // (1024 * 1024)} MB"
+            )
+
+
+def expand_uploads(items: List[SpooledUpload]) -> List[SpooledUpload]:
+    """
+    Flatten uploads, replacing .zip archives with their file members (each
+    streamed to its own temp file). Archives are removed once expanded.
+    Limits are checked up front; this does blocking I/O, so async callers run
+    it in the threadpool.
+    """
+    check_upload_limits(items)
+    expanded: List[SpooledUpload] = []
+    for item in items:
+        if not _is_zip(item):
+            expanded.append(item)
+            continue
+        try:
+            with zipfile.ZipFile(item.path) as archive:
+                for info in _zip_members(archive):
+                    with archive.open(info) as member:
+                        expanded.append(spool_stream(member, info.filename))
+        except Exception:
+            remove_spooled(*expanded)
+            raise
+        finally:
+            remove_spooled(item)
+    return expanded
+
+
+async def bulk_ingest(
+    session: Session,
+    project_id: int,
+    uploaded_by: Optional[int],
+    items: List[SpooledUpload],
+) -> dict:
+    """
+    Ingest many files at once:
+      1. hash everything and drop duplicates (within the batch and against the
+         project's active documents) with a single IN query,
+      2. in batches of BULK_INSERT_BATCH: parse + scan the files in the shared
+         process pool, insert their Documents and enqueue processing jobs, so
+         only one batch of parsed text is held in memory at a time.
+
+    Takes ownership of the spooled temp files and removes them when done.
+    Returns per-file results plus totals.
+    """
+    files = await run_in_threadpool(expand_uploads, items)
+    try:
+        return await _ingest_spooled(session, project_id, uploaded_by, files)
+    finally:
+        remove_spooled(*files)
+
+
+async def _ingest_spooled(
+    session: Session,
+    project_id: int,
+    uploaded_by: Optional[int],
+    files: List[SpooledUpload],
+) -> dict:
+    if len(files) > BULK_UPLOAD_MAX_FILES:
+        raise ValueError(f"Too many files in one bulk upload ({len(files)} > {BULK_UPLOAD_MAX_FILES})")
+
+    hashes = [f.sha256 for f in files]
+    existing = dict(
+        session.exec(
+            select(Document.document_hash, Document.id)
+            .where(Document.project_id == project_id)
+            .where(Document.is_active == True)
+            .where(Document.document_hash.in_(set(hashes)))
+        ).all()
+    ) if hashes else {}
+
+    results: List[dict] = [{"filename": f.filename} for f in files]
+    to_parse: List[int] = []
+    seen_in_batch: dict[str, int] = {}
+    for i, doc_hash in enumerate(hashes):
+        if doc_hash in existing:
+            results[i].update({"status": "duplicate", "doc_id": existing[doc_hash]})
+        elif doc_hash in seen_in_batch:
+            results[i].update({"status": "duplicate", "duplicate_of": files[seen_in_batch[doc_hash]].filename})
+        else:
+            seen_in_batch[doc_hash] = i
+            to_parse.append(i)
+
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+    for start in range(0, len(to_parse), BULK_INSERT_BATCH):
+        batch = to_parse[start:start + BULK_INSERT_BATCH]
+        parsed_list = await asyncio.gather(
+            *[loop.run_in_executor(pool, prepare_document, files[i].filename, files[i].path) for i in batch],
+            return_exceptions=True,
+        )
+        _insert_batch(session, project_id, uploaded_by, files, hashes, results, batch, parsed_list)
+
+    totals = {"files": len(files)}
+    for r in results:
+        totals[r["status"]] = totals.get(r["status"], 0) + 1
+    return {"totals": totals, "results": results}
+
+
+def _insert_batch(
+    session: Session,
+    project_id: int,
+    uploaded_by: Optional[int],
+    files: List[SpooledUpload],
+    hashes: List[str],
+    results: List[dict],
+    batch: List[int],
+    parsed_list: list,
+) -> None:
+    """Insert one parsed batch of Documents and enqueue their jobs in a single commit."""
+    pending: List[Tuple[int, Document]] = []
+    for i, parsed in zip(batch, parsed_list):
+        filename = files[i].filename
+        if isinstance(parsed, BaseException):
+            logger.error(f"Bulk ingest: parsing {filename} failed: {parsed}")
+            results[i].update({"status": "failed", "error": str(parsed)})
+            continue
+
+        quarantined = parsed["quarantine"]
+        doc = Document(
+            filename=filename,
+            content=parsed["content"],
+            processed=False,
+            project_id=project_id,
+            file_size_bytes=files[i].size,
+            page_count=parsed["page_count"],
+            processing_status="quarantined" if quarantined else "pending",
+            uploaded_by=uploaded_by,
+            document_hash=hashes[i],
+            parsing_method=parsed["parsing_method"],
+            redaction_log=parsed["redaction_log"],
+            parsed_chunks_json=parsed["parsed_chunks_json"],
+        )
+        results[i].update({
+            "status": "quarantined" if quarantined else "queued",
+            "action_taken": parsed["action_taken"],
+            "total_findings": parsed["scan_result"]["total_findings"],
+        })
+        pending.append((i, doc))
+
+    if not pending:
+        return
+    session.add_all([doc for _, doc in pending])
+    session.flush()
+    queued = [(i, doc) for i, doc in pending if results[i]["status"] == "queued"]
+    jobs = job_queue.enqueue_batch(
+        session,
+        JOB_PROCESS_DOCUMENT,
+        [(doc.id, project_id) for _, doc in queued],
+        priority=PRIORITY_LOW,
+        commit=False,
+    )
+    for (i, doc), job in zip(queued, jobs):
+        results[i]["job_id"] = job.id
+    for i, doc in pending:
+        results[i]["doc_id"] = doc.id
+    # Commit expires the Documents, so their parsed text is not kept past this batch
+    session.commit()
+    document_bitmaps.invalidate(project_id)
@@ -7,7 +7,7 @@ import time
 from datetime import datetime
 from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from langchain.agents import AgentExecutor, create_tool_calling_agent
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -15,10 +15,12 @@ from langchain_core.tools import StructuredTool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_groq import ChatGroq
 from pydantic import BaseModel, Field
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.auth.deps import get_current_admin, get_current_user
-from app.db import get_session
+from app.db import async_read_session, exec_all, get_session
 from app.models.chat import ChatSession, Message
 from app.models.query_log import QueryLog
 from app.models.rag import RAGConfig
@@ -119,6 +121,85 @@ def _context_from_intermediate_steps(result: dict) -> Tuple[List[str], List[dict
     return chunks, sources, stats
 
 
+async def _load_chat_history(
+    session_db: Session,
+    async_session_db: Optional[AsyncSession],
+    session_id: int,
+    exclude_message_id: Optional[int],
+    history_limit: int,
+) -> list:
+    """Last `history_limit` messages of the session as LangChain messages, oldest first."""
+    past_messages = await exec_all(
+        select(Message)
+        .where(Message.session_id == session_id)
+        .where(Message.id != exclude_message_id)
+        .order_by(Message.created_at.desc())
+        .limit(history_limit),
+        session_db,
+        async_session_db,
+    )
+    past_messages = sorted(past_messages, key=lambda m: m.created_at)
+
+    chat_history = []
+    for msg in past_messages:
+        if msg.role == "user":
+            chat_history.append(HumanMessage(content=msg.content))
+        elif msg.role == "assistant":
+            chat_history.append(AIMessage(content=msg.content))
+    return chat_history
+
+
+async def _load_related_context(
+    session_db: Session,
+    async_session_db: Optional[AsyncSession],
+    user_id: int,
+    project_id: Optional[int],
+    session_id: int,
+    context_session_ids: List[int],
+    project_context_limit: int,
+) -> Tuple[list, str]:
+    """Returns (context_sessions, prompt snippet) built from related chats."""
+    other_context_str = ""
+    context_sessions = []
+    if context_session_ids:
+        context_sessions = await exec_all(
+            select(ChatSession)
+            .where(ChatSession.id.in_(context_session_ids))
+            .where(ChatSession.user_id == user_id)
+            .where(ChatSession.id != session_id),
+            session_db,
+            async_session_db,
+        )
+    elif project_context_limit > 0:
+        context_sessions = await exec_all(
+            select(ChatSession)
+            .where(ChatSession.project_id == project_id)
+            .where(ChatSession.id != session_id)
+            .order_by(ChatSession.created_at.desc())
+            .limit(project_context_limit),
+            session_db,
+            async_session_db,
+        )
+
+    if context_sessions:
+        other_context_str = "\n\n### RELATED PROJECT CHATS (CONTEXT):\n"
+        for osess in context_sessions:
+            osess_msgs = await exec_all(
+                select(Message)
+                .where(Message.session_id == osess.id)
+                .order_by(Message.created_at.desc())
+                .limit(3),
+                session_db,
+                async_session_db,
+            )
+            osess_msgs = sorted(osess_msgs, key=lambda m: m.created_at)
+            if osess_msgs:
+                other_context_str += f"- Chat '{osess.title}':\n"
+                for m in osess_msgs:
+                    other_context_str += f"  {m.role.upper()}: {m.content[:200]}...\n"
+    return context_sessions, other_context_str
+
+
 @router.post("/message")
 async def post_message(
     req: ChatMessageRequest,
@@ -316,54 +397,19 @@ async def post_message(
         model_name = routed_model
         model_provider = routed_provider
 
-    past_messages = session_db.exec(
-        select(Message)
-        .where(Message.session_id == session_id)
-        .where(Message.id != user_msg.id)
-        .order_by(Message.created_at.desc())
-        .limit(history_limit)
-    ).all()
-    past_messages = sorted(past_messages, key=lambda m: m.created_at)
-
-    chat_history = []
-    for msg in past_messages:
-        if msg.role == "user":
-            chat_history.append(HumanMessage(content=msg.content))
-        elif msg.role == "assistant":
-            chat_history.append(AIMessage(content=msg.content))
-
-    other_context_str = ""
-    context_sessions = []
-    if context_session_ids:
-        context_sessions = session_db.exec(
-            select(ChatSession)
-            .where(ChatSession.id.in_(context_session_ids))
-            .where(ChatSession.user_id == current_user.id)
-            .where(ChatSession.id != session_id)
-        ).all()
-    elif project_context_limit > 0:
-        context_sessions = session_db.exec(
-            select(ChatSession)
-            .where(ChatSession.project_id == project_id)
-            .where(ChatSession.id != session_id)
-            .order_by(ChatSession.created_at.desc())
-            .limit(project_context_limit)
-        ).all()
-
-    if context_sessions:
-        other_context_str = "\n\n### RELATED PROJECT CHATS (CONTEXT):\n"
-        for osess in context_sessions:
-            osess_msgs = session_db.exec(
-                select(Message)
-                .where(Message.session_id == osess.id)
-                .order_by(Message.created_at.desc())
-                .limit(3)
-            ).all()
-            osess_msgs = sorted(osess_msgs, key=lambda m: m.created_at)
-            if osess_msgs:
-                other_context_str += f"- Chat '{osess.title}':\n"
-                for m in osess_msgs:
-                    other_context_str += f"  {m.role.upper()}: {m.content[:200]}...\n"
+    async with async_read_session() as async_session_db:
+        chat_history = await _load_chat_history(
+            session_db, async_session_db, session_id, user_msg.id, history_limit
+        )
+        context_sessions, other_context_str = await _load_related_context(
+            session_db,
+            async_session_db,
+            current_user.id,
+            project_id,
+            session_id,
+            context_session_ids,
+            project_context_limit,
+        )
 
     mcp_context = MCPContext(
         user_id=current_user.id,
@@ -591,7 +637,10 @@ async def post_message(
                 document_metadata.append(meta)
                 
             confidence_gate = get_confidence_gate(threshold=0.65)
-            retry_gate_result = confidence_gate.evaluate(chunk_dicts, reranker_scores, document_metadata)
+            retry_gate_result = confidence_gate.evaluate(
+                chunk_dicts, reranker_scores, document_metadata,
+                token_cache=getattr(search_results, "agreement_token_cache", None)
+            )
             
             if retry_gate_result.passed:
                 search_results = retry_search_results
@@ -773,7 +822,7 @@ async def post_message(
     
     daily_volume_est = 100
     savings_est = cache_manager.estimate_cache_savings(
-        system_prompt_tokens=int(len(system_prompt) / 4),
+        system_prompt_tokens=cache_manager.count_tokens(system_prompt, model_name),
         queries_per_day=daily_volume_est,
         provider=model_provider
     )
@@ -1191,8 +1240,7 @@ def get_sessions(
     query = select(ChatSession).where(ChatSession.user_id == current_user.id)
     if project_id:
         query = query.where(ChatSession.project_id == project_id)
-    sessions = session_db.exec(query.order_by(ChatSession.created_at.desc())).all()
-    return sessions
+    return session_db.exec(query.order_by(ChatSession.created_at.desc())).all()
 
 
 @router.delete("/sessions/{session_id}")
@@ -1212,13 +1260,40 @@ def delete_session(
 @router.get("/history/{session_id}")
 def get_history(
     session_id: int,
+    response: Response,
+    limit: Optional[int] = None,
+    before: Optional[int] = None,
     session_db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    Messages of a session, oldest first. Without `limit` the whole history is returned.
+    With `limit`, returns the newest `limit` messages older than message id `before`
+    (keyset on created_at, id); X-Next-Cursor carries the id to pass as `before`
+    for the next older page.
+    """
     chat_session = session_db.get(ChatSession, session_id)
     if not chat_session or chat_session.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Session not found")
-    messages = session_db.exec(
-        select(Message).where(Message.session_id == session_id).order_by(Message.created_at)
+
+    if limit is None:
+        return session_db.exec(
+            select(Message).where(Message.session_id == session_id).order_by(Message.created_at)
+        ).all()
+
+    limit = max(1, min(limit, 200))
+    statement = select(Message).where(Message.session_id == session_id)
+    if before is not None:
+        cursor_msg = session_db.get(Message, before)
+        if not cursor_msg or cursor_msg.session_id != session_id:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        statement = statement.where(
+            tuple_(Message.created_at, Message.id) < tuple_(cursor_msg.created_at, cursor_msg.id)
+        )
+    rows = session_db.exec(
+        statement.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
     ).all()
-    return messages
+    page = rows[:limit]
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = str(page[-1].id)
+    return list(reversed(page))
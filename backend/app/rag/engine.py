@@ -1,7 +1,8 @@
 import os
 import shutil
 import logging
-from typing import List, Tuple, Optional, Any
+from contextlib import nullcontext
+from typing import List, Tuple, Optional, Any, Callable
 from datetime import datetime
 from sqlmodel import Session, select
 from langchain_community.vectorstores import FAISS
@@ -11,10 +12,26 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document as LCDocument
 
 from app.models.rag import RAGConfig, Document, Chunk, Project
-from app.services.bm25_service import bm25_manager
+from app.services.bm25_service import BM25_COMPACT_TOMBSTONE_RATIO, bm25_manager
 from app.services.rrf_service import hybrid_search_merge
 from app.services.context_pruner import context_pruner
 from app.services.reranker_service import reranker_service
+from app.services.pgvector_store import PgVectorStore
+from app.services.postgres_fts_service import postgres_fts
+from app.services.document_bitmap import DocumentBitmap, document_bitmaps
+from app.services.faiss_lock import faiss_write_lock
+from app.services.project_cascade import project_cascade
+from app.services.cost_control import get_cost_manager
+from app.services.session_context_cache import session_cache
+from app.services.stream_indexer import (
+    STREAM_CHECKPOINT_BATCHES,
+    STREAM_EMBED_BATCH,
+    STREAM_INDEX_MIN_CHARS,
+    STREAM_MAX_PENDING_BATCHES,
+    STREAM_SECTION_CHARS,
+    batched,
+    prefetch,
+)
 
 VECTOR_STORE_PATH = "faiss_index"
 
@@ -35,6 +52,8 @@ class SearchResultList(list):
         # New attributes for upgrades
         self.query_analysis = None
         self.confidence_gate_result = None
+        # Chunk text -> token set, reused when the gate runs again on retry results
+        self.agreement_token_cache = None
         self.pipeline_trace = None
 
 
@@ -72,14 +91,76 @@ class RAGEngine:
             raise ValueError(f"No active RAG configuration found for Project ID {project_id}")
         return config
 
-    def _inactive_doc_ids(self, project_id: int) -> set[int]:
+    def _uses_pgvector(self, config: Optional[RAGConfig]) -> bool:
+        """True when the project's embeddings live in Postgres (pgvector) rather than FAISS files."""
+        return (
+            config is not None
+            and config.vector_store_backend == "pgvector"
+            and PgVectorStore.is_available(self.session)
+        )
+
+    def _uses_postgres_fts(self, config: Optional[RAGConfig]) -> bool:
+        """True when lexical retrieval is served by Postgres full-text search instead of BM25 pickles."""
+        return (
+            config is not None
+            and config.lexical_backend == "postgres_fts"
+            and postgres_fts.is_available(self.session)
+        )
+
+    def _has_vector_index(self, project_id: int) -> bool:
+        try:
+            config = self.get_active_config(project_id)
+        except ValueError:
+            config = None
+        return self._uses_pgvector(config) or os.path.exists(VECTOR_STORE_PATH)
+
+    def _pgvector_project_ids(self) -> List[int]:
         rows = self.session.exec(
-            select(Document.id).where(Document.project_id == project_id).where(Document.is_active == False)
+            select(RAGConfig.project_id)
+            .where(RAGConfig.is_active == True)
+            .where(RAGConfig.vector_store_backend == "pgvector")
         ).all()
-        return {int(r) for r in rows if r is not None}
+        return [int(r) for r in rows if r is not None]
+
+    def _inactive_doc_ids(self, project_id: int) -> frozenset[int]:
+        return document_bitmaps.get(self.session, project_id).inactive
+
+    @staticmethod
+    def _faiss_filter(
+        project_id: int,
+        bitmap: DocumentBitmap,
+        filter_document_id: Optional[int] = None,
+        filter_sources: Optional[set[str]] = None,
+    ) -> Callable[[dict], bool]:
+        """
+        Metadata predicate for FAISS similarity search. FAISS applies it to each
+        raw hit before building results, so inactive / out-of-scope vectors never
+        reach the candidate list and no post-hoc pass is needed.
+        """
+        def accept(metadata: dict) -> bool:
+            if metadata.get("project_id") != project_id:
+                return False
+            did = metadata.get("doc_id")
+            if not bitmap.allows(did):
+                return False
+            if filter_document_id is not None and did != filter_document_id:
+                return False
+            if filter_sources is not None and metadata.get("source") not in filter_sources:
+                return False
+            return True
+        return accept
 
     def _rebuild_bm25_for_project(self, project_id: int) -> None:
         """Fetches all active chunks for a project and builds the BM25 index."""
+        try:
+            config = self.get_active_config(project_id)
+        except ValueError:
+            config = None
+        if self._uses_postgres_fts(config):
+            # content_tsv is maintained by Postgres itself; just drop any stale pickle
+            bm25_manager.delete_index(str(project_id))
+            return
+
         try:
             rows = self.session.exec(
                 select(Chunk)
@@ -97,7 +178,10 @@ class RAGEngine:
             logging.error(f"Error rebuilding BM25 index for project {project_id}: {e}")
 
     def rebuild_full_index(self, project_id: Optional[int] = None) -> None:
-        """Rebuild FAISS from all chunks belonging to active, processed documents."""
+        """
+        Rebuild the vector index from all chunks belonging to active, processed documents.
+        pgvector projects are re-embedded in place; everything else goes into FAISS.
+        """
         config = None
         if project_id:
             try:
@@ -114,8 +198,13 @@ class RAGEngine:
             .where(Document.processed == True)
         )
         
+        pgvector_projects: List[int] = []
         if project_id:
             rows_query = rows_query.where(Document.project_id == project_id)
+        elif PgVectorStore.is_available(self.session):
+            pgvector_projects = self._pgvector_project_ids()
+            if pgvector_projects:
+                rows_query = rows_query.where(Document.project_id.notin_(pgvector_projects))
             
         rows = self.session.exec(rows_query).all()
 
@@ -154,15 +243,32 @@ class RAGEngine:
 
         self.session.commit()
 
+        if project_id and self._uses_pgvector(config):
+            PgVectorStore(self.session, embeddings).index_project(project_id)
+            self._rebuild_bm25_for_project(project_id)
+            return
+
+        # Global rebuild: only embed pgvector chunks that are still missing a vector
+        for pg_project_id in pgvector_projects:
+            try:
+                pg_config = self.get_active_config(pg_project_id)
+            except ValueError:
+                continue
+            PgVectorStore(self.session, self._get_embeddings(pg_config)).index_project(
+                pg_project_id, only_missing=True
+            )
+
         if not texts:
-            if os.path.exists(VECTOR_STORE_PATH):
-                shutil.rmtree(VECTOR_STORE_PATH, ignore_errors=True)
+            with faiss_write_lock(self.session):
+                if os.path.exists(VECTOR_STORE_PATH):
+                    shutil.rmtree(VECTOR_STORE_PATH, ignore_errors=True)
             if project_id:
                 bm25_manager.delete_index(str(project_id))
             return
 
-        vector_store = FAISS.from_texts(texts, embeddings, metadatas=metadatas, ids=ids)
-        vector_store.save_local(VECTOR_STORE_PATH)
+        with faiss_write_lock(self.session):
+            vector_store = FAISS.from_texts(texts, embeddings, metadatas=metadatas, ids=ids)
+            vector_store.save_local(VECTOR_STORE_PATH)
 
         # Build BM25 index for projects
         if project_id:
@@ -173,10 +279,177 @@ class RAGEngine:
                 if proj.id:
                     self._rebuild_bm25_for_project(proj.id)
 
-    def process_document(self, document: Document) -> None:
+    def soft_delete_document(self, document: Document) -> dict:
+        """
+        Deactivate a document without rebuilding any index or waiting on the
+        FAISS write lock (ingestion holds it for whole jobs). The bumped
+        kb_version retires cached document bitmaps, whose filter hides the
+        document's FAISS vectors from then on; compact_project_index removes
+        them physically later. pgvector embeddings are cleared on the chunk
+        rows in the same commit, and the chunks are tombstoned in the
+        project's BM25 index. `needs_compaction` reports whether FAISS vectors
+        are left behind or enough tombstones piled up.
+        """
+        project_id = document.project_id
+        try:
+            config = self.get_active_config(project_id)
+        except ValueError:
+            config = None
+
+        rows = self.session.exec(
+            select(Chunk.doc_id_version, Chunk.content).where(Chunk.document_id == document.id)
+        ).all()
+        ids = [doc_id_version for doc_id_version, _ in rows if doc_id_version]
+
+        document.is_active = False
+        self.session.add(document)
+        project = self.session.get(Project, project_id)
+        if project:
+            # Bumping kb_version retires this project's cached bitmaps and answers in every worker
+            project.kb_version = (project.kb_version or 1) + 1
+            project.kb_version_updated_at = datetime.utcnow()
+            self.session.add(project)
+        use_pgvector = self._uses_pgvector(config)
+        if use_pgvector and ids:
+            PgVectorStore(self.session, self._get_embeddings(config)).delete(ids=ids)
+        self.session.commit()
+        document_bitmaps.invalidate(project_id)
+
+        removed = len(ids) if use_pgvector else 0
+        pending = len(ids) if not use_pgvector and os.path.exists(VECTOR_STORE_PATH) else 0
+
+        tombstoned = 0
+        if not self._uses_postgres_fts(config):
+            tombstoned = bm25_manager.tombstone(str(project_id), [content for _, content in rows])
+
+        return {
+            "removed_vectors": removed,
+            "pending_vectors": pending,
+            "tombstoned_chunks": tombstoned,
+            "needs_compaction": pending > 0
+            or bm25_manager.tombstone_ratio(str(project_id)) >= BM25_COMPACT_TOMBSTONE_RATIO,
+        }
+
+    def compact_project_index(self, project_id: int, force: bool = False) -> dict:
+        """
+        Background half of soft deletion: drop the FAISS vectors still held for
+        the project's inactive documents and rebuild its BM25 index once
+        tombstones pass the threshold.
+        """
+        try:
+            config = self.get_active_config(project_id)
+        except ValueError:
+            config = None
+
+        purged = 0
+        if not self._uses_pgvector(config) and os.path.exists(VECTOR_STORE_PATH):
+            inactive = document_bitmaps.get(self.session, project_id).inactive
+            if inactive:
+                purged = self._delete_faiss_vectors(
+                    config,
+                    lambda store: self._faiss_ids_matching(
+                        store,
+                        lambda metadata: metadata.get("project_id") == project_id
+                        and metadata.get("doc_id") is not None
+                        and int(metadata["doc_id"]) in inactive,
+                    ),
+                )
+
+        ratio = bm25_manager.tombstone_ratio(str(project_id))
+        rebuilt = False
+        if force or ratio >= BM25_COMPACT_TOMBSTONE_RATIO:
+            self._rebuild_bm25_for_project(project_id)
+            rebuilt = True
+        return {"purged_vectors": purged, "tombstone_ratio": ratio, "bm25_rebuilt": rebuilt}
+
+    def delete_project(self, project_id: int) -> dict:
+        """
+        Delete a project with project_cascade's set-based deletes, then drop
+        what lives outside the database: its FAISS vectors, BM25 index, cached
+        document bitmap, semantic-cache answers and chat session contexts.
+        Returns rows / vectors deleted per kind.
+        """
+        chat_ids = project_cascade.chat_session_ids(self.session, project_id)
+        counts = project_cascade.delete_rows(self.session, project_id)
+
+        counts["vectors"] = 0
+        if os.path.exists(VECTOR_STORE_PATH):
+            counts["vectors"] = self._delete_faiss_vectors(
+                None,
+                lambda store: self._faiss_ids_matching(
+                    store, lambda metadata: metadata.get("project_id") == project_id
+                ),
+            )
+        bm25_manager.delete_index(str(project_id))
+        document_bitmaps.invalidate(project_id)
+        get_cost_manager().cache.invalidate_project(project_id)
+        for chat_id in chat_ids:
+            session_cache.invalidate(chat_id)
+        return counts
+
+    def delete_document_vectors(self, document: Document) -> int:
+        """
+        Drop one document's FAISS vectors (docstore ids are "<doc_id>:..."), so
+        it can be re-chunked without rebuilding the index of every project.
+        pgvector embeddings live on the chunk rows and go with them.
+        """
+        try:
+            config = self.get_active_config(document.project_id)
+        except ValueError:
+            config = None
+        if self._uses_pgvector(config) or not os.path.exists(VECTOR_STORE_PATH):
+            return 0
+        prefix = f"{document.id}:"
+        return self._delete_faiss_vectors(
+            config,
+            lambda store: [
+                i for i in store.index_to_docstore_id.values() if isinstance(i, str) and i.startswith(prefix)
+            ],
+        )
+
+    @staticmethod
+    def _faiss_ids_matching(vector_store, predicate: Callable[[dict], bool]) -> List[str]:
+        """Docstore ids of FAISS entries whose metadata satisfies `predicate`."""
+        ids = []
+        for docstore_id in vector_store.index_to_docstore_id.values():
+            doc = vector_store.docstore.search(docstore_id)
+            if predicate(getattr(doc, "metadata", None) or {}):
+                ids.append(docstore_id)
+        return ids
+
+    def _delete_faiss_vectors(self, config: Optional[RAGConfig], select_ids: Callable[[Any], List[str]]) -> int:
+        """Delete the docstore ids chosen by `select_ids` from the FAISS index and save it."""
+        try:
+            with faiss_write_lock(self.session):
+                vector_store = FAISS.load_local(
+                    VECTOR_STORE_PATH, self._get_embeddings(config), allow_dangerous_deserialization=True
+                )
+                ids = select_ids(vector_store)
+                if not ids:
+                    return 0
+                vector_store.delete(ids=ids)
+                vector_store.save_local(VECTOR_STORE_PATH)
+                return len(ids)
+        except Exception as e:
+            logging.error(f"Error deleting vectors from FAISS index: {e}")
+            return 0
+
+    def process_document(
+        self,
+        document: Document,
+        progress_callback: Optional[Callable[[float, Optional[str]], None]] = None,
+    ) -> None:
+        """
+        Chunk, embed and index a document. `progress_callback(fraction, message)` is
+        invoked between stages (used by ingestion jobs for status reporting).
+        """
         if not document.project_id:
             raise ValueError("Document must have a project_id")
 
+        def report(fraction: float, message: str) -> None:
+            if progress_callback:
+                progress_callback(fraction, message)
+
         document.processing_status = "processing"
         document.processing_error = None
         self.session.add(document)
@@ -193,6 +466,7 @@ class RAGEngine:
                 self.session.refresh(config)
 
             embeddings = self._get_embeddings(config)
+            streaming = False
             
             # Check if this document was parsed using Docling (which pre-chunks tables and text)
             if document.parsing_method == "docling" and document.parsed_chunks_json:
@@ -216,55 +490,111 @@ class RAGEngine:
                 }
             else:
                 # Fallback / Default Text Chunking (Adaptive)
-                from app.services.adaptive_chunker import get_adaptive_chunker
+                from app.services.adaptive_chunker import ChunkStrategy, get_adaptive_chunker
 
                 content = document.content or ""
                 doc_type = document.filename.split(".")[-1] if document.filename and "." in document.filename else "unknown"
                 
                 chunker = get_adaptive_chunker(chunk_size=config.chunk_size, chunk_overlap=config.chunk_overlap)
-                texts, strategy, metrics, all_scores = chunker.select_and_chunk(
-                    text=content,
-                    document_type=doc_type
+                streaming = len(content) >= STREAM_INDEX_MIN_CHARS
+                checkpoint_key = {
+                    "version": document.version,
+                    "chunk_size": config.chunk_size,
+                    "chunk_overlap": config.chunk_overlap,
+                }
+                checkpoint = document.index_checkpoint or {}
+                resuming = (
+                    streaming
+                    and all(checkpoint.get(k) == v for k, v in checkpoint_key.items())
+                    and bool(document.chunking_strategy)
                 )
+
+                if resuming:
+                    # Resume with the strategy the interrupted run committed to;
+                    # re-choosing could shift every chunk boundary.
+                    strategy = ChunkStrategy(document.chunking_strategy)
+                    strategy_metrics = document.chunking_metrics or {}
+                elif streaming:
+                    strategy, metrics, all_scores = chunker.select_strategy(
+                        text=content,
+                        document_type=doc_type,
+                        project_id=document.project_id
+                    )
+                else:
+                    texts, strategy, metrics, all_scores = chunker.select_and_chunk(
+                        text=content,
+                        document_type=doc_type,
+                        project_id=document.project_id
+                    )
+                    new_chunks = [
+                        {
+                            "index": idx,
+                            "text": txt,
+                            "metadata": {}
+                        }
+                        for idx, txt in enumerate(texts)
+                    ]
                 
-                new_chunks = [
-                    {
-                        "index": idx,
-                        "text": txt,
-                        "metadata": {}
-                    }
-                    for idx, txt in enumerate(texts)
-                ]
                 strategy_val = strategy.value
-                strategy_metrics = {
-                    "composite_score": metrics.composite_score,
-                    "size_compliance": metrics.size_compliance,
-                    "intrachunk_cohesion": metrics.intrachunk_cohesion,
-                    "contextual_coherence": metrics.contextual_coherence,
-                    "block_integrity": metrics.block_integrity,
-                    "reference_completeness": metrics.reference_completeness,
-                    "all_strategy_scores": all_scores
+                if not resuming:
+                    strategy_metrics = {
+                        "composite_score": metrics.composite_score,
+                        "size_compliance": metrics.size_compliance,
+                        "intrachunk_cohesion": metrics.intrachunk_cohesion,
+                        "contextual_coherence": metrics.contextual_coherence,
+                        "block_integrity": metrics.block_integrity,
+                        "reference_completeness": metrics.reference_completeness,
+                        "all_strategy_scores": all_scores
+                    }
+
+            if streaming:
+                # Pin the strategy before any chunk is committed so a resumed run reproduces the same chunks
+                document.chunking_strategy = strategy_val
+                document.chunking_metrics = strategy_metrics
+                document.index_checkpoint = {
+                    **checkpoint_key,
+                    "next_index": checkpoint.get("next_index", 0) if resuming else 0,
                 }
+                self.session.add(document)
+                self.session.commit()
+                report(0.3, f"streaming chunks ({strategy_val}{', resuming' if resuming else ''})")
+            else:
+                report(0.3, f"chunked into {len(new_chunks)} chunks ({strategy_val})")
 
-            # Initialize vector store if not exists
-            if os.path.exists(VECTOR_STORE_PATH):
-                try:
-                    vector_store = FAISS.load_local(
-                        VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True
-                    )
-                except Exception:
+            # The shared FAISS file is held from load to last save so concurrent
+            # jobs of other projects cannot overwrite each other's vectors
+            use_pgvector = self._uses_pgvector(config)
+            with nullcontext() if use_pgvector else faiss_write_lock(self.session):
+                # Initialize vector store if not exists
+                if use_pgvector:
+                    vector_store = PgVectorStore(self.session, embeddings)
+                elif os.path.exists(VECTOR_STORE_PATH):
+                    try:
+                        vector_store = FAISS.load_local(
+                            VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True
+                        )
+                    except Exception:
+                        vector_store = None
+                else:
                     vector_store = None
-            else:
-                vector_store = None
 
-            # Execute Delta Indexing
-            from app.services.delta_indexer import DeltaIndexer
-            delta_indexer = DeltaIndexer(self.session, vector_store, embeddings)
-            delta_stats = delta_indexer.delta_index(document.id, new_chunks)
+                # Execute Delta Indexing
+                from app.services.delta_indexer import DeltaIndexer
+                delta_indexer = DeltaIndexer(self.session, vector_store, embeddings)
+                if streaming:
+                    delta_stats = self._stream_index_document(
+                        document, chunker, strategy, content, delta_indexer, checkpoint_key, report
+                    )
+                    chunk_count = delta_stats["total_chunks"]
+                else:
+                    delta_stats = delta_indexer.delta_index(document.id, new_chunks)
+                    chunk_count = len(new_chunks)
+            report(0.85, f"indexed (+{delta_stats['added']} ~{delta_stats['updated']} -{delta_stats['deleted']})")
 
             document.processed = True
             document.processing_status = "complete"
-            document.chunk_count = len(new_chunks)
+            document.chunk_count = chunk_count
+            document.index_checkpoint = None
             document.chunk_size_used = config.chunk_size
             document.embedding_model_used = config.embedding_model or "google-embedding-001"
             
@@ -277,6 +607,7 @@ class RAGEngine:
 
             # Build BM25 index for the project after processing
             self._rebuild_bm25_for_project(document.project_id)
+            report(1.0, "complete")
         except Exception as exc:
             document.processed = False
             document.processing_status = "failed"
@@ -285,6 +616,112 @@ class RAGEngine:
             self.session.commit()
             raise
 
+    def _stream_index_document(
+        self,
+        document: Document,
+        chunker,
+        strategy,
+        content: str,
+        delta_indexer,
+        checkpoint_key: dict,
+        report: Callable[[float, str], None],
+    ) -> dict:
+        """
+        Streaming path for very large documents: chunks are produced lazily on a
+        background thread (at most STREAM_MAX_PENDING_BATCHES batches ahead of
+        the embedder), then hashed, embedded and indexed one batch at a time.
+        Each checkpoint commits the chunk rows together with
+        document.index_checkpoint; a re-run skips committed chunks by hash.
+        """
+        total_chars = max(1, len(content))
+
+        def chunk_dicts():
+            for idx, (text, section_end) in enumerate(
+                chunker.iter_chunks(content, strategy, section_chars=STREAM_SECTION_CHARS)
+            ):
+                yield {"index": idx, "text": text, "metadata": {}, "section_end": section_end}
+
+        def tracked(batches):
+            for batch in batches:
+                yield batch
+                last = batch[-1]
+                report(
+                    0.3 + 0.55 * min(1.0, last["section_end"] / total_chars),
+                    f"indexed {last['index'] + 1} chunks"
+                )
+
+        def on_checkpoint(next_index: int) -> None:
+            document.index_checkpoint = {**checkpoint_key, "next_index": next_index}
+            self.session.add(document)
+
+        batches = prefetch(batched(chunk_dicts(), STREAM_EMBED_BATCH), STREAM_MAX_PENDING_BATCHES)
+        try:
+            return delta_indexer.delta_index_stream(
+                document.id,
+                tracked(batches),
+                checkpoint_batches=STREAM_CHECKPOINT_BATCHES,
+                on_checkpoint=on_checkpoint,
+            )
+        finally:
+            batches.close()
+
+    def _lexical_search(
+        self,
+        config: RAGConfig,
+        project_id: int,
+        query: str,
+        top_k: int,
+        filter_document_id: Optional[int] = None,
+        filter_sources: Optional[set[str]] = None,
+        inactive: Optional[frozenset[int]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Lexical half of hybrid retrieval, returning (chunk_text, score) for hybrid_search_merge.
+        Postgres full-text applies the filters in SQL; BM25 results are checked against the DB.
+        """
+        if self._uses_postgres_fts(config):
+            return postgres_fts.search(
+                self.session, project_id, query, top_k=top_k,
+                filter_document_id=filter_document_id,
+                filter_sources=filter_sources,
+            )
+
+        if not bm25_manager.index_exists(str(project_id)):
+            return []
+
+        if inactive is None:
+            inactive = self._inactive_doc_ids(project_id)
+        raw_bm25 = bm25_manager.search(str(project_id), query, top_k=top_k)
+        if filter_document_id is None and filter_sources is None and not inactive:
+            return raw_bm25
+
+        # Query Chunk/Document tables to verify filter matches
+        bm25_results = []
+        texts = [r[0] for r in raw_bm25]
+        if texts:
+            db_chunks = self.session.exec(
+                select(Chunk, Document)
+                .join(Document, Chunk.document_id == Document.id)
+                .where(Document.project_id == project_id)
+                .where(Document.is_active == True)
+                .where(Chunk.content.in_(texts))
+            ).all()
+            
+            valid_texts = set()
+            for chunk, doc in db_chunks:
+                if doc.id in inactive:
+                    continue
+                if filter_document_id is not None and doc.id != filter_document_id:
+                    continue
+                if filter_sources is not None and doc.filename not in filter_sources:
+                    continue
+                valid_texts.add(chunk.content)
+                
+            for text, score in raw_bm25:
+                if text in valid_texts:
+                    bm25_results.append((text, score))
+        return bm25_results
+
     def _single_hybrid_search(
         self,
         query: str,
@@ -297,72 +734,49 @@ class RAGEngine:
         Executes a single hybrid retrieval search (semantic + BM25 if configured),
         filtering by inactive documents, and optionally by document_id or sources.
         """
-        if not os.path.exists(VECTOR_STORE_PATH):
-            return []
-            
         try:
             config = self.get_active_config(project_id)
         except ValueError:
             config = RAGConfig(project_id=project_id)
+
+        use_pgvector = self._uses_pgvector(config)
+        if not use_pgvector and not os.path.exists(VECTOR_STORE_PATH):
+            return []
             
         embeddings = self._get_embeddings(config)
-        vector_store = FAISS.load_local(
-            VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True
-        )
-        
         candidate_k = max(k * 5, 20)
-        inactive = self._inactive_doc_ids(project_id)
+        bitmap = document_bitmaps.get(self.session, project_id)
+        inactive = bitmap.inactive
         
         # 1. Semantic Search
-        results_with_score = vector_store.similarity_search_with_score(
-            query,
-            k=candidate_k * 2,  # Fetch more to allow for filtering
-            filter={"project_id": project_id},
-        )
-        
-        semantic_results = []
-        for doc, score in results_with_score:
-            did = doc.metadata.get("doc_id")
-            if did is not None and int(did) in inactive:
-                continue
-            if filter_document_id is not None and did != filter_document_id:
-                continue
-            if filter_sources is not None and doc.metadata.get("source") not in filter_sources:
-                continue
-            semantic_results.append((doc, score))
+        if use_pgvector:
+            # Project / active / document / source filters are applied inside the ANN query
+            semantic_results = PgVectorStore(self.session, embeddings).similarity_search_with_score(
+                query,
+                k=candidate_k * 2,
+                project_id=project_id,
+                filter_document_id=filter_document_id,
+                filter_sources=filter_sources,
+            )
+        else:
+            vector_store = FAISS.load_local(
+                VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True
+            )
+            semantic_results = vector_store.similarity_search_with_score(
+                query,
+                k=candidate_k * 2,  # Fetch more to allow for filtering
+                filter=self._faiss_filter(project_id, bitmap, filter_document_id, filter_sources),
+            )
             
-        # 2. BM25 Search
+        # 2. Lexical Search (BM25 or Postgres full-text)
         bm25_results = []
-        if config.use_hybrid_search and bm25_manager.index_exists(str(project_id)):
-            raw_bm25 = bm25_manager.search(str(project_id), query, top_k=candidate_k * 2)
-            # Filter BM25 results by active/inactive and Python filters
-            if filter_document_id is not None or filter_sources is not None or inactive:
-                # Query Chunk/Document tables to verify filter matches
-                texts = [r[0] for r in raw_bm25]
-                if texts:
-                    db_chunks = self.session.exec(
-                        select(Chunk, Document)
-                        .join(Document, Chunk.document_id == Document.id)
-                        .where(Document.project_id == project_id)
-                        .where(Document.is_active == True)
-                        .where(Chunk.content.in_(texts))
-                    ).all()
-                    
-                    valid_texts = set()
-                    for chunk, doc in db_chunks:
-                        if doc.id in inactive:
-                            continue
-                        if filter_document_id is not None and doc.id != filter_document_id:
-                            continue
-                        if filter_sources is not None and doc.filename not in filter_sources:
-                            continue
-                        valid_texts.add(chunk.content)
-                        
-                    for text, score in raw_bm25:
-                        if text in valid_texts:
-                            bm25_results.append((text, score))
-            else:
-                bm25_results = raw_bm25
+        if config.use_hybrid_search:
+            bm25_results = self._lexical_search(
+                config, project_id, query, candidate_k * 2,
+                filter_document_id=filter_document_id,
+                filter_sources=filter_sources,
+                inactive=inactive,
+            )
                 
         # 3. Hybrid Merge (RRF)
         if config.use_hybrid_search and bm25_results:
@@ -384,7 +798,7 @@ class RAGEngine:
         self, query: str, project_id: int, k: int = 4, score_threshold: float = 0.0,
         constraints=None, rewritten_query: Optional[str] = None, llm_client: Optional[Any] = None
     ) -> List[Tuple[LCDocument, float]]:
-        if not os.path.exists(VECTOR_STORE_PATH):
+        if not self._has_vector_index(project_id):
             return SearchResultList()
             
         from app.services.query_understanding import get_query_understanding
@@ -489,7 +903,7 @@ class RAGEngine:
 
             # Cross-Reference Resolution
             from app.services.cross_reference_resolver import CrossReferenceResolver
-            xref_resolver = CrossReferenceResolver()
+            xref_resolver = CrossReferenceResolver(self.session)
             resolver_res = xref_resolver.resolve_all(
                 chunks=pruned_results,
                 hybrid_search_fn=self._single_hybrid_search,
@@ -509,7 +923,7 @@ class RAGEngine:
 
             # Conflict Detection
             from app.services.conflict_detector import ConflictDetector
-            conflict_detector = ConflictDetector()
+            conflict_detector = ConflictDetector(self.session)
             conflict_res = conflict_detector.detect_conflicts(final_reranked, query)
 
             # Phase 3: Contextual Compressor sentence-level compression
@@ -523,13 +937,15 @@ class RAGEngine:
                     "doc_id": doc.metadata.get("doc_id"),
                     "score": score,
                     "metadata": doc.metadata,
+                    "sentence_spans": doc.metadata.get("sentence_spans"),
                     "_orig_doc": doc
                 })
             compression_res = compressor.compress_chunks(
                 query=effective_query,
                 chunks=chunks_dicts,
-                max_total_tokens=2000,
-                min_sentences_per_chunk=1
+                max_total_tokens=config.max_context_tokens,
+                min_sentences_per_chunk=1,
+                model=config.primary_llm_name
             )
             compressed_reranked = []
             for c in compression_res["compressed_chunks"]:
@@ -537,7 +953,8 @@ class RAGEngine:
                 new_doc = LCDocument(
                     page_content=c["content"],
                     metadata={
-                        **orig_doc.metadata,
+                        # Sentence offsets describe the uncompressed text
+                        **{k: v for k, v in orig_doc.metadata.items() if k != "sentence_spans"},
                         "compression_applied": True,
                         "sentences_kept": c["sentences_kept"],
                         "sentences_dropped": c["sentences_dropped"],
@@ -596,7 +1013,10 @@ class RAGEngine:
                 document_metadata.append(meta)
 
             confidence_gate = get_confidence_gate(threshold=0.65)
-            gate_result = confidence_gate.evaluate(chunk_dicts, reranker_scores, document_metadata)
+            agreement_token_cache = {}
+            gate_result = confidence_gate.evaluate(
+                chunk_dicts, reranker_scores, document_metadata, token_cache=agreement_token_cache
+            )
             
             tracer.end_stage(
                 PipelineStage.CONFIDENCE_GATE,
@@ -620,6 +1040,7 @@ class RAGEngine:
             final_results.used_hybrid_search = used_hybrid
             final_results.query_analysis = analysis
             final_results.confidence_gate_result = gate_result
+            final_results.agreement_token_cache = agreement_token_cache
             final_results.conflict_detection = conflict_res
             final_results.pipeline_trace = tracer.to_dict()
             final_results.pipeline_trace["semantic_routing"] = routing_res
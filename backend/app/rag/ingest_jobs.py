@@ -0,0 +1,131 @@
+import os
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models.job import IngestionJob
+from app.models.rag import Chunk, ChunkAnchor, ChunkFact, Document, Project, RAGConfig
+from app.rag.engine import RAGEngine
+from app.services.job_queue import (
+    JOB_COMPACT_INDEX,
+    JOB_DELETE_PROJECT,
+    JOB_PROCESS_DOCUMENT,
+    JOB_RECHUNK_DOCUMENT,
+    JOB_REINDEX_PROJECT,
+    IngestionWorker,
+    job_queue,
+)
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKER_CONCURRENCY = int(os.getenv("INGEST_WORKER_CONCURRENCY", "2"))
+# Run a worker inside the API process (single-process/dev setups). Disable when
+# running the dedicated `python ingest_worker.py` process.
+INGEST_EMBEDDED_WORKER = os.getenv("INGEST_EMBEDDED_WORKER", "true").lower() == "true"
+
+ProgressFn = Callable[[float, Optional[str]], None]
+
+
+def process_document_job(session: Session, job: IngestionJob, progress: ProgressFn) -> None:
+    doc = session.get(Document, job.document_id)
+    if not doc or not doc.is_active:
+        progress(1.0, "document no longer active, skipped")
+        return
+    RAGEngine(session).process_document(doc, progress_callback=progress)
+
+
+def rechunk_document_job(session: Session, job: IngestionJob, progress: ProgressFn) -> None:
+    """
+    Re-chunk one document in place: drop its own vectors and chunks, then
+    index it again. Other documents and projects are left untouched.
+    """
+    payload = job.payload or {}
+    doc = session.get(Document, job.document_id)
+    if not doc or not doc.content:
+        progress(1.0, "document has no stored text, skipped")
+        return
+
+    rag_engine = RAGEngine(session)
+    removed = rag_engine.delete_document_vectors(doc)
+    session.execute(delete(ChunkFact).where(ChunkFact.document_id == doc.id))
+    session.execute(delete(ChunkAnchor).where(ChunkAnchor.document_id == doc.id))
+    old_chunks = session.exec(select(Chunk).where(Chunk.document_id == doc.id)).all()
+    for ch in old_chunks:
+        session.delete(ch)
+    session.commit()
+
+    active = session.exec(
+        select(RAGConfig)
+        .where(RAGConfig.project_id == doc.project_id)
+        .where(RAGConfig.is_active == True)
+        .order_by(RAGConfig.created_at.desc())
+    ).first()
+    if active and payload.get("chunk_size") is not None:
+        active.chunk_size = payload["chunk_size"]
+        active.chunk_overlap = payload.get("chunk_overlap", active.chunk_overlap)
+        session.add(active)
+        session.commit()
+
+    doc.processed = False
+    doc.processing_status = "pending"
+    doc.processing_error = None
+    doc.version = (doc.version or 1) + 1
+    session.add(doc)
+    session.commit()
+    progress(0.1, f"old chunks removed ({removed} vectors)")
+
+    rag_engine.process_document(
+        doc, progress_callback=lambda f, m=None: progress(0.1 + 0.9 * f, m)
+    )
+
+
+def reindex_project_job(session: Session, job: IngestionJob, progress: ProgressFn) -> None:
+    """Rebuild a project's vector (or only lexical) index after a backend switch."""
+    rag_engine = RAGEngine(session)
+    if (job.payload or {}).get("vector", True):
+        rag_engine.rebuild_full_index(job.project_id)
+    else:
+        rag_engine._rebuild_bm25_for_project(job.project_id)
+
+
+def compact_index_job(session: Session, job: IngestionJob, progress: ProgressFn) -> None:
+    """Reclaim index space left by soft-deleted documents."""
+    stats = RAGEngine(session).compact_project_index(
+        job.project_id, force=(job.payload or {}).get("force", False)
+    )
+    progress(1.0, f"purged {stats['purged_vectors']} vectors, bm25 rebuilt: {stats['bm25_rebuilt']}")
+
+
+def delete_project_job(session: Session, job: IngestionJob, progress: ProgressFn) -> None:
+    """Cascade-delete a large project (queued by the delete_project route)."""
+    project_id = (job.payload or {}).get("project_id")
+    if project_id is None or not session.get(Project, project_id):
+        progress(1.0, "project already deleted, skipped")
+        return
+    counts = RAGEngine(session).delete_project(project_id)
+    progress(1.0, f"deleted {counts['documents']} documents, {counts['chunks']} chunks, {counts['vectors']} vectors")
+
+
+INGEST_JOB_HANDLERS = {
+    JOB_PROCESS_DOCUMENT: process_document_job,
+    JOB_RECHUNK_DOCUMENT: rechunk_document_job,
+    JOB_REINDEX_PROJECT: reindex_project_job,
+    JOB_COMPACT_INDEX: compact_index_job,
+    JOB_DELETE_PROJECT: delete_project_job,
+}
+
+
+def build_worker(concurrency: int = INGEST_WORKER_CONCURRENCY) -> IngestionWorker:
+    return IngestionWorker(engine, INGEST_JOB_HANDLERS, queue=job_queue, concurrency=concurrency)
+
+
+def start_embedded_worker() -> Optional[IngestionWorker]:
+    """Start an in-process worker if enabled. Returns it so shutdown can stop it."""
+    if not INGEST_EMBEDDED_WORKER:
+        return None
+    worker = build_worker()
+    worker.start()
+    return worker
@@ -1,38 +1,41 @@
 from __future__ import annotations
 
-import io
 import math
-import os
-import tempfile
-import hashlib
+import asyncio
+import zipfile
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile
 from pydantic import BaseModel, Field
-from pypdf import PdfReader
-from sqlmodel import Session, select
+from sqlalchemy import and_, or_, tuple_
+from sqlmodel import Session, func, select
 
 from app.auth.deps import get_current_admin, get_current_user
-from app.db import engine, get_session
-from app.models.rag import Chunk, Document, RAGConfig
+from app.db import get_session
+from app.models.rag import Chunk, Document
 from app.models.user import User, UserRole
 from app.rag.engine import RAGEngine
-from app.services.ingestion_scanner import IngestionScanner
-from app.services.docling_parser import DoclingParser
+from app.rag.bulk_ingest import bulk_ingest
+from app.services.document_bitmap import document_bitmaps
+from app.services.document_parsing import get_parse_pool, prepare_document, remove_spooled, spool_upload
+from app.services.job_queue import (
+    JOB_COMPACT_INDEX,
+    JOB_PROCESS_DOCUMENT,
+    JOB_RECHUNK_DOCUMENT,
+    PRIORITY_LOW,
+    job_queue,
+)
+from app.services.tokenizer_service import tokenizer
 
 router = APIRouter(prefix="/rag/ingest", tags=["rag-ingest"])
 
-
-def _process_document_job(doc_id: int) -> None:
-    try:
-        with Session(engine) as session:
-            doc = session.get(Document, doc_id)
-            if not doc:
-                return
-            RAGEngine(session).process_document(doc)
-    except Exception as exc:
-        print(f"Background document processing failed for {doc_id}: {exc}")
+# List endpoints skip the heavy text/JSON payloads; fetch GET /documents/{id} for those
+DOCUMENT_LIST_COLUMNS = [
+    column for name, column in Document.__table__.columns.items()
+    if name not in {"content", "parsed_chunks_json"}
+]
+MAX_PAGE_SIZE = 200
 
 
 class RechunkBody(BaseModel):
@@ -42,93 +45,62 @@ class RechunkBody(BaseModel):
 
 @router.post("/upload")
 async def upload_document(
-    background_tasks: BackgroundTasks,
     project_id: int = Form(...),
     file: UploadFile = File(...),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    content = ""
     filename = file.filename or "upload.txt"
-    page_count: Optional[int] = None
-    raw_bytes = await file.read()
-    
-    # Delta Re-indexing: Check if exact same file is uploaded twice
-    doc_hash = hashlib.sha256(raw_bytes).hexdigest()
-    existing_doc = session.exec(
-        select(Document)
-        .where(Document.project_id == project_id)
-        .where(Document.document_hash == doc_hash)
-        .where(Document.is_active == True)
-    ).first()
-    
-    if existing_doc:
-        return {
-            "message": "Document unchanged, skipping re-index",
-            "doc_id": existing_doc.id,
-            "status": "complete",
-            "delta_index_stats": {
-                "total_chunks": existing_doc.chunk_count or 0,
-                "added": 0,
-                "updated": 0,
-                "deleted": 0,
-                "unchanged": existing_doc.chunk_count or 0,
-                "indexed_at": datetime.utcnow().isoformat()
-            }
-        }
-
-    docling_parser = DoclingParser()
-    parsing_method = "basic"
-    parsed_chunks_json = None
-    parsed_res = None
+    # Stream to disk while hashing; parsers read from the temp file path
+    spooled = await spool_upload(file, filename)
+    doc_hash = spooled.sha256
+    try:
+        # Delta Re-indexing: Check if exact same file is uploaded twice
+        existing_doc = session.exec(
+            select(Document)
+            .where(Document.project_id == project_id)
+            .where(Document.document_hash == doc_hash)
+            .where(Document.is_active == True)
+        ).first()
 
-    if filename.lower().endswith(".pdf"):
-        # Write bytes to temp file so Docling can parse it
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            tmp.write(raw_bytes)
-            tmp_path = tmp.name
-        
-        try:
-            if docling_parser.is_available():
-                parsed_res = docling_parser.parse(tmp_path)
-                parsing_method = parsed_res["parsing_method"]
-                page_count = parsed_res["page_count"]
-                
-                # Reconstruct plain text content
-                content = ""
-                for b in parsed_res["text_blocks"]:
-                    content += b["content"] + "\n"
-                for t in parsed_res["tables"]:
-                    content += t["content"] + "\n"
-                
-                parsed_chunks_json = {"chunks": docling_parser.to_chunks(parsed_res)}
-            else:
-                reader = PdfReader(io.BytesIO(raw_bytes))
-                page_count = len(reader.pages)
-                for page in reader.pages:
-                    content += page.extract_text() + "\n"
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-    else:
-        content = raw_bytes.decode("utf-8", errors="replace")
+        if existing_doc:
+            return {
+                "message": "Document unchanged, skipping re-index",
+                "doc_id": existing_doc.id,
+                "status": "complete",
+                "delta_index_stats": {
+                    "total_chunks": existing_doc.chunk_count or 0,
+                    "added": 0,
+                    "updated": 0,
+                    "deleted": 0,
+                    "unchanged": existing_doc.chunk_count or 0,
+                    "indexed_at": datetime.utcnow().isoformat()
+                }
+            }
 
-    # Ingestion PII/Secrets Scanning
-    scanner = IngestionScanner()
-    scan_result = scanner.scan_document(content)
+        # Parse/scan in the process pool so the event loop keeps serving requests
+        loop = asyncio.get_running_loop()
+        prepared = await loop.run_in_executor(get_parse_pool(), prepare_document, filename, spooled.path)
+    finally:
+        remove_spooled(spooled)
+
+    content = prepared["content"]
+    page_count = prepared["page_count"]
+    parsing_method = prepared["parsing_method"]
+    parsed_chunks_json = prepared["parsed_chunks_json"]
+    scan_result = prepared["scan_result"]
+    redaction_log = prepared["redaction_log"]
+    action_taken = prepared["action_taken"]
+    warning_msg = prepared["warning"]
     
-    action_taken = "none"
-    warning_msg = None
-    redaction_log = None
-    
-    if scanner.should_quarantine(scan_result):
+    if prepared["quarantine"]:
         # Quarantine critical secret uploads (don't chunk)
         doc = Document(
             filename=filename,
             content="",  # Blank content
             processed=False,
             project_id=project_id,
-            file_size_bytes=len(raw_bytes),
+            file_size_bytes=spooled.size,
             page_count=page_count,
             processing_status="quarantined",
             uploaded_by=current_user.id,
@@ -138,6 +110,7 @@ async def upload_document(
         session.add(doc)
         session.commit()
         session.refresh(doc)
+        document_bitmaps.invalidate(project_id)
         
         raise HTTPException(
             status_code=422,
@@ -154,21 +127,8 @@ async def upload_document(
                 }
             }
         )
-    
-    if scan_result["has_secrets"]:
-        # Redact PII
-        redact_res = scanner.redact_document(content)
-        content = redact_res["redacted_text"]
-        redaction_log = redact_res["redaction_log"]
-        action_taken = "redacted"
-        warning_msg = "Document contained PII which was redacted"
-        
-        if parsed_chunks_json and "chunks" in parsed_chunks_json:
-            for ch in parsed_chunks_json["chunks"]:
-                ch_redact = scanner.redact_document(ch["content"])
-                ch["content"] = ch_redact["redacted_text"]
 
-    file_size = len(raw_bytes) if raw_bytes else len(content.encode("utf-8"))
+    file_size = spooled.size or len(content.encode("utf-8"))
 
     doc = Document(
         filename=filename,
@@ -187,14 +147,17 @@ async def upload_document(
     session.add(doc)
     session.commit()
     session.refresh(doc)
+    document_bitmaps.invalidate(project_id)
 
-    background_tasks.add_task(_process_document_job, doc.id)
+    # Durable job: picked up by an ingest worker (see app/rag/ingest_jobs.py)
+    job = job_queue.enqueue(session, JOB_PROCESS_DOCUMENT, document_id=doc.id, project_id=doc.project_id)
 
     estimated_chunks = parsed_chunks_json["chunks"] if parsed_chunks_json else []
 
     return {
         "message": warning_msg or "Document queued for processing",
         "doc_id": doc.id,
+        "job_id": job.id,
         "status": doc.processing_status,
         "ingestion_scan": {
             "has_secrets": scan_result["has_secrets"],
@@ -207,24 +170,86 @@ async def upload_document(
         "parsing_stats": {
             "parsing_method": parsing_method,
             "page_count": page_count or 0,
-            "table_count": len(parsed_res["tables"]) if parsed_res and "tables" in parsed_res else 0,
-            "heading_count": len(parsed_res["headings"]) if parsed_res and "headings" in parsed_res else 0,
+            "table_count": prepared["table_count"],
+            "heading_count": prepared["heading_count"],
+            "slow_pages": prepared["slow_pages"],
             "chunk_count": len(estimated_chunks) if estimated_chunks else 0
         }
     }
 
 
-@router.get("/", response_model=list[Document])
+@router.post("/upload/bulk")
+async def bulk_upload_documents(
+    project_id: int = Form(...),
+    files: List[UploadFile] = File(...),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Upload many files (and/or .zip archives) in one request. Duplicates are skipped,
+    files are parsed in parallel and processing jobs are queued at low priority so
+    interactive single uploads are not starved.
+    """
+    items = []
+    try:
+        for f in files:
+            items.append(await spool_upload(f, f.filename or "upload.txt"))
+        return await bulk_ingest(session, project_id, current_user.id, items)
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        # bulk_ingest removes what it consumed; this covers failures while spooling
+        remove_spooled(*items)
+
+
+@router.get("/")
 def list_documents(
     project_id: int,
+    response: Response,
     include_inactive: bool = False,
+    limit: Optional[int] = None,
+    before: Optional[int] = None,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
-    q = select(Document).where(Document.project_id == project_id)
+    """
+    Newest-first document list without `content` / `parsed_chunks_json`.
+    Optional keyset pagination: pass `limit`, then the X-Next-Cursor value as `before`.
+    X-Total-Count holds the number of matching documents.
+    """
+    conditions = [Document.project_id == project_id]
     if not (include_inactive and current_user.role == UserRole.ADMIN):
-        q = q.where(Document.is_active == True)
-    return session.exec(q.order_by(Document.uploaded_at.desc())).all()
+        conditions.append(Document.is_active == True)
+
+    total = session.exec(select(func.count()).select_from(Document).where(*conditions)).one()
+    response.headers["X-Total-Count"] = str(total)
+
+    q = select(*DOCUMENT_LIST_COLUMNS).where(*conditions)
+    if before is not None:
+        q = q.where(Document.id < before)
+    # ids are assigned in upload order, so id desc == uploaded_at desc and is a stable cursor
+    q = q.order_by(Document.id.desc())
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        q = q.limit(limit + 1)
+
+    rows = [dict(row._mapping) for row in session.exec(q).all()]
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1]["id"])
+    return rows
+
+
+@router.get("/documents/{doc_id}", response_model=Document)
+def get_document(
+    doc_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    doc = session.get(Document, doc_id)
+    if not doc or (not doc.is_active and current_user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=404, detail="Document not found")
+    return doc
 
 
 @router.get("/documents/{doc_id}/status")
@@ -236,10 +261,22 @@ def get_document_status(
     doc = session.get(Document, doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
+    job = job_queue.latest_for_document(session, doc_id)
     return {
         "status": doc.processing_status,
         "error": doc.processing_error,
         "processed": doc.processed,
+        "job": {
+            "id": job.id,
+            "type": job.job_type,
+            "status": job.status,
+            "progress": job.progress,
+            "message": job.progress_message,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "next_run_at": job.run_after.isoformat() if job.status == "queued" else None,
+            "error": job.error,
+        } if job else None,
     }
 
 
@@ -248,23 +285,62 @@ def get_document_chunks_page(
     doc_id: int,
     page: int = 1,
     limit: int = 20,
+    after: Optional[int] = None,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    Chunks of a document in chunk_index order (chunks without an index last).
+    Pass the returned `next_cursor` (a chunk id) as `after` for keyset paging on
+    (chunk_index, id), served by ix_chunk_document_id_chunk_index; `page` alone
+    still works for jumping to an arbitrary page.
+    """
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
-    all_chunks = session.exec(select(Chunk).where(Chunk.document_id == doc_id)).all()
-    total_count = len(all_chunks)
-    offset = max(0, (page - 1) * limit)
-    chunks = all_chunks[offset : offset + limit]
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    page = max(1, page)
+
+    total_count = session.exec(
+        select(func.count()).select_from(Chunk).where(Chunk.document_id == doc_id)
+    ).one()
+
+    q = (
+        select(Chunk.id, Chunk.chunk_index, Chunk.content)
+        .where(Chunk.document_id == doc_id)
+        .order_by(Chunk.chunk_index.asc().nulls_last(), Chunk.id)
+    )
+    if after is not None:
+        cursor_chunk = session.get(Chunk, after)
+        if not cursor_chunk or cursor_chunk.document_id != doc_id:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if cursor_chunk.chunk_index is None:
+            q = q.where(and_(Chunk.chunk_index.is_(None), Chunk.id > cursor_chunk.id))
+        else:
+            q = q.where(or_(
+                tuple_(Chunk.chunk_index, Chunk.id) > tuple_(cursor_chunk.chunk_index, cursor_chunk.id),
+                Chunk.chunk_index.is_(None),
+            ))
+    else:
+        q = q.offset((page - 1) * limit)
+    rows = session.exec(q.limit(limit + 1)).all()
+    chunks = rows[:limit]
+    next_cursor = chunks[-1].id if len(rows) > limit else None
+
+    token_counts = tokenizer.count_batch([c.content for c in chunks])
     return {
         "chunks": [
-            {"id": c.id, "content": c.content, "token_count": max(1, len(c.content) // 4)}
-            for c in chunks
+            {
+                "id": c.id,
+                "chunk_index": c.chunk_index,
+                "content": c.content,
+                "token_count": max(1, n),
+            }
+            for c, n in zip(chunks, token_counts)
         ],
         "total": total_count,
         "page": page,
-        "pages": max(1, math.ceil(total_count / limit)) if limit else 1,
+        "pages": max(1, math.ceil(total_count / limit)),
+        "next_cursor": next_cursor,
     }
 
 
@@ -277,50 +353,24 @@ def delete_document(
     doc = session.get(Document, doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    doc.is_active = False
-    session.add(doc)
-    session.commit()
-    RAGEngine(session).rebuild_full_index()
-    return {"deleted": True, "doc_id": doc_id}
-
-
-def _rechunk_job(doc_id: int, chunk_size: int, chunk_overlap: int) -> None:
-    with Session(engine) as session:
-        doc = session.get(Document, doc_id)
-        if not doc or not doc.content:
-            return
-        old_chunks = session.exec(select(Chunk).where(Chunk.document_id == doc_id)).all()
-        for ch in old_chunks:
-            session.delete(ch)
-        session.commit()
-
-        active = session.exec(
-            select(RAGConfig)
-            .where(RAGConfig.project_id == doc.project_id)
-            .where(RAGConfig.is_active == True)
-            .order_by(RAGConfig.created_at.desc())
-        ).first()
-        if active:
-            active.chunk_size = chunk_size
-            active.chunk_overlap = chunk_overlap
-            session.add(active)
-            session.commit()
-
-        doc.processed = False
-        doc.processing_status = "pending"
-        doc.processing_error = None
-        doc.version = (doc.version or 1) + 1
-        session.add(doc)
-        session.commit()
-
-        RAGEngine(session).rebuild_full_index()
-        RAGEngine(session).process_document(doc)
+    stats = RAGEngine(session).soft_delete_document(doc)
+    compaction_queued = False
+    if stats["needs_compaction"] and not job_queue.has_pending(session, JOB_COMPACT_INDEX, doc.project_id):
+        job_queue.enqueue(session, JOB_COMPACT_INDEX, project_id=doc.project_id, priority=PRIORITY_LOW)
+        compaction_queued = True
+    return {
+        "deleted": True,
+        "doc_id": doc_id,
+        "removed_vectors": stats["removed_vectors"],
+        "pending_vectors": stats["pending_vectors"],
+        "tombstoned_chunks": stats["tombstoned_chunks"],
+        "compaction_queued": compaction_queued,
+    }
 
 
 @router.post("/documents/{doc_id}/rechunk")
 def rechunk_document(
     doc_id: int,
-    background_tasks: BackgroundTasks,
     body: RechunkBody,
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_admin),
@@ -331,8 +381,13 @@ def rechunk_document(
     if not doc.is_active:
         raise HTTPException(status_code=400, detail="Cannot re-chunk inactive document")
 
-    background_tasks.add_task(_rechunk_job, doc_id, body.chunk_size, body.chunk_overlap)
     doc.processing_status = "processing"
     session.add(doc)
-    session.commit()
-    return {"status": "reprocessing", "doc_id": doc_id}
+    job = job_queue.enqueue(
+        session,
+        JOB_RECHUNK_DOCUMENT,
+        document_id=doc_id,
+        project_id=doc.project_id,
+        payload={"chunk_size": body.chunk_size, "chunk_overlap": body.chunk_overlap},
+    )
+    return {"status": "reprocessing", "doc_id": doc_id, "job_id": job.id}
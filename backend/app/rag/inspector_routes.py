@@ -7,6 +7,7 @@ from app.models.rag import Document, Chunk
 from app.models.user import User
 from app.auth.deps import get_current_user
 from app.rag.engine import RAGEngine
+from app.services.tokenizer_service import tokenizer
 
 router = APIRouter(prefix="/inspector", tags=["inspector"])
 
@@ -42,8 +43,8 @@ def get_document_chunks(
         raise HTTPException(status_code=403, detail="Admin access required")
     
     chunks = session.exec(select(Chunk).where(Chunk.document_id == document_id)).all()
-    # Simple estimation for tokens if not stored: chars / 4
-    return [ChunkDTO(id=c.id, content=c.content, token_count=len(c.content)//4) for c in chunks]
+    token_counts = tokenizer.count_batch([c.content for c in chunks])
+    return [ChunkDTO(id=c.id, content=c.content, token_count=n) for c, n in zip(chunks, token_counts)]
 
 @router.post("/search", response_model=DebugSearchResponse)
 def debug_search(
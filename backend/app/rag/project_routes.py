@@ -3,11 +3,12 @@ from sqlmodel import Session, select
 from typing import List, Optional
 from pydantic import BaseModel
 from app.db import get_session
-from app.models.rag import Project, RAGConfig, Document, Chunk
-from app.models.chat import ChatSession, Message
-from app.models.query_log import QueryLog
+from app.models.rag import Project, RAGConfig
 from app.models.user import User
 from app.auth.deps import get_current_user, get_current_admin
+from app.rag.engine import RAGEngine
+from app.services.job_queue import JOB_DELETE_PROJECT, JOB_REINDEX_PROJECT, PRIORITY_HIGH, job_queue
+from app.services.project_cascade import PROJECT_DELETE_SYNC_MAX_CHUNKS, project_cascade
 
 # Admin routes for managing projects
 router = APIRouter(prefix="/rag/projects", tags=["rag-projects"])
@@ -31,6 +32,13 @@ class ProjectRAGConfigPatch(BaseModel):
     answer_only_from_docs: Optional[bool] = None
     hallucination_guard: Optional[bool] = None
     max_tokens: Optional[int] = None
+    vector_store_backend: Optional[str] = None
+    lexical_backend: Optional[str] = None
+
+
+VECTOR_STORE_BACKENDS = {"faiss", "pgvector"}
+LEXICAL_BACKENDS = {"bm25", "postgres_fts"}
+
 
 
 @router.patch("/{project_id}/config", response_model=RAGConfig)
@@ -40,6 +48,16 @@ def patch_project_rag_config(
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_admin),
 ):
+    if patch.vector_store_backend is not None and patch.vector_store_backend not in VECTOR_STORE_BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"vector_store_backend must be one of {sorted(VECTOR_STORE_BACKENDS)}",
+        )
+    if patch.lexical_backend is not None and patch.lexical_backend not in LEXICAL_BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"lexical_backend must be one of {sorted(LEXICAL_BACKENDS)}",
+        )
     config = session.exec(
         select(RAGConfig)
         .where(RAGConfig.project_id == project_id)
@@ -51,12 +69,19 @@ def patch_project_rag_config(
         session.add(config)
         session.commit()
         session.refresh(config)
+    previous_backend = config.vector_store_backend
+    previous_lexical = config.lexical_backend
     data = patch.model_dump(exclude_unset=True)
     for key, value in data.items():
         setattr(config, key, value)
     session.add(config)
     session.commit()
     session.refresh(config)
+    # Embeddings live in a different store after a switch: re-embed the project there
+    if config.vector_store_backend != previous_backend:
+        job_queue.enqueue(session, JOB_REINDEX_PROJECT, project_id=project_id, payload={"vector": True})
+    elif config.lexical_backend != previous_lexical:
+        job_queue.enqueue(session, JOB_REINDEX_PROJECT, project_id=project_id, payload={"vector": False})
     return config
 
 
@@ -86,31 +111,14 @@ def delete_project(project_id: int, session: Session = Depends(get_session), cur
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Manual Cascade Delete to handle Foreign Key Constraints
-    logs = session.exec(select(QueryLog).where(QueryLog.project_id == project_id)).all()
-    for lg in logs:
-        session.delete(lg)
-    configs = session.exec(select(RAGConfig).where(RAGConfig.project_id == project_id)).all()
-    for c in configs:
-        session.delete(c)
-    
-    # 2. Delete Documents & Chunks
-    docs = session.exec(select(Document).where(Document.project_id == project_id)).all()
-    for d in docs:
-        # Delete chunks for each doc
-        chunks = session.exec(select(Chunk).where(Chunk.document_id == d.id)).all()
-        for ch in chunks:
-            session.delete(ch)
-        session.delete(d)
-        
-    # 3. Delete Chat Sessions & Messages
-    chats = session.exec(select(ChatSession).where(ChatSession.project_id == project_id)).all()
-    for c in chats:
-        msgs = session.exec(select(Message).where(Message.session_id == c.id)).all()
-        for m in msgs:
-            session.delete(m)
-        session.delete(c)
+    # Large projects are deleted by the ingest worker. Job rows reference
+    # project.id, so the job carries the project id in its payload only.
+    if project_cascade.chunk_count(session, project_id) > PROJECT_DELETE_SYNC_MAX_CHUNKS:
+        job = job_queue.enqueue(
+            session, JOB_DELETE_PROJECT, payload={"project_id": project_id}, priority=PRIORITY_HIGH
+        )
+        return {"ok": True, "queued": True, "job_id": job.id}
 
-    session.delete(project)
-    session.commit()
+    # Set-based cascade plus FAISS / BM25 / cache cleanup
+    RAGEngine(session).delete_project(project_id)
     return {"ok": True}
@@ -11,7 +11,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
 from app.auth.deps import get_current_user
-from app.db import get_session
+from app.db import async_read_session, get_session
 from app.models.chat import ChatSession, Message
 from app.models.query_log import QueryLog
 from app.models.usage import TokenUsage
@@ -22,7 +22,7 @@ from app.utils.cost import calculate_cost
 from app.services.rag_evaluator import evaluate_rag_response
 
 # Import existing router logic to keep standard mode identical
-from app.rag.chat_routes import post_message, ChatMessageRequest
+from app.rag.chat_routes import post_message, ChatMessageRequest, _load_chat_history, _load_related_context
 from app.agents import retrieval_agent
 
 router = APIRouter(prefix="/api/query", tags=["query"])
@@ -106,57 +106,20 @@ async def post_agentic_query(
         model_name = routed_model
         model_provider = routed_provider
 
-    # Get chat history
-    past_messages = session_db.exec(
-        select(Message)
-        .where(Message.session_id == session_id)
-        .where(Message.id != user_msg.id)
-        .order_by(Message.created_at.desc())
-        .limit(history_limit)
-    ).all()
-    past_messages = sorted(past_messages, key=lambda m: m.created_at)
-
-    from langchain_core.messages import AIMessage, HumanMessage
-    chat_history = []
-    for msg in past_messages:
-        if msg.role == "user":
-            chat_history.append(HumanMessage(content=msg.content))
-        elif msg.role == "assistant":
-            chat_history.append(AIMessage(content=msg.content))
-
-    # Fetch context from related chats
-    other_context_str = ""
-    context_sessions = []
-    if context_session_ids:
-        context_sessions = session_db.exec(
-            select(ChatSession)
-            .where(ChatSession.id.in_(context_session_ids))
-            .where(ChatSession.user_id == current_user.id)
-            .where(ChatSession.id != session_id)
-        ).all()
-    elif project_context_limit > 0:
-        context_sessions = session_db.exec(
-            select(ChatSession)
-            .where(ChatSession.project_id == project_id)
-            .where(ChatSession.id != session_id)
-            .order_by(ChatSession.created_at.desc())
-            .limit(project_context_limit)
-        ).all()
-
-    if context_sessions:
-        other_context_str = "\n\n### RELATED PROJECT CHATS (CONTEXT):\n"
-        for osess in context_sessions:
-            osess_msgs = session_db.exec(
-                select(Message)
-                .where(Message.session_id == osess.id)
-                .order_by(Message.created_at.desc())
-                .limit(3)
-            ).all()
-            osess_msgs = sorted(osess_msgs, key=lambda m: m.created_at)
-            if osess_msgs:
-                other_context_str += f"- Chat '{osess.title}':\n"
-                for m in osess_msgs:
-                    other_context_str += f"  {m.role.upper()}: {m.content[:200]}...\n"
+    # Get chat history and context from related chats
+    async with async_read_session() as async_session_db:
+        chat_history = await _load_chat_history(
+            session_db, async_session_db, session_id, user_msg.id, history_limit
+        )
+        context_sessions, other_context_str = await _load_related_context(
+            session_db,
+            async_session_db,
+            current_user.id,
+            project_id,
+            session_id,
+            context_session_ids,
+            project_context_limit,
+        )
 
     # Prepare inputs for LangGraph Agent
     initial_state = {
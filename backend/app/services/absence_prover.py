@@ -1,8 +1,16 @@
 import re
+import time
 from typing import List, Optional, Any, Set
+from sqlalchemy import text
 from sqlmodel import Session, select
 from app.models.rag import Chunk, Document
 
+# Rows fetched per round trip by the Python fallback scan
+SCAN_BATCH_ROWS = 2000
+
+# Whether the pg_trgm index on chunk.content exists (checked once per process)
+_trigram_index_available: Optional[bool] = None
+
 class AbsenceProver:
     def __init__(self, session: Session):
         self.session = session
@@ -33,45 +41,121 @@ class AbsenceProver:
         """
         Run literal keyword scan across ALL chunks in project corpus.
         This is the deterministic absence proof.
+        
+        A chunk matches when it contains at least `min_keyword_matches` keywords
+        as case-insensitive substrings. On Postgres with the pg_trgm index from
+        add_postgres_fts.py this is an index lookup; otherwise chunks are
+        streamed and checked in Python.
         """
-        # Query ALL chunks and documents for this project
+        started = time.perf_counter()
+        if keywords and min_keyword_matches >= 1 and self._trigram_index_available():
+            proof = self._scan_trigram_index(keywords, project_id, min_keyword_matches)
+            proof["scan_method"] = "trigram_index"
+        else:
+            proof = self._scan_rows(keywords, project_id, min_keyword_matches)
+            proof["scan_method"] = "full_scan"
+        proof["scan_seconds"] = round(time.perf_counter() - started, 4)
+        return proof
+    
+    def _trigram_index_available(self) -> bool:
+        global _trigram_index_available
+        if _trigram_index_available is None:
+            if self.session.get_bind().dialect.name != "postgresql":
+                _trigram_index_available = False
+            else:
+                row = self.session.execute(
+                    text("SELECT 1 FROM pg_indexes WHERE indexname = 'ix_chunk_content_trgm'")
+                ).first()
+                _trigram_index_available = row is not None
+        return _trigram_index_available
+    
+    def _scan_trigram_index(self, keywords: List[str], project_id: int, min_keyword_matches: int) -> dict:
+        params = {"project_id": project_id, "min_matches": min_keyword_matches}
+        conditions = []
+        for i, kw in enumerate(keywords):
+            escaped = kw.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params[f"kw{i}"] = f"%{escaped}%"
+            conditions.append(f"c.content ILIKE :kw{i}")
+        # OR-ed ILIKEs become a BitmapOr over the trigram GIN index (ILIKE ANY cannot use it)
+        matched_cte = (
+            "WITH matched AS ("
+            "SELECT c.id, c.doc_id_version, c.content, d.filename, "
+            f"({' + '.join(f'({cond})::int' for cond in conditions)}) AS hits "
+            "FROM chunk c JOIN document d ON d.id = c.document_id "
+            "WHERE d.project_id = :project_id AND d.is_active = true "
+            f"AND ({' OR '.join(conditions)})"
+            ") "
+        )
+        
+        summary = self.session.execute(text(
+            matched_cte
+            + "SELECT count(*) AS n, "
+            "array_agg(DISTINCT filename) FILTER (WHERE coalesce(filename, '') <> '') AS sources "
+            "FROM matched WHERE hits >= :min_matches"
+        ), params).one()
+        samples = self.session.execute(text(
+            matched_cte
+            + "SELECT id, doc_id_version, filename, left(content, 150) AS preview "
+            "FROM matched WHERE hits >= :min_matches ORDER BY id LIMIT 5"
+        ), params).all()
+        total = self.session.execute(text(
+            "SELECT count(*) FROM chunk c JOIN document d ON d.id = c.document_id "
+            "WHERE d.project_id = :project_id AND d.is_active = true"
+        ), {"project_id": project_id}).scalar_one()
+        
+        return {
+            "keywords_searched": keywords,
+            "total_chunks_scanned": total,
+            "matching_chunk_count": summary.n,
+            "absence_proven": summary.n == 0,
+            "matching_sources": list(summary.sources or []),
+            "matching_chunks_sample": [
+                {
+                    "chunk_id": row.doc_id_version or f"chunk_{row.id}",
+                    "source": row.filename or "Unknown",
+                    "preview": row.preview
+                }
+                for row in samples
+            ]
+        }
+    
+    def _scan_rows(self, keywords: List[str], project_id: int, min_keyword_matches: int) -> dict:
+        # Only the needed columns, streamed rather than materialising every Chunk/Document
         statement = (
-            select(Chunk, Document)
+            select(Chunk.id, Chunk.doc_id_version, Chunk.content, Document.filename)
             .join(Document, Chunk.document_id == Document.id)
             .where(Document.project_id == project_id)
             .where(Document.is_active == True)
+            .execution_options(yield_per=SCAN_BATCH_ROWS)
         )
+        lowered = [kw.lower() for kw in keywords]
         
-        results = self.session.exec(statement).all()
-        total = len(results)
-        
-        matching_chunks = []
+        total = 0
+        matching_count = 0
         matching_sources = set()
-        
-        for chunk, doc in results:
-            content_lower = chunk.content.lower()
-            matches = sum(1 for kw in keywords if kw.lower() in content_lower)
+        samples = []
+        for chunk_id, doc_id_version, content, filename in self.session.exec(statement):
+            total += 1
+            content_lower = content.lower()
+            matches = sum(1 for kw in lowered if kw in content_lower)
             if matches >= min_keyword_matches:
-                matching_chunks.append((chunk, doc))
-                if doc.filename:
-                    matching_sources.add(doc.filename)
-        
-        absence_proven = len(matching_chunks) == 0
+                matching_count += 1
+                if filename:
+                    matching_sources.add(filename)
+                if len(samples) < 5:  # Show max 5 samples
+                    samples.append({
+                        "chunk_id": doc_id_version or f"chunk_{chunk_id}",
+                        "source": filename or "Unknown",
+                        "preview": content[:150]
+                    })
         
         return {
             "keywords_searched": keywords,
             "total_chunks_scanned": total,
-            "matching_chunk_count": len(matching_chunks),
-            "absence_proven": absence_proven,
+            "matching_chunk_count": matching_count,
+            "absence_proven": matching_count == 0,
             "matching_sources": list(matching_sources),
-            "matching_chunks_sample": [
-                {
-                    "chunk_id": chunk.doc_id_version or f"chunk_{chunk.id}",
-                    "source": doc.filename or "Unknown",
-                    "preview": chunk.content[:150]
-                }
-                for chunk, doc in matching_chunks[:5]  # Show max 5 samples
-            ]
+            "matching_chunks_sample": samples
         }
     
     def prove_or_retry(
@@ -4,11 +4,70 @@ Selects optimal chunking strategy per document using 5 intrinsic metrics.
 No ground-truth QA required — purely structural scoring.
 """
 
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
 import re
 import math
+import threading
+
+from app.services.tokenizer_service import tokenizer
+
+logger = logging.getLogger(__name__)
+
+# Above this size strategies are scored on evenly spaced windows of the text,
+# then only the winner chunks the full document
+ADAPTIVE_SAMPLE_CHARS = int(os.getenv("ADAPTIVE_SAMPLE_CHARS", "200000"))
+ADAPTIVE_SAMPLE_WINDOWS = int(os.getenv("ADAPTIVE_SAMPLE_WINDOWS", "8"))
+ADAPTIVE_SAMPLE_WINDOW_CHARS = int(os.getenv("ADAPTIVE_SAMPLE_WINDOW_CHARS", "16000"))
+# Score candidate strategies in separate processes when the scored text is at least this long
+ADAPTIVE_PARALLEL_MIN_CHARS = int(os.getenv("ADAPTIVE_PARALLEL_MIN_CHARS", "64000"))
+ADAPTIVE_EVAL_WORKERS = int(os.getenv("ADAPTIVE_EVAL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Serial evaluation stops as soon as a strategy scores at least this well
+ADAPTIVE_EARLY_EXIT_SCORE = float(os.getenv("ADAPTIVE_EARLY_EXIT_SCORE", "0.9"))
+# Reuse the winning strategy per (project, document type); re-run the full evaluation every N documents
+ADAPTIVE_STRATEGY_RECHECK = int(os.getenv("ADAPTIVE_STRATEGY_RECHECK", "20"))
+
+Span = Tuple[int, int]  # [start, end) offsets into the source text
+
+_eval_pool: Optional[ProcessPoolExecutor] = None
+_strategy_cache: Dict[tuple, Tuple["ChunkStrategy", int]] = {}
+_strategy_cache_lock = threading.Lock()
+
+BLOCK_PATTERNS = [
+    re.compile(r'\|.+\|.+\|', re.MULTILINE),          # Markdown tables
+    re.compile(r'```[\s\S]+?```', re.MULTILINE),       # Code blocks
+    re.compile(r'^\s*[-*]\s.+$', re.MULTILINE),        # List items
+    re.compile(r'^\d+\.\s.+$', re.MULTILINE),          # Numbered lists
+]
+PAGE_BREAK = re.compile(r'\f|\n{3,}|--- ?[Pp]age \d+')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+FRAGMENT_BREAK = re.compile(r'\n\n|\n(?=[A-Z])|(?<=[.!?])\s+(?=[A-Z])')
+
+
+def _split_spans(pattern: "re.Pattern", text: str, base: int = 0) -> List[Span]:
+    """Spans of the pieces re.split(pattern, text) would return."""
+    spans = []
+    pos = 0
+    for match in pattern.finditer(text):
+        spans.append((base + pos, base + match.start()))
+        pos = match.end()
+    spans.append((base + pos, base + len(text)))
+    return spans
+
+
+def _strip_span(text: str, start: int, end: int) -> Span:
+    """Narrow a span of `text` the way str.strip() narrows the slice."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
 
 class ChunkStrategy(Enum):
     PAGE_BASED = "page_based"
@@ -41,6 +100,11 @@ class AdaptiveChunker:
     Selects optimal chunking strategy per document.
     Runs all 4 strategies, scores each with 5 intrinsic metrics,
     returns best strategy + its chunks + metrics for admin display.
+
+    Large documents are scored on a sample, strategies are scored in parallel
+    (or serially with early exit for small inputs), and the winner is cached
+    per (project, document type). Every strategy also reports the source
+    span of each chunk so block integrity is an interval check.
     """
     
     def __init__(
@@ -56,7 +120,8 @@ class AdaptiveChunker:
     def select_and_chunk(
         self, 
         text: str, 
-        document_type: str = "unknown"
+        document_type: str = "unknown",
+        project_id: Optional[int] = None,
     ) -> Tuple[List[str], ChunkStrategy, ChunkQualityMetrics, dict]:
         """
         Main entry point. Returns:
@@ -65,112 +130,336 @@ class AdaptiveChunker:
         - metrics: ChunkQualityMetrics (best strategy's metrics)
         - all_scores: dict (all strategies and their scores, for admin display)
         """
-        candidates = {
-            ChunkStrategy.PAGE_BASED: self._page_based_chunk(text),
-            ChunkStrategy.RECURSIVE: self._recursive_chunk(text),
-            ChunkStrategy.SEMANTIC: self._semantic_chunk(text),
-            ChunkStrategy.SPLIT_THEN_MERGE: self._split_then_merge_chunk(text),
-        }
-        
-        scores = {}
-        for strategy, chunks in candidates.items():
+        if not text.strip():
+            return [], ChunkStrategy.RECURSIVE, ChunkQualityMetrics(0.0, 0.0, 0.0, 1.0, 0.0), {}
+
+        cache_key = (project_id, document_type, self.chunk_size, self.chunk_overlap)
+        cached = self._cached_strategy(cache_key) if project_id is not None else None
+        if cached is not None:
+            chunks, spans = self._run_strategy(cached, text)
             if chunks:
-                metrics = self._score_chunks(chunks, text)
-                scores[strategy] = (chunks, metrics)
-        
+                metrics = self._score_chunks(chunks, spans, text)
+                entry = self._score_entry(metrics, chunks, cached=True)
+                return self._fit_token_limit(chunks), cached, metrics, {cached.value: entry}
+
+        sampled = len(text) > ADAPTIVE_SAMPLE_CHARS
+        scored_text = self._sample_text(text) if sampled else text
+        scores = self._evaluate_strategies(scored_text, preferred=self._cache_hint(cache_key))
+        if not scores:
+            # Every strategy produced nothing (e.g. blank text)
+            return [], ChunkStrategy.RECURSIVE, ChunkQualityMetrics(0.0, 0.0, 0.0, 1.0, 0.0), {}
+
         # Select strategy with highest composite score
         best_strategy = max(scores.keys(), key=lambda s: scores[s][1].composite_score)
-        best_chunks, best_metrics = scores[best_strategy]
-        
+        if sampled:
+            best_chunks, best_spans = self._run_strategy(best_strategy, text)
+            best_metrics = self._score_chunks(best_chunks, best_spans, text)
+        else:
+            best_chunks, best_metrics = scores[best_strategy]
+
         all_scores = {
-            s.value: {
-                "composite": m.composite_score,
-                "size_compliance": m.size_compliance,
-                "intrachunk_cohesion": m.intrachunk_cohesion,
-                "contextual_coherence": m.contextual_coherence,
-                "block_integrity": m.block_integrity,
-                "reference_completeness": m.reference_completeness,
-                "chunk_count": len(c)
-            }
+            s.value: self._score_entry(m, c, sampled=sampled and s != best_strategy)
             for s, (c, m) in scores.items()
         }
-        
-        return best_chunks, best_strategy, best_metrics, all_scores
-    
-    def _page_based_chunk(self, text: str) -> List[str]:
+        all_scores[best_strategy.value] = self._score_entry(best_metrics, best_chunks)
+
+        if project_id is not None:
+            self._remember_strategy(cache_key, best_strategy)
+        return self._fit_token_limit(best_chunks), best_strategy, best_metrics, all_scores
+
+    def _fit_token_limit(self, chunks: List[str]) -> List[str]:
+        """Split any chunk over the embedding model's token limit (counted with the real tokenizer)."""
+        counts = tokenizer.count_batch(chunks)
+        if all(n <= self.max_tokens for n in counts):
+            return chunks
+        fitted = []
+        for chunk, n in zip(chunks, counts):
+            if n <= self.max_tokens:
+                fitted.append(chunk)
+            else:
+                fitted.extend(tokenizer.split_to_limit(chunk, self.max_tokens))
+        return fitted
+
+    def select_strategy(
+        self,
+        text: str,
+        document_type: str = "unknown",
+        project_id: Optional[int] = None,
+    ) -> Tuple[ChunkStrategy, ChunkQualityMetrics, dict]:
+        """
+        Pick a strategy without chunking the whole document: strategies are
+        scored on a sample (or the cached winner is re-scored on it). Used by
+        the streaming indexer together with iter_chunks().
+        """
+        cache_key = (project_id, document_type, self.chunk_size, self.chunk_overlap)
+        sample = self._sample_text(text) if len(text) > ADAPTIVE_SAMPLE_CHARS else text
+        cached = self._cached_strategy(cache_key) if project_id is not None else None
+        if cached is not None:
+            chunks, spans = self._run_strategy(cached, sample)
+            if chunks:
+                metrics = self._score_chunks(chunks, spans, sample)
+                return cached, metrics, {cached.value: self._score_entry(metrics, chunks, cached=True, sampled=True)}
+
+        scores = self._evaluate_strategies(sample, preferred=self._cache_hint(cache_key))
+        if not scores:
+            return ChunkStrategy.RECURSIVE, ChunkQualityMetrics(0.0, 0.0, 0.0, 1.0, 0.0), {}
+        best_strategy = max(scores.keys(), key=lambda s: scores[s][1].composite_score)
+        if project_id is not None:
+            self._remember_strategy(cache_key, best_strategy)
+        all_scores = {s.value: self._score_entry(m, c, sampled=True) for s, (c, m) in scores.items()}
+        return best_strategy, scores[best_strategy][1], all_scores
+
+    def iter_chunks(
+        self, text: str, strategy: ChunkStrategy, section_chars: int = 256_000
+    ) -> Iterator[Tuple[str, int]]:
+        """
+        Lazily chunk `text` with one strategy, a section (cut at a paragraph
+        break) at a time, so only one section's chunks exist at once.
+        Yields (chunk, end offset of its section) for progress reporting.
+        """
+        pos = 0
+        while pos < len(text):
+            end = min(len(text), pos + section_chars)
+            if end < len(text):
+                brk = text.rfind("\n\n", pos + section_chars // 2, end)
+                if brk != -1:
+                    end = brk + 2
+            chunks, _ = self._run_strategy(strategy, text[pos:end])
+            for chunk in self._fit_token_limit(chunks):
+                yield chunk, end
+            pos = end
+
+    @staticmethod
+    def _score_entry(metrics: ChunkQualityMetrics, chunks: List[str], **flags) -> dict:
+        entry = {
+            "composite": metrics.composite_score,
+            "size_compliance": metrics.size_compliance,
+            "intrachunk_cohesion": metrics.intrachunk_cohesion,
+            "contextual_coherence": metrics.contextual_coherence,
+            "block_integrity": metrics.block_integrity,
+            "reference_completeness": metrics.reference_completeness,
+            "chunk_count": len(chunks)
+        }
+        entry.update({k: v for k, v in flags.items() if v})
+        return entry
+
+    def _run_strategy(self, strategy: ChunkStrategy, text: str) -> Tuple[List[str], List[Span]]:
+        if strategy == ChunkStrategy.PAGE_BASED:
+            return self._page_based_chunk(text)
+        if strategy == ChunkStrategy.RECURSIVE:
+            return self._recursive_chunk(text)
+        if strategy == ChunkStrategy.SEMANTIC:
+            return self._semantic_chunk(text)
+        return self._split_then_merge_chunk(text)
+
+    def _evaluate_strategies(
+        self, text: str, preferred: Optional[ChunkStrategy] = None
+    ) -> Dict[ChunkStrategy, Tuple[List[str], ChunkQualityMetrics]]:
+        """
+        Chunk + score every strategy. Long inputs fan out to the evaluation
+        pool; short ones run in-process, trying `preferred` first and stopping
+        early once a strategy reaches ADAPTIVE_EARLY_EXIT_SCORE.
+        """
+        strategies = list(ChunkStrategy)
+        if ADAPTIVE_EVAL_WORKERS > 1 and len(text) >= ADAPTIVE_PARALLEL_MIN_CHARS:
+            try:
+                pool = _get_eval_pool()
+                futures = {
+                    strategy: pool.submit(
+                        _evaluate_strategy, self.chunk_size, self.chunk_overlap, self.max_tokens, strategy, text
+                    )
+                    for strategy in strategies
+                }
+                return {
+                    strategy: result
+                    for strategy, result in ((s, f.result()) for s, f in futures.items())
+                    if result[0]
+                }
+            except Exception as e:
+                logger.warning(f"Parallel chunk strategy evaluation failed, running serially: {e}")
+
+        if preferred is not None:
+            strategies.remove(preferred)
+            strategies.insert(0, preferred)
+        scores = {}
+        for strategy in strategies:
+            chunks, spans = self._run_strategy(strategy, text)
+            if not chunks:
+                continue
+            metrics = self._score_chunks(chunks, spans, text)
+            scores[strategy] = (chunks, metrics)
+            if metrics.composite_score >= ADAPTIVE_EARLY_EXIT_SCORE:
+                break
+        return scores
+
+    def _sample_text(self, text: str) -> str:
+        """Evenly spaced windows of the text, each starting at a paragraph break."""
+        windows = max(1, ADAPTIVE_SAMPLE_WINDOWS)
+        stride = len(text) // windows
+        parts = []
+        for i in range(windows):
+            start = i * stride
+            if start:
+                brk = text.find("\n\n", start, start + ADAPTIVE_SAMPLE_WINDOW_CHARS // 2)
+                start = brk + 2 if brk != -1 else start
+            parts.append(text[start:start + ADAPTIVE_SAMPLE_WINDOW_CHARS].strip())
+        return "\n\n".join(p for p in parts if p)
+
+    @staticmethod
+    def _cached_strategy(key: tuple) -> Optional[ChunkStrategy]:
+        """Cached winner for this key, or None when it is missing or due for a re-check."""
+        with _strategy_cache_lock:
+            entry = _strategy_cache.get(key)
+            if entry is None:
+                return None
+            strategy, uses = entry
+            if uses >= ADAPTIVE_STRATEGY_RECHECK:
+                return None
+            _strategy_cache[key] = (strategy, uses + 1)
+            return strategy
+
+    @staticmethod
+    def _cache_hint(key: tuple) -> Optional[ChunkStrategy]:
+        entry = _strategy_cache.get(key)
+        return entry[0] if entry else None
+
+    @staticmethod
+    def _remember_strategy(key: tuple, strategy: ChunkStrategy) -> None:
+        with _strategy_cache_lock:
+            _strategy_cache[key] = (strategy, 0)
+
+    def _page_based_chunk(self, text: str) -> Tuple[List[str], List[Span]]:
         """Split on page boundaries — best for legal/structured docs"""
-        pages = re.split(r'\f|\n{3,}|--- ?[Pp]age \d+', text)
-        chunks = []
-        for page in pages:
-            page = page.strip()
-            if len(page) > 50:
+        chunks, spans = [], []
+        for raw_start, raw_end in _split_spans(PAGE_BREAK, text):
+            start, end = _strip_span(text, raw_start, raw_end)
+            if end - start > 50:
                 # If page too long, split further
-                if len(page) > self.chunk_size * 4:
-                    chunks.extend(self._recursive_chunk(page))
+                if end - start > self.chunk_size * 4:
+                    sub_chunks, sub_spans = self._recursive_chunk(text, start, end)
+                    chunks.extend(sub_chunks)
+                    spans.extend(sub_spans)
                 else:
-                    chunks.append(page)
-        return chunks if chunks else self._recursive_chunk(text)
+                    chunks.append(text[start:end])
+                    spans.append((start, end))
+        return (chunks, spans) if chunks else self._recursive_chunk(text)
     
-    def _recursive_chunk(self, text: str) -> List[str]:
-        """LangChain-style recursive character splitting"""
-        separators = ["\n\n", "\n", ". ", " ", ""]
-        return self._recursive_split(text, separators)
+    RECURSIVE_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+    def _recursive_chunk(self, text: str, start: int = 0, end: Optional[int] = None) -> Tuple[List[str], List[Span]]:
+        """LangChain-style recursive character splitting of text[start:end]"""
+        end = len(text) if end is None else end
+        spans = self._recursive_split(text, start, end, self.RECURSIVE_SEPARATORS)
+        return self._with_overlap(text, spans), spans
     
-    def _recursive_split(self, text: str, separators: List[str]) -> List[str]:
-        if len(text) <= self.chunk_size:
-            return [text] if text.strip() else []
+    def _recursive_split(self, text: str, start: int, end: int, separators: List[str]) -> List[Span]:
+        """
+        Offset-based recursive split: works on index ranges of the original
+        string, so nothing is concatenated or copied while packing pieces.
+        Pieces joined by a separator are contiguous in the source, so a chunk
+        is just the range from its first piece to its last.
+        """
+        if end - start <= self.chunk_size:
+            return [(start, end)] if text[start:end].strip() else []
         
         separator = separators[0] if separators else ""
-        splits = text.split(separator) if separator else list(text)
+        if not separator:
+            # Character-level fallback: fixed windows of chunk_size
+            return [(i, min(i + self.chunk_size, end)) for i in range(start, end, self.chunk_size)]
         
-        chunks = []
-        current = ""
-        for split in splits:
-            if len(current) + len(split) + len(separator) <= self.chunk_size:
-                current += (separator if current else "") + split
+        spans: List[Span] = []
+        sep_len = len(separator)
+        current_start = current_end = start
+        has_current = False
+        pos = start
+        while pos <= end:
+            found = text.find(separator, pos, end)
+            split_end = found if found != -1 else end
+            split_len = split_end - pos
+            current_len = current_end - current_start if has_current else 0
+            if current_len + split_len + sep_len <= self.chunk_size:
+                if not has_current:
+                    current_start = pos
+                current_end = split_end
+                has_current = current_end > current_start
             else:
-                if current:
-                    chunks.append(current)
-                if len(split) > self.chunk_size and len(separators) > 1:
-                    chunks.extend(self._recursive_split(split, separators[1:]))
+                if has_current:
+                    spans.append((current_start, current_end))
+                has_current = False
+                if split_len > self.chunk_size and len(separators) > 1:
+                    spans.extend(self._recursive_split(text, pos, split_end, separators[1:]))
                 else:
-                    current = split
-        if current:
-            chunks.append(current)
-        
-        # Add overlap
-        if self.chunk_overlap > 0:
-            overlapped = []
-            for i, chunk in enumerate(chunks):
-                if i > 0:
-                    prev_words = chunks[i-1].split()[-self.chunk_overlap//10:]
-                    chunk = " ".join(prev_words) + " " + chunk
-                overlapped.append(chunk)
-            return overlapped
+                    current_start, current_end = pos, split_end
+                    has_current = split_len > 0
+            if found == -1:
+                break
+            pos = found + sep_len
+        if has_current:
+            spans.append((current_start, current_end))
+        return spans
+    
+    def _with_overlap(self, text: str, spans: List[Span]) -> List[str]:
+        """
+        Slice each chunk once and prefix the previous chunk's trailing words.
+        The words are found by scanning back from the previous span's end, so
+        the cost depends on the overlap, not on the chunk length.
+        """
+        if self.chunk_overlap <= 0:
+            return [text[s:e] for s, e in spans]
+        n_words = max(1, self.chunk_overlap // 10)
+        chunks = []
+        prev: Optional[Span] = None
+        for s, e in spans:
+            if prev is None:
+                chunks.append(text[s:e])
+            else:
+                chunks.append(" ".join(self._trailing_words(text, prev, n_words)) + " " + text[s:e])
+            prev = (s, e)
         return chunks
     
-    def _semantic_chunk(self, text: str) -> List[str]:
+    @staticmethod
+    def _trailing_words(text: str, span: Span, n_words: int) -> List[str]:
+        start, end = span
+        window = 32 * n_words
+        while True:
+            lo = max(start, end - window)
+            words = text[lo:end].split()
+            # The first word of a window may be cut, so only trust it at the span start
+            if lo == start or len(words) > n_words:
+                return words[-n_words:]
+            window *= 2
+    
+    def _semantic_chunk(self, text: str) -> Tuple[List[str], List[Span]]:
         """
         Sentence-boundary aware chunking.
         Groups sentences until chunk_size reached, respects paragraph breaks.
         """
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        chunks = []
+        chunks, spans = [], []
         current_chunk = ""
+        current_start = current_end = 0
         
-        for sentence in sentences:
+        for start, end in _split_spans(SENTENCE_BREAK, text):
+            sentence = text[start:end]
+            if not sentence.strip():
+                continue
             if len(current_chunk) + len(sentence) <= self.chunk_size:
+                if not current_chunk:
+                    current_start = start
                 current_chunk += " " + sentence if current_chunk else sentence
+                current_end = end
             else:
                 if current_chunk:
                     chunks.append(current_chunk.strip())
+                    spans.append((current_start, current_end))
                 current_chunk = sentence
+                current_start, current_end = start, end
         
         if current_chunk:
             chunks.append(current_chunk.strip())
-        return chunks
+            spans.append((current_start, current_end))
+        return chunks, spans
     
-    def _split_then_merge_chunk(self, text: str) -> List[str]:
+    def _split_then_merge_chunk(self, text: str) -> Tuple[List[str], List[Span]]:
         """
         Ekimetrics split-then-merge: split aggressively, merge tiny fragments.
         Eliminates context-poor micro-chunks that waste retrieval slots.
@@ -178,38 +467,48 @@ class AdaptiveChunker:
         min_chunk_size = self.chunk_size // 4
         
         # Aggressive split first
-        raw_chunks = re.split(r'\n\n|\n(?=[A-Z])|(?<=[.!?])\s+(?=[A-Z])', text)
-        raw_chunks = [c.strip() for c in raw_chunks if c.strip()]
+        raw_spans = [_strip_span(text, s, e) for s, e in _split_spans(FRAGMENT_BREAK, text)]
+        raw_spans = [(s, e) for s, e in raw_spans if e > s]
         
         # Merge tiny fragments with neighbors
-        merged = []
+        merged, merged_spans = [], []
         buffer = ""
-        for chunk in raw_chunks:
+        buffer_start = buffer_end = 0
+        for start, end in raw_spans:
+            chunk = text[start:end]
             if len(buffer) + len(chunk) < self.chunk_size:
+                if not buffer:
+                    buffer_start = start
                 buffer += (" " + chunk if buffer else chunk)
+                buffer_end = end
                 # Merge if buffer still below minimum
                 if len(buffer) >= min_chunk_size:
                     merged.append(buffer)
+                    merged_spans.append((buffer_start, buffer_end))
                     buffer = ""
             else:
                 if buffer:
                     merged.append(buffer)
+                    merged_spans.append((buffer_start, buffer_end))
                 buffer = chunk
+                buffer_start, buffer_end = start, end
         if buffer:
             if merged and len(buffer) < min_chunk_size:
                 merged[-1] += " " + buffer  # Merge tiny tail into last chunk
+                merged_spans[-1] = (merged_spans[-1][0], buffer_end)
             else:
                 merged.append(buffer)
+                merged_spans.append((buffer_start, buffer_end))
         
-        return merged
+        return merged, merged_spans
     
-    def _score_chunks(self, chunks: List[str], original_text: str) -> ChunkQualityMetrics:
+    def _score_chunks(self, chunks: List[str], spans: List[Span], original_text: str) -> ChunkQualityMetrics:
         """Compute all 5 intrinsic metrics for a chunking strategy"""
         return ChunkQualityMetrics(
             size_compliance=self._score_size_compliance(chunks),
             intrachunk_cohesion=self._score_intrachunk_cohesion(chunks),
             contextual_coherence=self._score_contextual_coherence(chunks),
-            block_integrity=self._score_block_integrity(chunks, original_text),
+            block_integrity=self._score_block_integrity(spans, original_text),
             reference_completeness=self._score_reference_completeness(chunks),
         )
     
@@ -217,8 +516,7 @@ class AdaptiveChunker:
         """SC: what fraction of chunks are within embedding token limits"""
         if not chunks:
             return 0.0
-        # Estimate tokens: ~4 chars per token
-        compliant = sum(1 for c in chunks if len(c) / 4 <= self.max_tokens)
+        compliant = sum(1 for n in tokenizer.count_batch(chunks) if n <= self.max_tokens)
         return compliant / len(chunks)
     
     def _score_intrachunk_cohesion(self, chunks: List[str]) -> float:
@@ -266,29 +564,31 @@ class AdaptiveChunker:
         
         return sum(scores) / len(scores) if scores else 0.5
     
-    def _score_block_integrity(self, chunks: List[str], original_text: str) -> float:
+    def _score_block_integrity(self, spans: List[Span], original_text: str) -> float:
         """
         BI: are structural blocks (tables, code, lists) kept whole?
-        Detect blocks in original, check if they're split across chunks.
+        Detect blocks in original, check if each block's fingerprint (first
+        100 chars) lies inside a single chunk's source span.
         """
-        # Detect structured blocks
-        block_patterns = [
-            r'\|.+\|.+\|',           # Markdown tables
-            r'```[\s\S]+?```',        # Code blocks
-            r'^\s*[-*]\s.+$',         # List items
-            r'^\d+\.\s.+$',           # Numbered lists
-        ]
+        ordered = sorted(spans)
+        starts = [s for s, _ in ordered]
+        # reach[i] = furthest end among chunks starting at or before starts[i]
+        reach = []
+        furthest = -1
+        for _, end in ordered:
+            furthest = max(furthest, end)
+            reach.append(furthest)
         
         blocks_found = 0
         blocks_intact = 0
         
-        for pattern in block_patterns:
-            matches = re.findall(pattern, original_text, re.MULTILINE)
-            for match in matches:
+        for pattern in BLOCK_PATTERNS:
+            for match in pattern.finditer(original_text):
                 blocks_found += 1
-                # Check if this block appears intact in any single chunk
-                match_clean = match.strip()[:100]  # First 100 chars as fingerprint
-                if any(match_clean in chunk for chunk in chunks):
+                start, end = _strip_span(original_text, match.start(), match.end())
+                end = min(end, start + 100)  # First 100 chars as fingerprint
+                i = bisect_right(starts, start) - 1
+                if i >= 0 and reach[i] >= end:
                     blocks_intact += 1
         
         if blocks_found == 0:
@@ -324,5 +624,31 @@ class AdaptiveChunker:
         return 1.0 - (orphan_pronoun_chunks / len(chunks))
 
 
+def _get_eval_pool() -> ProcessPoolExecutor:
+    """
+    Shared pool for parallel strategy scoring. Spawned like the parse pool: it
+    is created from ingest worker threads, and forking while other threads
+    hold locks can deadlock the children.
+    """
+    global _eval_pool
+    if _eval_pool is None:
+        _eval_pool = ProcessPoolExecutor(
+            max_workers=ADAPTIVE_EVAL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _eval_pool
+
+
+def _evaluate_strategy(
+    chunk_size: int, chunk_overlap: int, max_tokens: int, strategy: ChunkStrategy, text: str
+) -> Tuple[List[str], ChunkQualityMetrics]:
+    """Process-pool entry point: chunk + score one strategy."""
+    chunker = AdaptiveChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap, max_tokens=max_tokens)
+    chunks, spans = chunker._run_strategy(strategy, text)
+    if not chunks:
+        return [], ChunkQualityMetrics(0.0, 0.0, 0.0, 0.0, 0.0)
+    return chunks, chunker._score_chunks(chunks, spans, text)
+
+
 def get_adaptive_chunker(chunk_size: int = 1000, chunk_overlap: int = 200) -> AdaptiveChunker:
     return AdaptiveChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
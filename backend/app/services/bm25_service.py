@@ -1,14 +1,23 @@
 import pickle
 import os
 import re
+import json
+from collections import Counter
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+# Share of tombstoned corpus entries at which soft deletes schedule a compaction
+BM25_COMPACT_TOMBSTONE_RATIO = float(os.getenv("BM25_COMPACT_TOMBSTONE_RATIO", "0.2"))
+
 class BM25IndexManager:
     """
     Manages per-project BM25 indexes alongside existing FAISS indexes.
     Each project has its own BM25 index stored as a pickle file.
     Mirrors the FAISS per-project isolation pattern.
+
+    Deleted documents are tombstoned rather than rebuilt: their corpus
+    positions go to a small sidecar file and are skipped by search until a
+    compaction rebuilds the index.
     """
 
     def __init__(self, index_dir: str = "faiss_index"):
@@ -16,10 +25,24 @@ class BM25IndexManager:
         self.index_dir.mkdir(exist_ok=True)
         self._cache: dict[str, any] = {}
         self._corpus_cache: dict[str, list[str]] = {}
+        self._tombstone_cache: dict[str, Tuple[float, set[int]]] = {}
+        self._mtimes: dict[str, float] = {}
 
     def _index_path(self, project_id: str) -> Path:
         return self.index_dir / f"bm25_{project_id}.pkl"
 
+    def _tombstone_path(self, project_id: str) -> Path:
+        return self.index_dir / f"bm25_{project_id}.tombstones.json"
+
+    def _clear_tombstones(self, project_id: str) -> None:
+        path = self._tombstone_path(project_id)
+        if path.exists():
+            try:
+                path.unlink()
+            except Exception:
+                pass
+        self._tombstone_cache.pop(project_id, None)
+
     def _tokenize(self, text: str) -> list[str]:
         """Simple tokenizer — lowercase, split on non-alphanumeric."""
         return re.findall(r'\b\w+\b', text.lower())
@@ -40,21 +63,30 @@ class BM25IndexManager:
         # Update cache
         self._cache[project_id] = bm25
         self._corpus_cache[project_id] = chunks
+        self._mtimes[project_id] = self._index_path(project_id).stat().st_mtime
+        # A fresh build only contains live chunks
+        self._clear_tombstones(project_id)
 
     def load_index(self, project_id: str) -> Optional[Tuple[any, list[str]]]:
-        """Load BM25 index from disk (with in-memory cache)."""
-        if project_id in self._cache:
-            return self._cache[project_id], self._corpus_cache[project_id]
-
+        """
+        Load BM25 index from disk (with in-memory cache). The cache is keyed on
+        the file's mtime so rebuilds by the ingest worker are picked up; tombstone
+        positions are only meaningful against the current corpus.
+        """
         path = self._index_path(project_id)
-        if not path.exists():
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
             return None
+        if project_id in self._cache and self._mtimes.get(project_id) == mtime:
+            return self._cache[project_id], self._corpus_cache[project_id]
 
         try:
             with open(path, 'rb') as f:
                 data = pickle.load(f)
             self._cache[project_id] = data["bm25"]
             self._corpus_cache[project_id] = data["corpus"]
+            self._mtimes[project_id] = mtime
             return data["bm25"], data["corpus"]
         except Exception:
             return None
@@ -77,15 +109,73 @@ class BM25IndexManager:
         tokenized_query = self._tokenize(query)
         scores = bm25.get_scores(tokenized_query)
 
-        # Get top_k indices by score
+        # Get top_k indices by score, skipping tombstoned chunks
+        tombstones = self.load_tombstones(project_id)
+        candidates = range(len(scores))
+        if tombstones:
+            candidates = [i for i in candidates if i not in tombstones]
         top_indices = sorted(
-            range(len(scores)),
+            candidates,
             key=lambda i: scores[i],
             reverse=True
         )[:top_k]
 
         return [(corpus[i], float(scores[i])) for i in top_indices]
 
+    def load_tombstones(self, project_id: str) -> set[int]:
+        """Tombstoned corpus positions (re-read when another process updated the file)."""
+        path = self._tombstone_path(project_id)
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            self._tombstone_cache.pop(project_id, None)
+            return set()
+        cached = self._tombstone_cache.get(project_id)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, 'r') as f:
+                tombstones = set(json.load(f))
+        except Exception:
+            tombstones = set()
+        self._tombstone_cache[project_id] = (mtime, tombstones)
+        return tombstones
+
+    def tombstone(self, project_id: str, chunks: List[str]) -> int:
+        """
+        Mark the corpus entries of deleted chunks as dead, one entry per chunk
+        (duplicate texts of other documents stay searchable).
+        Returns the number of entries newly tombstoned.
+        """
+        result = self.load_index(project_id)
+        if result is None or not chunks:
+            return 0
+
+        _, corpus = result
+        remaining = Counter(chunks)
+        tombstones = set(self.load_tombstones(project_id))
+        added = 0
+        for i, text in enumerate(corpus):
+            if remaining.get(text) and i not in tombstones:
+                tombstones.add(i)
+                remaining[text] -= 1
+                added += 1
+        if added:
+            path = self._tombstone_path(project_id)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, 'w') as f:
+                json.dump(sorted(tombstones), f)
+            os.replace(tmp, path)
+            self._tombstone_cache[project_id] = (path.stat().st_mtime, tombstones)
+        return added
+
+    def tombstone_ratio(self, project_id: str) -> float:
+        """Share of the project's corpus that is tombstoned (0.0 without an index)."""
+        result = self.load_index(project_id)
+        if result is None or not result[1]:
+            return 0.0
+        return len(self.load_tombstones(project_id)) / len(result[1])
+
     def delete_index(self, project_id: str) -> None:
         """Delete BM25 index when project is deleted or re-chunked."""
         path = self._index_path(project_id)
@@ -96,6 +186,8 @@ class BM25IndexManager:
                 pass
         self._cache.pop(project_id, None)
         self._corpus_cache.pop(project_id, None)
+        self._mtimes.pop(project_id, None)
+        self._clear_tombstones(project_id)
 
     def index_exists(self, project_id: str) -> bool:
         return self._index_path(project_id).exists()
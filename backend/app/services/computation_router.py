@@ -26,6 +26,24 @@ class ComputationRouter:
         r"tell me about|describe|explain)",
     ]
     
+    # Fact aggregation over ChunkFact rows: (signal, SQL function)
+    AGGREGATE_SIGNALS = [
+        (r"\b(total|sum)\b", "sum"),
+        (r"\b(average|mean)\b", "avg"),
+        (r"\b(maximum|highest|largest|max)\b", "max"),
+        (r"\b(minimum|lowest|smallest|min)\b", "min"),
+        (r"\b(count of|number of)\b", "count"),
+    ]
+    FACT_TYPE_SIGNALS = [
+        (r"(\$|\b(dollars?|amounts?|costs?|prices?|fees?|payments?|revenue|spend)\b)", "money"),
+        (r"(%|\b(percent|percentages?|rates?)\b)", "percentage"),
+        (r"\b(days|weeks|months|years|hours|durations?|periods?)\b", "duration"),
+    ]
+    # Only corpus-wide questions are answered from facts; "the total fee in the
+    # contract" needs retrieval to know which amount is the fee
+    SCOPE_SIGNAL = r"\b(all|across|every|each|documents|files|project)\b"
+    DURATION_UNITS = ("hours", "days", "weeks", "months", "years")
+    
     def route(self, query: str) -> dict:
         query_lower = query.lower().strip()
         
@@ -95,6 +113,77 @@ class ComputationRouter:
                 "answer": f"There are {count} documents in this project."
             }
         
+        fact_answer = self._aggregate_facts(query_lower, project_id, db)
+        if fact_answer:
+            return fact_answer
+        
         # Cannot do full-scan aggregation on unstructured text
         # Return None to fall back to retrieval with warning
         return None
+    
+    def _aggregate_facts(self, query_lower: str, project_id: int, db) -> Optional[dict]:
+        """
+        sum/avg/min/max/count over typed facts extracted at ingest (ChunkFact),
+        for corpus-wide questions such as "total of all payment amounts across
+        documents". Returns None when the question or the data doesn't fit.
+        """
+        aggregate = next((fn for pattern, fn in self.AGGREGATE_SIGNALS if re.search(pattern, query_lower)), None)
+        fact_type = next((ft for pattern, ft in self.FACT_TYPE_SIGNALS if re.search(pattern, query_lower)), None)
+        if not aggregate or not fact_type or not re.search(self.SCOPE_SIGNAL, query_lower):
+            return None
+        
+        from sqlmodel import select, func
+        from app.models.rag import ChunkFact, Document
+        
+        value_expr = (
+            func.count(ChunkFact.id) if aggregate == "count"
+            else getattr(func, aggregate)(ChunkFact.numeric_value)
+        )
+        statement = (
+            select(
+                ChunkFact.unit,
+                value_expr,
+                func.count(ChunkFact.id),
+                func.count(func.distinct(ChunkFact.document_id))
+            )
+            .join(Document, Document.id == ChunkFact.document_id)
+            .where(Document.project_id == project_id)
+            .where(Document.is_active == True)
+            .where(ChunkFact.fact_type == fact_type)
+            .where(ChunkFact.numeric_value.is_not(None))
+            .group_by(ChunkFact.unit)
+        )
+        if fact_type == "duration":
+            unit = next((u for u in self.DURATION_UNITS if u in query_lower), None)
+            if unit:
+                statement = statement.where(ChunkFact.unit == unit)
+        
+        try:
+            rows = db.exec(statement).all()
+        except Exception:
+            db.rollback()
+            return None
+        rows = [r for r in rows if r[1] is not None]
+        if not rows:
+            return None
+        
+        label = {"sum": "Total", "avg": "Average", "max": "Maximum", "min": "Minimum", "count": "Number"}[aggregate]
+        parts = []
+        for unit, value, mentions, documents in rows:
+            shown = value if aggregate == "count" else self._format_fact_value(fact_type, unit, value)
+            parts.append(f"{shown} ({mentions} mentions in {documents} documents)")
+        
+        return {
+            "answer_type": "computation",
+            "computation_method": "sql_fact_aggregate",
+            "note": "Aggregated over every extracted mention of this fact type, not vector search",
+            "answer": f"{label} of {fact_type} values: " + "; ".join(parts) + "."
+        }
+    
+    @staticmethod
+    def _format_fact_value(fact_type: str, unit: Optional[str], value: float) -> str:
+        if fact_type == "money":
+            return f"${value:,.2f}"
+        if fact_type == "percentage":
+            return f"{value:g}%"
+        return f"{value:g} {unit or ''}".strip()
@@ -6,7 +6,7 @@ not that the model never tries, but that we refuse when retrieval confidence is
 """
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, FrozenSet, List, Optional
 import time
 
 @dataclass 
@@ -60,9 +60,12 @@ class SourceConfidenceGate:
         chunks: List[dict],             # Retrieved chunks with metadata
         reranker_scores: List[float],   # BGE reranker scores (aligned with chunks)
         document_metadata: List[dict],  # File type, upload date per chunk
+        token_cache: Optional[Dict[str, FrozenSet[str]]] = None,  # Reused across gate runs of one request
     ) -> ConfidenceGateResult:
         
         chunk_confidences = []
+        texts = [c.get("text", c.get("content", "")) for c in chunks]
+        agreement_scores = self._compute_agreements(texts, token_cache)
         
         for i, (chunk, rerank_score) in enumerate(zip(chunks, reranker_scores)):
             meta = document_metadata[i] if i < len(document_metadata) else {}
@@ -81,10 +84,7 @@ class SourceConfidenceGate:
             authority_score = AUTHORITY_SCORES.get(file_type, 0.5)
             
             # Agreement: how much does this chunk agree with others?
-            agreement_score = self._compute_agreement(
-                chunk.get("text", chunk.get("content", "")), 
-                [c.get("text", c.get("content", "")) for j, c in enumerate(chunks) if j != i]
-            )
+            agreement_score = agreement_scores[i]
             
             chunk_confidences.append(ChunkConfidence(
                 chunk_id=str(chunk.get("id", i)),
@@ -153,25 +153,46 @@ class SourceConfidenceGate:
         except:
             return 0.5
     
-    def _compute_agreement(self, chunk_text: str, other_texts: List[str]) -> float:
-        """Measure lexical agreement between this chunk and others"""
-        if not other_texts:
-            return 0.5
+    def _compute_agreements(
+        self, texts: List[str], token_cache: Optional[Dict[str, FrozenSet[str]]] = None
+    ) -> List[float]:
+        """
+        Lexical agreement of every chunk with the others: mean Jaccard with (up
+        to) the first 5 other chunks. Each text is tokenised once (or taken
+        from token_cache) and each pair's Jaccard is computed once.
+        """
+        if token_cache is None:
+            token_cache = {}
+        token_sets = []
+        for text in texts:
+            tokens = token_cache.get(text)
+            if tokens is None:
+                tokens = frozenset(text.lower().split())
+                token_cache[text] = tokens
+            token_sets.append(tokens)
         
-        chunk_words = set(chunk_text.lower().split())
-        agreements = []
-        for other in other_texts[:5]:  # Compare with up to 5 others
-            other_words = set(other.lower().split())
-            if not other_words:
+        n = len(texts)
+        pair_jaccard: Dict[tuple, float] = {}
+        scores = []
+        for i in range(n):
+            if n == 1:
+                scores.append(0.5)
                 continue
-            # Jaccard similarity
-            intersection = chunk_words & other_words
-            union = chunk_words | other_words
-            if union:
-                agreements.append(len(intersection) / len(union))
-        
-        return sum(agreements) / len(agreements) if agreements else 0.5
-
+            agreements = []
+            others = [j for j in range(min(n, 6)) if j != i][:5]  # Compare with up to 5 others
+            for j in others:
+                if not token_sets[j]:
+                    continue
+                key = (i, j) if i < j else (j, i)
+                jaccard = pair_jaccard.get(key)
+                if jaccard is None:
+                    intersection = len(token_sets[i] & token_sets[j])
+                    union = len(token_sets[i]) + len(token_sets[j]) - intersection
+                    jaccard = intersection / union
+                    pair_jaccard[key] = jaccard
+                agreements.append(jaccard)
+            scores.append(sum(agreements) / len(agreements) if agreements else 0.5)
+        return scores
 
 def get_confidence_gate(threshold: float = CONFIDENCE_THRESHOLD) -> SourceConfidenceGate:
     return SourceConfidenceGate(threshold=threshold)
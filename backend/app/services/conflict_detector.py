@@ -1,7 +1,11 @@
 import re
-from typing import List, Optional, Dict, Any
+import logging
+from collections import defaultdict
+from typing import List, Optional, Dict, Any, FrozenSet, Tuple
 from itertools import combinations
 
+logger = logging.getLogger(__name__)
+
 class ConflictDetector:
     # Signals that often indicate factual claims that can conflict
     FACTUAL_SIGNALS = [
@@ -13,6 +17,11 @@ class ConflictDetector:
         r"\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},?\s+\d{4}\b",  # month day year
         r"\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{4}\b",  # month+year
     ]
+    COMPILED_SIGNALS = [re.compile(p, re.IGNORECASE) for p in FACTUAL_SIGNALS]
+    
+    def __init__(self, session=None):
+        # With a DB session, facts extracted at ingest (ChunkFact) are read instead of regexing chunk text
+        self.session = session
     
     def detect_conflicts(
         self, 
@@ -37,19 +46,22 @@ class ConflictDetector:
                 parsed_chunks.append({
                     "content": doc.page_content,
                     "source": doc.metadata.get("source", f"document_{i}"),
-                    "id": str(doc.metadata.get("doc_id_version") or doc.metadata.get("doc_id") or i)
+                    "id": str(doc.metadata.get("doc_id_version") or doc.metadata.get("doc_id") or i),
+                    "doc_id_version": doc.metadata.get("doc_id_version")
                 })
             elif hasattr(item, "page_content"):
                 parsed_chunks.append({
                     "content": item.page_content,
                     "source": item.metadata.get("source", f"document_{i}"),
-                    "id": str(item.metadata.get("doc_id_version") or item.metadata.get("doc_id") or i)
+                    "id": str(item.metadata.get("doc_id_version") or item.metadata.get("doc_id") or i),
+                    "doc_id_version": item.metadata.get("doc_id_version")
                 })
             elif isinstance(item, dict):
                 parsed_chunks.append({
                     "content": item.get("content") or item.get("text") or "",
                     "source": item.get("source") or f"chunk_{i}",
-                    "id": str(item.get("id") or item.get("doc_id_version") or i)
+                    "id": str(item.get("id") or item.get("doc_id_version") or i),
+                    "doc_id_version": item.get("doc_id_version")
                 })
 
         if len(parsed_chunks) < 2:
@@ -62,16 +74,26 @@ class ConflictDetector:
         
         conflict_pairs = []
         
-        # Check all chunk pairs for contradictions
-        for i, j in combinations(range(len(parsed_chunks)), 2):
+        # Extract typed values once per chunk, then only pair up chunks that
+        # mention the same fact type with different values
+        stored = self._load_stored_facts([c["doc_id_version"] for c in parsed_chunks if c["doc_id_version"]])
+        facts = [
+            stored[c["doc_id_version"]] if c["doc_id_version"] in stored else self._extract_facts(c["content"])
+            for c in parsed_chunks
+        ]
+        pair_types = self._conflicting_pairs(facts)
+        
+        for i, j in sorted(pair_types):
             chunk_a = parsed_chunks[i]
             chunk_b = parsed_chunks[j]
-            
-            conflicts = self._find_value_conflicts(
-                chunk_a["content"],
-                chunk_b["content"],
-                query
-            )
+            conflicts = [
+                {
+                    "pattern_type": self.FACTUAL_SIGNALS[t],
+                    "values_in_chunk_a": list(facts[i][t]),
+                    "values_in_chunk_b": list(facts[j][t])
+                }
+                for t in pair_types[(i, j)]
+            ]
             
             if conflicts:
                 conflict_pairs.append({
@@ -99,31 +121,68 @@ class ConflictDetector:
             "conflicting_chunk_ids": conflicting_ids
         }
     
-    def _find_value_conflicts(
-        self, 
-        text_a: str, 
-        text_b: str,
-        query: str
-    ) -> List[dict]:
+    def _extract_facts(self, text: str) -> Dict[int, FrozenSet[str]]:
+        """Normalised values per FACTUAL_SIGNALS index (types with no value are omitted)."""
+        facts = {}
+        for t, pattern in enumerate(self.COMPILED_SIGNALS):
+            values = frozenset(
+                v.lower().strip() for v in pattern.findall(text) if isinstance(v, str) and v.strip()
+            )
+            if values:
+                facts[t] = values
+        return facts
+    
+    def _load_stored_facts(self, doc_id_versions: List[str]) -> Dict[str, Dict[int, FrozenSet[str]]]:
         """
-        Extract factual values from both texts and compare.
-        Returns list of conflicting value pairs.
+        Facts of already-extracted chunks keyed by doc_id_version, in the
+        _extract_facts shape. Chunks missing here are regexed instead.
         """
-        conflicts = []
+        if self.session is None or not doc_id_versions:
+            return {}
+        from sqlmodel import select
+        from app.models.rag import Chunk, ChunkFact
         
-        for pattern in self.FACTUAL_SIGNALS:
-            values_a = set(v.lower().strip() for v in re.findall(pattern, text_a, re.IGNORECASE) if isinstance(v, str) and v.strip())
-            values_b = set(v.lower().strip() for v in re.findall(pattern, text_b, re.IGNORECASE) if isinstance(v, str) and v.strip())
-            
-            # If both chunks mention the same type of fact but different values
-            if values_a and values_b and values_a != values_b:
-                conflicts.append({
-                    "pattern_type": pattern,
-                    "values_in_chunk_a": list(values_a),
-                    "values_in_chunk_b": list(values_b)
-                })
+        try:
+            rows = self.session.exec(
+                select(Chunk.doc_id_version, Chunk.fact_count, ChunkFact.signal_index, ChunkFact.value)
+                .outerjoin(ChunkFact, ChunkFact.chunk_id == Chunk.id)
+                .where(Chunk.doc_id_version.in_(doc_id_versions))
+            ).all()
+        except Exception as e:
+            logger.warning(f"Stored facts unavailable, extracting from text: {e}")
+            self.session.rollback()
+            return {}
         
-        return conflicts
+        grouped: Dict[str, Dict[int, set]] = {}
+        for doc_id_version, fact_count, signal_index, value in rows:
+            if fact_count is None:
+                continue
+            chunk_facts = grouped.setdefault(doc_id_version, defaultdict(set))
+            if signal_index is not None:
+                chunk_facts[signal_index].add(value)
+        return {
+            key: {t: frozenset(values) for t, values in chunk_facts.items()}
+            for key, chunk_facts in grouped.items()
+        }
+    
+    def _conflicting_pairs(self, facts: List[Dict[int, FrozenSet[str]]]) -> Dict[Tuple[int, int], List[int]]:
+        """
+        (i, j) -> conflicting fact types, in FACTUAL_SIGNALS order. Chunks are
+        bucketed by type and, within a type, grouped by their value set; only
+        chunks from different groups conflict, so agreeing chunks and chunks
+        without a shared type are never compared.
+        """
+        pair_types: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for t in range(len(self.FACTUAL_SIGNALS)):
+            groups: Dict[FrozenSet[str], List[int]] = defaultdict(list)
+            for idx, chunk_facts in enumerate(facts):
+                if t in chunk_facts:
+                    groups[chunk_facts[t]].append(idx)
+            for members_a, members_b in combinations(groups.values(), 2):
+                for a in members_a:
+                    for b in members_b:
+                        pair_types[(a, b) if a < b else (b, a)].append(t)
+        return pair_types
     
     def _classify_conflict(self, conflicts: List[dict]) -> str:
         """Classify the type of conflict for display."""
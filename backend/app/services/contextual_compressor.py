@@ -1,6 +1,37 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import re
 
+from app.services.tokenizer_service import tokenizer
+
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+# A break right after one of these is not a sentence end
+ABBREVIATION_END = re.compile(r"\b(?:Mr|Mrs|Dr|Prof|Sr|Jr|vs|etc|i\.e|e\.g)\.$")
+MIN_SENTENCE_WORDS = 4
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    (start, end) offsets of the sentences in `text`, stripped of surrounding
+    whitespace, skipping fragments shorter than MIN_SENTENCE_WORDS words.
+    Computed once per chunk at ingest time (Chunk.sentence_spans) so query-time
+    compression only slices.
+    """
+    spans = []
+    start = 0
+    breaks = [m for m in SENTENCE_BREAK.finditer(text)
+              if not ABBREVIATION_END.search(text, max(0, m.start() - 5), m.start())]
+    for end, next_start in [(m.start(), m.end()) for m in breaks] + [(len(text), len(text))]:
+        s, e = start, end
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if e > s and len(text[s:e].split()) >= MIN_SENTENCE_WORDS:
+            spans.append((s, e))
+        start = next_start
+    return spans
+
+
 class ContextualCompressor:
     """
     Query-aware sentence-level compression.
@@ -9,6 +40,17 @@ class ContextualCompressor:
     Replaces blunt TF-IDF token pruning with surgical sentence extraction.
     """
     
+    FACTUAL_PATTERN = re.compile(
+        r"\b\d+(?:\.\d+)?%"                              # percentages
+        r"|\$[\d,]+(?:\.\d{2})?"                          # money
+        r"|\b\d{4}\b"                                     # years
+        r"|\b\d+\s+(?:days|months|years|hours|weeks)\b"   # durations
+        r"|\b(?:section|clause|article)\s+[\d\.]+",       # references
+        re.IGNORECASE
+    )
+    # Case-sensitive: under IGNORECASE any two adjacent words would count as a proper noun
+    PROPER_NOUN_PATTERN = re.compile(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b")
+    
     def __init__(self, similarity_threshold: float = 0.15):
         self.similarity_threshold = similarity_threshold
     
@@ -17,7 +59,8 @@ class ContextualCompressor:
         query: str,
         chunks: List[dict],
         max_total_tokens: int = 2000,
-        min_sentences_per_chunk: int = 1
+        min_sentences_per_chunk: int = 1,
+        model: Optional[str] = None
     ) -> dict:
         """
         Compress each chunk to query-relevant sentences only.
@@ -27,6 +70,7 @@ class ContextualCompressor:
             chunks: Retrieved and reranked chunks
             max_total_tokens: Total token budget for all compressed chunks
             min_sentences_per_chunk: Always keep at least N sentences per chunk
+            model: LLM name, selects the tokenizer used for the budget
         
         Returns:
             {
@@ -44,20 +88,43 @@ class ContextualCompressor:
         total_kept = 0
         total_dropped = 0
         
-        for chunk in chunks:
-            content = chunk.get("content", "")
-            if not content.strip():
+        # Split every chunk once and score all sentences against the query together
+        chunk_sentences = [
+            self._split_sentences(chunk.get("content", ""), chunk.get("sentence_spans"))
+            if chunk.get("content", "").strip() else None
+            for chunk in chunks
+        ]
+        all_sentences = [sent for sentences in chunk_sentences if sentences for sent in sentences]
+        all_scores = self._sentence_relevance_scores(query, all_sentences)
+        
+        compressed = []
+        offset = 0
+        for chunk, sentences in zip(chunks, chunk_sentences):
+            if sentences is None:
+                compressed.append(None)
+                continue
+            scores = all_scores[offset:offset + len(sentences)]
+            offset += len(sentences)
+            compressed.append(self._compress_text(chunk["content"], sentences, scores, min_sentences_per_chunk))
+        
+        pairs = [(chunk["content"], result[0]) for chunk, result in zip(chunks, compressed) if result is not None]
+        counts = iter(tokenizer.count_batch([text for pair in pairs for text in pair], model))
+        
+        for chunk, result in zip(chunks, compressed):
+            if result is None:
                 compressed_chunks.append(chunk)
                 continue
             
-            original_tokens = len(content.split())
-            total_original_tokens += original_tokens
+            content = chunk["content"]
+            compressed_content, kept, dropped = result
+            original_tokens, compressed_tokens = next(counts), next(counts)
             
-            compressed_content, kept, dropped = self._compress_text(
-                query, content, min_sentences_per_chunk
-            )
+            # Pack the budget tightly: a chunk that would overflow it is left out
+            # (unless nothing has been packed yet)
+            if compressed_chunks and total_compressed_tokens + compressed_tokens > max_total_tokens:
+                break
             
-            compressed_tokens = len(compressed_content.split())
+            total_original_tokens += original_tokens
             total_compressed_tokens += compressed_tokens
             total_kept += kept
             total_dropped += dropped
@@ -71,11 +138,6 @@ class ContextualCompressor:
                 "sentences_dropped": dropped,
             }
             compressed_chunks.append(compressed_chunk)
-            
-            # Stop if we have enough context
-            if total_compressed_tokens >= max_total_tokens:
-                # Add remaining chunks uncompressed if budget allows
-                break
         
         compression_ratio = (
             1.0 - (total_compressed_tokens / total_original_tokens)
@@ -92,26 +154,23 @@ class ContextualCompressor:
         }
     
     def _compress_text(
-        self, 
-        query: str, 
+        self,
         text: str,
+        sentences: List[str],
+        scores: List[float],
         min_sentences: int
     ) -> tuple:
         """
-        Extract query-relevant sentences from text.
-        Always preserve sentences containing entities/numbers/dates.
+        Keep query-relevant sentences of one chunk (scores come from
+        _sentence_relevance_scores). Always preserve sentences containing
+        entities/numbers/dates.
         Returns (compressed_text, kept_count, dropped_count)
         """
-        # Split into sentences
-        sentences = self._split_sentences(text)
-        
         if len(sentences) <= min_sentences:
             return text, len(sentences), 0
         
-        # Score each sentence for relevance to query
         scored = []
-        for sent in sentences:
-            score = self._sentence_relevance_score(query, sent)
+        for sent, score in zip(sentences, scores):
             is_factual = self._contains_factual_content(sent)
             scored.append({
                 "text": sent,
@@ -128,63 +187,53 @@ class ContextualCompressor:
             sorted_by_score = sorted(scored, key=lambda x: x["score"], reverse=True)
             for s in sorted_by_score[:min_sentences]:
                 s["keep"] = True
-            kept_sentences = [s for s in scored if s["keep"]]
         
         # Preserve original order
         kept_texts = [s["text"] for s in scored if s["keep"]]
-        dropped_texts = [s["text"] for s in scored if not s["keep"]]
+        dropped_count = len(scored) - len(kept_texts)
         
         compressed = " ".join(kept_texts)
-        return compressed, len(kept_texts), len(dropped_texts)
+        return compressed, len(kept_texts), dropped_count
     
-    def _split_sentences(self, text: str) -> List[str]:
-        """Split text into sentences, handling common edge cases."""
-        # Handle abbreviations and decimal numbers before splitting
-        text = re.sub(r"(\d+)\.(\d+)", r"\1[DOT]\2", text)
-        text = re.sub(r"\b(Mr|Mrs|Dr|Prof|Sr|Jr|vs|etc|i\.e|e\.g)\.", r"\1[DOT]", text)
-        
-        sentences = re.split(r"(?<=[.!?])\s+", text)
-        sentences = [s.replace("[DOT]", ".").strip() for s in sentences if s.strip()]
-        
-        # Filter out very short fragments (likely not real sentences)
-        sentences = [s for s in sentences if len(s.split()) >= 4]
-        
-        return sentences
+    def _split_sentences(self, text: str, spans: Optional[list] = None) -> List[str]:
+        """
+        Sentences of a chunk. Uses the spans stored at ingest time when they
+        fit the text, otherwise segments it now.
+        """
+        if not (spans and spans[-1][1] <= len(text)):
+            spans = sentence_spans(text)
+        return [text[start:end] for start, end in spans]
     
-    def _sentence_relevance_score(self, query: str, sentence: str) -> float:
+    def _sentence_relevance_scores(self, query: str, sentences: List[str]) -> List[float]:
         """
-        Compute TF-IDF cosine similarity between query and sentence.
+        TF-IDF cosine similarity between the query and every sentence: one
+        vectorizer fit over [query] + sentences, then a single sparse
+        matrix-vector product (rows are L2-normalised, so the dot product is
+        the cosine).
         """
+        if not sentences:
+            return []
         try:
             from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.metrics.pairwise import cosine_similarity
             
             vectorizer = TfidfVectorizer(stop_words="english", min_df=1)
-            tfidf_matrix = vectorizer.fit_transform([query, sentence])
-            similarity = cosine_similarity(tfidf_matrix[0], tfidf_matrix[1])[0][0]
-            return float(similarity)
+            tfidf_matrix = vectorizer.fit_transform([query] + sentences)
+            similarities = tfidf_matrix[1:] @ tfidf_matrix[0].T
+            return [float(v) for v in similarities.toarray().ravel()]
         except Exception:
             # Fallback: simple keyword overlap
             query_words = set(query.lower().split())
-            sent_words = set(sentence.lower().split())
-            overlap = len(query_words & sent_words)
-            return overlap / max(len(query_words), 1)
+            denominator = max(len(query_words), 1)
+            return [
+                len(query_words.intersection(sent.lower().split())) / denominator
+                for sent in sentences
+            ]
     
     def _contains_factual_content(self, sentence: str) -> bool:
         """
         Detect sentences containing facts that must be preserved:
         numbers, dates, percentages, proper nouns, money amounts.
         """
-        factual_patterns = [
-            r"\b\d+(?:\.\d+)?%",           # percentages
-            r"\$[\d,]+(?:\.\d{2})?",        # money
-            r"\b\d{4}\b",                   # years
-            r"\b\d+\s+(?:days|months|years|hours|weeks)\b",  # durations
-            r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b",          # proper nouns
-            r"\b(?:section|clause|article)\s+[\d\.]+",       # references
-        ]
-        
-        for pattern in factual_patterns:
-            if re.search(pattern, sentence, re.IGNORECASE):
-                return True
-        return False
+        return bool(
+            self.FACTUAL_PATTERN.search(sentence) or self.PROPER_NOUN_PATTERN.search(sentence)
+        )
@@ -80,6 +80,7 @@ class CacheEntry:
     response: str
     timestamp: float
     hit_count: int = 0
+    project_id: Optional[int] = None
 
 
 class SemanticCache:
@@ -137,7 +138,7 @@ class SemanticCache:
             self._misses += 1
             return None
     
-    def set(self, query: str, response: str):
+    def set(self, query: str, response: str, project_id: Optional[int] = None):
         with self._lock:
             all_queries = [e.query for e in self._entries] + [query]
             self._embedder.fit(all_queries)
@@ -148,6 +149,7 @@ class SemanticCache:
                 embedding=q_vec,
                 response=response,
                 timestamp=time.time(),
+                project_id=project_id,
             )
             self._entries.append(entry)
             
@@ -156,6 +158,13 @@ class SemanticCache:
                 self._entries.sort(key=lambda e: (e.hit_count, e.timestamp))
                 self._entries = self._entries[-(self.max_size):]
     
+    def discard(self, project_id: int) -> int:
+        """Drop entries cached for this project. Returns the number removed."""
+        with self._lock:
+            before = len(self._entries)
+            self._entries = [e for e in self._entries if e.project_id != project_id]
+            return before - len(self._entries)
+    
     def _prune_expired(self):
         if self.ttl_seconds is None:
             return
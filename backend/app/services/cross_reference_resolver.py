@@ -1,5 +1,47 @@
 import re
-from typing import List, Optional, Any
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Tuple
+
+# Heading-like line that opens a numbered section: "4.2 Payment Terms",
+# "Section 7: Termination", "# Article 3 Definitions" (Docling section chunks)
+HEADING_ANCHOR = re.compile(
+    r"^[ \t]*(?:#+[ \t]*)?"
+    r"(?:(?i:(section|sec\.|appendix|clause|article|paragraph|part|chapter))[ \t]+)?"
+    r"(\d{1,3}(?:\.\d{1,3})*[a-z]?)\.?(?:[ \t]*[:)\-\u2013\u2014])?[ \t]+(?=[A-Z(])",
+    re.MULTILINE
+)
+# Section kind + number inside a detected reference ("see section 4.2")
+REFERENCE_TARGET = re.compile(
+    r"(section|sec\.|appendix|clause|article|paragraph|part|chapter)\s*([\d\.]+[a-z]?)",
+    re.IGNORECASE
+)
+
+
+def _normalise_anchor(kind: Optional[str], number: str) -> Tuple[str, str]:
+    kind = (kind or "section").lower()
+    return ("section" if kind == "sec." else kind), number.rstrip(".").lower()
+
+
+def extract_section_anchors(text: str, heading: Optional[str] = None) -> List[dict]:
+    """
+    Numbered section anchors a chunk opens (its Docling heading, if any, plus
+    heading-like lines in the text). Stored as ChunkAnchor rows at ingest so
+    "see section 4.2" resolves by lookup instead of a search.
+    """
+    anchors = []
+    seen = set()
+    sources = ([heading] if heading else []) + [text or ""]
+    for source in sources:
+        for match in HEADING_ANCHOR.finditer(source):
+            kind, number = _normalise_anchor(match.group(1), match.group(2))
+            if not number or (kind, number) in seen:
+                continue
+            seen.add((kind, number))
+            line_end = source.find("\n", match.start())
+            line = source[match.start():line_end if line_end != -1 else len(source)]
+            anchors.append({"kind": kind, "number": number[:32], "heading": line.strip(" \t#")[:256]})
+    return anchors
+
 
 class CrossReferenceResolver:
     # Patterns that signal a cross-reference in retrieved text
@@ -13,6 +55,11 @@ class CrossReferenceResolver:
         r"see (?:above|below|attached|appendix)",
         r"\(see [\w\s\.]+\)",
     ]
+    COMPILED_PATTERNS = [re.compile(p, re.IGNORECASE) for p in REFERENCE_PATTERNS]
+    
+    def __init__(self, session=None):
+        # With a DB session, numbered references are first looked up in the ChunkAnchor index
+        self.session = session
     
     def detect_references(self, chunks: List[Any]) -> List[dict]:
         """
@@ -44,9 +91,8 @@ class CrossReferenceResolver:
             if not content:
                 continue
                 
-            for pattern in self.REFERENCE_PATTERNS:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                for match in matches:
+            for pattern in self.COMPILED_PATTERNS:
+                for match in pattern.finditer(content):
                     references.append({
                         "source_chunk_idx": chunk_idx,
                         "source_chunk_id": doc_id_version or f"chunk_{chunk_idx}",
@@ -130,23 +176,47 @@ class CrossReferenceResolver:
 
         existing_keys = {get_chunk_key(c) for c in chunks}
         
-        # Resolve up to max_resolutions references
-        for ref in references[:max_resolutions]:
-            resolved = self.resolve_reference(
-                ref, hybrid_search_fn, project_id
-            )
-            if resolved:
-                new_chunks = []
-                for c in resolved:
-                    key = get_chunk_key(c)
-                    if key not in existing_keys:
-                        new_chunks.append(c)
-                        existing_keys.add(key)
-                
-                additional_chunks.extend(new_chunks)
-                ref["resolved"] = True
-                ref["resolved_chunks"] = [get_chunk_key(c) for c in new_chunks]
-                resolved_count += 1
+        def record(ref: dict, resolved: List[Any]) -> None:
+            nonlocal resolved_count
+            new_chunks = []
+            for c in resolved:
+                key = get_chunk_key(c)
+                if key not in existing_keys:
+                    new_chunks.append(c)
+                    existing_keys.add(key)
+            additional_chunks.extend(new_chunks)
+            ref["resolved"] = True
+            ref["resolved_chunks"] = [get_chunk_key(c) for c in new_chunks]
+            resolved_count += 1
+        
+        # Resolve up to max_resolutions references: numbered ones by anchor
+        # lookup, the rest with one combined search per document
+        selected = references[:max_resolutions]
+        anchored = self._lookup_anchors(selected)
+        pending = []
+        for ref in selected:
+            if anchored.get(id(ref)):
+                ref["resolved_by"] = "anchor_index"
+                record(ref, anchored[id(ref)])
+            else:
+                pending.append(ref)
+        
+        for ref_group, resolved in self._resolve_batched(pending, hybrid_search_fn, project_id):
+            if not resolved:
+                continue
+            # Attribute each chunk to the first reference whose target it mentions
+            for ref in ref_group:
+                ref["resolved_by"] = "search"
+            per_ref = defaultdict(list)
+            for c in resolved:
+                content = (c[0] if isinstance(c, tuple) else c).page_content.lower()
+                owner = next(
+                    (ref for ref in ref_group if self._target_number(ref) and self._target_number(ref) in content),
+                    ref_group[0]
+                )
+                per_ref[id(owner)].append(c)
+            for ref in ref_group:
+                record(ref, per_ref.get(id(ref), []))
         
         return {
             "additional_chunks": additional_chunks,
@@ -154,3 +224,112 @@ class CrossReferenceResolver:
             "references_resolved": resolved_count,
             "reference_details": references
         }
+    
+    @staticmethod
+    def _target(reference: dict) -> Optional[Tuple[str, str]]:
+        match = REFERENCE_TARGET.search(reference["reference_text"])
+        if not match:
+            return None
+        kind, number = _normalise_anchor(match.group(1), match.group(2))
+        return (kind, number) if number else None
+    
+    def _target_number(self, reference: dict) -> Optional[str]:
+        target = self._target(reference)
+        return target[1] if target else None
+    
+    def _lookup_anchors(self, references: List[dict], top_k: int = 3) -> Dict[int, List[Any]]:
+        """
+        One ChunkAnchor query for all numbered references that name their
+        document. Returns id(reference) -> [(LCDocument, score)], preferring
+        anchors of the same kind (section vs appendix ...).
+        """
+        if self.session is None:
+            return {}
+        targets = {}
+        for ref in references:
+            target = self._target(ref)
+            if target and ref.get("document_id") is not None:
+                targets[id(ref)] = (int(ref["document_id"]), *target)
+        if not targets:
+            return {}
+        
+        from sqlmodel import select
+        from langchain_core.documents import Document as LCDocument
+        from app.models.rag import Chunk, ChunkAnchor, Document
+        
+        try:
+            rows = self.session.exec(
+                select(ChunkAnchor.document_id, ChunkAnchor.kind, ChunkAnchor.number, Chunk, Document.filename, Document.project_id)
+                .join(Chunk, Chunk.id == ChunkAnchor.chunk_id)
+                .join(Document, Document.id == ChunkAnchor.document_id)
+                .where(ChunkAnchor.document_id.in_({t[0] for t in targets.values()}))
+                .where(ChunkAnchor.number.in_({t[2] for t in targets.values()}))
+                .where(Document.is_active == True)
+                .order_by(Chunk.chunk_index)
+            ).all()
+        except Exception as e:
+            print(f"Error looking up section anchors: {e}")
+            self.session.rollback()
+            return {}
+        
+        by_number = defaultdict(list)
+        for document_id, kind, number, chunk, filename, project_id in rows:
+            by_number[(document_id, number)].append((kind, chunk, filename, project_id))
+        
+        resolved = {}
+        for ref_id, (document_id, kind, number) in targets.items():
+            candidates = by_number.get((document_id, number), [])
+            same_kind = [c for c in candidates if c[0] == kind]
+            resolved[ref_id] = [
+                (
+                    LCDocument(
+                        page_content=chunk.content,
+                        metadata={
+                            "source": filename,
+                            "doc_id": document_id,
+                            "project_id": project_id,
+                            "content_hash": chunk.content_hash,
+                            "doc_id_version": chunk.doc_id_version,
+                            "sentence_spans": chunk.sentence_spans,
+                        },
+                    ),
+                    1.0,
+                )
+                for _, chunk, filename, project_id in (same_kind or candidates)[:top_k]
+            ]
+        return resolved
+    
+    def _resolve_batched(
+        self,
+        references: List[dict],
+        hybrid_search_fn,
+        project_id: int,
+        top_k: int = 3
+    ) -> List[Tuple[List[dict], Optional[List[Any]]]]:
+        """
+        Remaining references, grouped by document and resolved with one
+        combined search per group instead of one search per reference.
+        """
+        groups: Dict[Any, List[dict]] = defaultdict(list)
+        for ref in references:
+            groups[ref.get("document_id")].append(ref)
+        
+        results = []
+        for document_id, ref_group in groups.items():
+            if len(ref_group) == 1:
+                results.append((ref_group, self.resolve_reference(ref_group[0], hybrid_search_fn, project_id, top_k)))
+                continue
+            ref_texts = list(dict.fromkeys(ref["reference_text"] for ref in ref_group))
+            search_query = "content of " + "; ".join(ref_texts)
+            try:
+                resolved = hybrid_search_fn(
+                    query=search_query,
+                    project_id=project_id,
+                    k=top_k * len(ref_texts),
+                    filter_document_id=document_id
+                )
+            except Exception as e:
+                print(f"Error resolving references {ref_texts}: {e}")
+                resolved = None
+            results.append((ref_group, resolved))
+        return results
@@ -1,8 +1,12 @@
 import hashlib
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, List, Dict, Optional
 from datetime import datetime
+from sqlalchemy import delete
 from sqlmodel import Session, select
-from app.models.rag import Chunk, Document, Project
+from app.models.rag import Chunk, ChunkAnchor, ChunkFact, Document, Project
+from app.services.contextual_compressor import sentence_spans
+from app.services.cross_reference_resolver import extract_section_anchors
+from app.services.fact_extractor import extract_facts
 
 VECTOR_STORE_PATH = "faiss_index"
 
@@ -11,6 +15,12 @@ class DeltaIndexer:
         self.session = session
         self.vector_store = vector_store
         self.embedding_model = embedding_model
+        # While streaming, vector store saves happen only at checkpoints
+        self._defer_save = False
+
+    def _save_vector_store(self) -> None:
+        if self.vector_store and not self._defer_save:
+            self.vector_store.save_local(VECTOR_STORE_PATH)
 
     def compute_chunk_hash(self, chunk_text: str) -> str:
         """SHA-256 hash of chunk content."""
@@ -120,35 +130,132 @@ class DeltaIndexer:
             "indexed_at": datetime.utcnow().isoformat()
         }
 
+    def delta_index_stream(
+        self,
+        document_id: int,
+        chunk_batches: Iterable[List[dict]],
+        checkpoint_batches: int = 8,
+        on_checkpoint: Optional[Callable[[int], None]] = None,
+    ) -> dict:
+        """
+        Streaming delta_index for very large documents. Consumes batches of
+        {"index", "text", "metadata"} chunks; each batch is hashed and diffed
+        against the stored hashes and only new/changed chunks are embedded, so
+        at most one batch of texts and vectors is held at a time.
+
+        Every `checkpoint_batches` batches the vector store is saved, then
+        on_checkpoint(next_index) runs and the DB is committed. Committed
+        chunks are therefore always in the vector store, and a re-run after a
+        crash skips them as unchanged. Stored chunks past the last produced
+        index are deleted at the end.
+        """
+        self._purge_orphan_vectors(document_id)
+        existing_hashes = self.get_existing_hashes(document_id)
+        seen = set()
+        added = updated = unchanged = 0
+        next_index = 0
+
+        self._defer_save = True
+        try:
+            for batch_no, batch in enumerate(chunk_batches, 1):
+                to_embed = []
+                replaced = []
+                for chunk in batch:
+                    chunk_hash = self.compute_chunk_hash(chunk["text"])
+                    idx = chunk["index"]
+                    seen.add(idx)
+                    next_index = max(next_index, idx + 1)
+                    old_hash = existing_hashes.get(idx)
+                    if old_hash == chunk_hash:
+                        unchanged += 1
+                        continue
+                    if old_hash is None:
+                        added += 1
+                    else:
+                        updated += 1
+                        replaced.append(idx)
+                    to_embed.append({
+                        **chunk,
+                        "content_hash": chunk_hash,
+                        "doc_id_version": f"{document_id}:{idx}:{chunk_hash[:8]}"
+                    })
+
+                if replaced:
+                    self._delete_chunks(document_id, replaced)
+                if to_embed:
+                    self._embed_and_store(document_id, to_embed)
+                if batch_no % max(1, checkpoint_batches) == 0:
+                    self._checkpoint(on_checkpoint, next_index)
+
+            to_delete = [idx for idx in existing_hashes if idx not in seen]
+            if to_delete:
+                self._delete_chunks(document_id, to_delete)
+
+            project_id = self._get_doc_project_id(document_id)
+            if project_id:
+                project = self.session.get(Project, project_id)
+                if project:
+                    project.kb_version = (project.kb_version or 1) + 1
+                    project.kb_version_updated_at = datetime.utcnow()
+                    self.session.add(project)
+            self._checkpoint(None, next_index)
+        finally:
+            self._defer_save = False
+
+        return {
+            "total_chunks": len(seen),
+            "added": added,
+            "updated": updated,
+            "deleted": len(to_delete),
+            "unchanged": unchanged,
+            "indexed_at": datetime.utcnow().isoformat()
+        }
+
+    def _checkpoint(self, on_checkpoint: Optional[Callable[[int], None]], next_index: int) -> None:
+        """Persist vectors first, then the chunk rows (and checkpoint) in one commit."""
+        if self.vector_store:
+            self.vector_store.save_local(VECTOR_STORE_PATH)
+        if on_checkpoint:
+            on_checkpoint(next_index)
+        self.session.commit()
+
+    def _purge_orphan_vectors(self, document_id: int) -> None:
+        """
+        Drop FAISS vectors of this document that have no chunk row, left by a
+        run that saved the index but died before committing.
+        """
+        docstore_ids = getattr(self.vector_store, "index_to_docstore_id", None)
+        if not docstore_ids:
+            return
+        prefix = f"{document_id}:"
+        stored = {i for i in docstore_ids.values() if isinstance(i, str) and i.startswith(prefix)}
+        if not stored:
+            return
+        committed = set(self.session.exec(
+            select(Chunk.doc_id_version).where(Chunk.document_id == document_id)
+        ).all())
+        orphans = list(stored - committed)
+        if orphans:
+            try:
+                self.vector_store.delete(ids=orphans)
+                self.vector_store.save_local(VECTOR_STORE_PATH)
+            except Exception as e:
+                print(f"Error purging orphan vectors: {e}")
+
     def _embed_and_store(self, document_id: int, chunks: List[dict]) -> None:
-        """Embed chunks and store in FAISS + PostgreSQL."""
+        """Embed chunks once and store them in PostgreSQL + the vector store (FAISS or pgvector)."""
         if not chunks:
             return
             
         texts = [c["text"] for c in chunks]
         embeddings = self.embedding_model.embed_documents(texts)
+        spans = [[list(span) for span in sentence_spans(text)] for text in texts]
         
         project_id = self._get_doc_project_id(document_id)
         filename = self._get_doc_filename(document_id)
         
-        for chunk, embedding in zip(chunks, embeddings):
-            # Store in FAISS vector store
-            if self.vector_store:
-                self.vector_store.add_texts(
-                    texts=[chunk["text"]],
-                    metadatas=[{
-                        "document_id": document_id,
-                        "doc_id": document_id,
-                        "project_id": project_id,
-                        "source": filename,
-                        "content_hash": chunk["content_hash"],
-                        "doc_id_version": chunk["doc_id_version"],
-                        **chunk.get("metadata", {})
-                    }],
-                    ids=[chunk["doc_id_version"]]
-                )
-                self.vector_store.save_local(VECTOR_STORE_PATH)
-            
+        db_chunks = []
+        for chunk, chunk_spans in zip(chunks, spans):
             # Upsert chunk record in PostgreSQL
             db_chunk = self.session.exec(
                 select(Chunk)
@@ -163,18 +270,72 @@ class DeltaIndexer:
                     chunk_index=chunk["index"],
                     content_hash=chunk["content_hash"],
                     doc_id_version=chunk["doc_id_version"],
-                    chunk_version=1
+                    chunk_version=1,
+                    sentence_spans=chunk_spans
                 )
             else:
                 db_chunk.content = chunk["text"]
                 db_chunk.content_hash = chunk["content_hash"]
                 db_chunk.doc_id_version = chunk["doc_id_version"]
                 db_chunk.chunk_version += 1
+                db_chunk.sentence_spans = chunk_spans
             
             self.session.add(db_chunk)
+            db_chunks.append(db_chunk)
+
+        # Rows need ids for their facts (and before pgvector can attach embeddings to them)
+        self.session.flush()
+        self._store_facts(document_id, db_chunks)
+        self._store_anchors(document_id, db_chunks, [(c.get("metadata") or {}).get("section") for c in chunks])
+
+        if self.vector_store:
+            # Reuse the vectors computed above (add_texts would embed again) and
+            # write the whole batch with a single save instead of one per chunk.
+            self.vector_store.add_embeddings(
+                text_embeddings=list(zip(texts, embeddings)),
+                metadatas=[
+                    {
+                        "document_id": document_id,
+                        "doc_id": document_id,
+                        "project_id": project_id,
+                        "source": filename,
+                        "content_hash": chunk["content_hash"],
+                        "doc_id_version": chunk["doc_id_version"],
+                        "sentence_spans": chunk_spans,
+                        **chunk.get("metadata", {})
+                    }
+                    for chunk, chunk_spans in zip(chunks, spans)
+                ],
+                ids=[chunk["doc_id_version"] for chunk in chunks]
+            )
+            self._save_vector_store()
+
+    def _store_facts(self, document_id: int, db_chunks: List[Chunk]) -> None:
+        """Replace the ChunkFact rows of these chunks with freshly extracted ones."""
+        self.session.execute(
+            delete(ChunkFact).where(ChunkFact.chunk_id.in_([c.id for c in db_chunks]))
+        )
+        for db_chunk in db_chunks:
+            facts = extract_facts(db_chunk.content)
+            db_chunk.fact_count = len(facts)
+            self.session.add(db_chunk)
+            self.session.add_all(
+                ChunkFact(chunk_id=db_chunk.id, document_id=document_id, **fact) for fact in facts
+            )
+
+    def _store_anchors(self, document_id: int, db_chunks: List[Chunk], headings: List[Optional[str]]) -> None:
+        """Replace the ChunkAnchor rows of these chunks (section numbers they open)."""
+        self.session.execute(
+            delete(ChunkAnchor).where(ChunkAnchor.chunk_id.in_([c.id for c in db_chunks]))
+        )
+        for db_chunk, heading in zip(db_chunks, headings):
+            self.session.add_all(
+                ChunkAnchor(chunk_id=db_chunk.id, document_id=document_id, **anchor)
+                for anchor in extract_section_anchors(db_chunk.content, heading)
+            )
 
     def _delete_chunks(self, document_id: int, chunk_indices: List[int]) -> None:
-        """Delete specific chunk indices from FAISS + PostgreSQL."""
+        """Delete specific chunk indices from the vector store + PostgreSQL."""
         statement = select(Chunk).where(Chunk.document_id == document_id).where(Chunk.chunk_index.in_(chunk_indices))
         chunks_to_delete = self.session.exec(statement).all()
         
@@ -183,9 +344,13 @@ class DeltaIndexer:
         if ids_to_delete and self.vector_store:
             try:
                 self.vector_store.delete(ids=ids_to_delete)
-                self.vector_store.save_local(VECTOR_STORE_PATH)
+                self._save_vector_store()
             except Exception as e:
-                print(f"Error deleting from FAISS: {e}")
+                print(f"Error deleting from vector store: {e}")
                 
+        if chunks_to_delete:
+            chunk_ids = [c.id for c in chunks_to_delete]
+            self.session.execute(delete(ChunkFact).where(ChunkFact.chunk_id.in_(chunk_ids)))
+            self.session.execute(delete(ChunkAnchor).where(ChunkAnchor.chunk_id.in_(chunk_ids)))
         for chunk in chunks_to_delete:
             self.session.delete(chunk)
@@ -22,6 +22,17 @@ class DoclingParser:
     def is_available(self) -> bool:
         converter = self._get_converter()
         return converter is not False and converter is not None
+
+    def warm_up(self) -> bool:
+        """Build the converter and its PDF pipeline now instead of on the first parse."""
+        if not self.is_available():
+            return False
+        try:
+            from docling.datamodel.base_models import InputFormat
+            self._converter.initialize_pipeline(InputFormat.PDF)
+        except Exception as e:
+            logger.warning(f"Docling pipeline warm-up skipped: {e}")
+        return True
     
     def parse(self, pdf_path: str) -> dict:
         """
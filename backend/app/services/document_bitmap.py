@@ -0,0 +1,65 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+from sqlmodel import Session, select
+
+from app.models.rag import Document, Project
+
+
+@dataclass(frozen=True)
+class DocumentBitmap:
+    """Active/inactive document ids of one project at a given kb_version."""
+    kb_version: Optional[int]
+    active: FrozenSet[int]
+    inactive: FrozenSet[int]
+
+    def allows(self, doc_id) -> bool:
+        # Documents not seen yet (uploaded after the snapshot) are not excluded
+        return doc_id is None or int(doc_id) not in self.inactive
+
+
+class DocumentBitmapCache:
+    """
+    Per-process cache of each project's document bitmap, replacing the
+    inactive-document query every hybrid search used to run.
+
+    Entries are validated against Project.kb_version (bumped by indexing and
+    deletion, so other workers' changes are seen) and dropped explicitly on
+    upload/delete in this process. Within one request the Project row comes
+    from the session identity map, so repeated searches cost no SQL.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, DocumentBitmap] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session: Session, project_id: int) -> DocumentBitmap:
+        project = session.get(Project, project_id)
+        kb_version = project.kb_version if project else None
+        entry = self._entries.get(project_id)
+        if entry is not None and entry.kb_version == kb_version:
+            return entry
+
+        rows = session.exec(
+            select(Document.id, Document.is_active).where(Document.project_id == project_id)
+        ).all()
+        entry = DocumentBitmap(
+            kb_version=kb_version,
+            active=frozenset(int(doc_id) for doc_id, is_active in rows if is_active),
+            inactive=frozenset(int(doc_id) for doc_id, is_active in rows if not is_active),
+        )
+        with self._lock:
+            self._entries[project_id] = entry
+        return entry
+
+    def invalidate(self, project_id: Optional[int] = None) -> None:
+        with self._lock:
+            if project_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(project_id, None)
+
+
+# Singleton instance
+document_bitmaps = DocumentBitmapCache()
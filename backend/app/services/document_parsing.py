@@ -0,0 +1,250 @@
+import os
+import hashlib
+import tempfile
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, NamedTuple, Optional
+
+from app.services.docling_parser import DoclingParser
+from app.services.ingestion_scanner import IngestionScanner
+from app.services.parse_worker import init_parse_worker
+from app.services.pdf_text_extractor import extract_pdf_text, shutdown_page_pool
+
+logger = logging.getLogger(__name__)
+
+PARSE_POOL_WORKERS = int(os.getenv("PARSE_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Load Docling's layout/table models when a pool process starts rather than on its first PDF
+PARSE_POOL_WARM_DOCLING = os.getenv("PARSE_POOL_WARM_DOCLING", "true").lower() == "true"
+
+# Uploads are copied in fixed-size pieces so peak memory does not scale with file size
+UPLOAD_READ_CHUNK = 1024 * 1024
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+# One converter per process; DocumentConverter construction and model loading are expensive
+_docling_parser: Optional[DoclingParser] = None
+
+
+class SpooledUpload(NamedTuple):
+    filename: str
+    path: str
+    sha256: str
+    size: int
+
+
+def _temp_suffix(filename: str) -> str:
+    return os.path.splitext(filename)[1].lower()
+
+
+async def spool_upload(file, filename: str) -> SpooledUpload:
+    """
+    Stream a FastAPI UploadFile to a named temp file, hashing as it goes.
+    The caller owns the file and must remove_spooled() it.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(suffix=_temp_suffix(filename), delete=False) as tmp:
+        while True:
+            chunk = await file.read(UPLOAD_READ_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+            tmp.write(chunk)
+            size += len(chunk)
+    return SpooledUpload(filename, tmp.name, digest.hexdigest(), size)
+
+
+def spool_stream(stream: BinaryIO, filename: str) -> SpooledUpload:
+    """Synchronous spool_upload for file-like objects (e.g. zip members)."""
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(suffix=_temp_suffix(filename), delete=False) as tmp:
+        while True:
+            chunk = stream.read(UPLOAD_READ_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+            tmp.write(chunk)
+            size += len(chunk)
+    return SpooledUpload(filename, tmp.name, digest.hexdigest(), size)
+
+
+def remove_spooled(*uploads: SpooledUpload) -> None:
+    for upload in uploads:
+        try:
+            os.remove(upload.path)
+        except OSError:
+            pass
+
+
+def get_docling_parser() -> DoclingParser:
+    """This process's shared DoclingParser (warmed by the pool initializer in workers)."""
+    global _docling_parser
+    if _docling_parser is None:
+        _docling_parser = DoclingParser()
+    return _docling_parser
+
+
+def _noop() -> None:
+    return None
+
+
+def parse_document(filename: str, path: str) -> dict:
+    """
+    Extract text from an uploaded file on disk. PDFs go through Docling when
+    installed (pre-chunked tables/sections in parsed_chunks_json, raw result in
+    docling_result), otherwise pypdf. Everything else is decoded as UTF-8 text.
+    """
+    content = ""
+    page_count: Optional[int] = None
+    parsing_method = "basic"
+    parsed_chunks_json = None
+    parsed_res = None
+    page_timings = None
+    slow_pages: list = []
+
+    if filename.lower().endswith(".pdf"):
+        docling_parser = get_docling_parser()
+        if docling_parser.is_available():
+            parsed_res = docling_parser.parse(path)
+            parsing_method = parsed_res["parsing_method"]
+            page_count = parsed_res["page_count"]
+
+            # Reconstruct plain text content (_redact_docling_chunks relies on this layout)
+            parts = [b["content"] + "\n" for b in parsed_res["text_blocks"]]
+            parts += [t["content"] + "\n" for t in parsed_res["tables"]]
+            content = "".join(parts)
+
+            parsed_chunks_json = {"chunks": docling_parser.to_chunks(parsed_res)}
+        else:
+            extracted = extract_pdf_text(path)
+            content = extracted["content"]
+            page_count = extracted["page_count"]
+            page_timings = extracted["page_timings"]
+            slow_pages = extracted["slow_pages"]
+    else:
+        with open(path, "rb") as f:
+            content = f.read().decode("utf-8", errors="replace")
+
+    return {
+        "content": content,
+        "page_count": page_count,
+        "parsing_method": parsing_method,
+        "parsed_chunks_json": parsed_chunks_json,
+        "docling_result": parsed_res,
+        "table_count": len(parsed_res["tables"]) if parsed_res and "tables" in parsed_res else 0,
+        "heading_count": len(parsed_res["headings"]) if parsed_res and "headings" in parsed_res else 0,
+        "page_timings": page_timings,
+        "slow_pages": slow_pages,
+    }
+
+
+def _redact_docling_chunks(scanner: IngestionScanner, content: str, parsed_res: dict, scan_result: dict) -> list:
+    """
+    Rebuild the Docling chunks from redacted blocks and tables. Each block sits
+    in `content` at a known offset (blocks, then tables, one newline apart), so
+    the document scan's spans are cut per block instead of scanning every chunk
+    again. Figure captions are not part of `content` and are redacted directly.
+    """
+    text_blocks = parsed_res["text_blocks"]
+    tables = parsed_res["tables"]
+    segments = []
+    cursor = 0
+    for item in text_blocks + tables:
+        segments.append((cursor, cursor + len(item["content"])))
+        cursor += len(item["content"]) + 1
+    redacted = scanner.redact_segments(content, segments, scanner.redaction_spans(content, scan_result))
+
+    redacted_res = dict(parsed_res)
+    redacted_res["text_blocks"] = [
+        {**block, "content": text} for block, text in zip(text_blocks, redacted[:len(text_blocks)])
+    ]
+    redacted_res["tables"] = [
+        {**table, "content": text} for table, text in zip(tables, redacted[len(text_blocks):])
+    ]
+    redacted_res["figures"] = [
+        {**figure, "content": scanner.redact_document(figure["content"])["redacted_text"]}
+        for figure in parsed_res.get("figures", [])
+    ]
+    return get_docling_parser().to_chunks(redacted_res)
+
+
+def prepare_document(filename: str, path: str) -> dict:
+    """
+    Parse + PII/secret scan + redaction for one upload. Pure function of its
+    inputs so it can run in a worker process (see get_parse_pool).
+
+    Returns the parse_document fields plus scan_result, quarantine,
+    redaction_log, action_taken and warning.
+    """
+    parsed = parse_document(filename, path)
+    # Only needed here; keep it out of what goes back across the process pool
+    docling_result = parsed.pop("docling_result")
+
+    scanner = IngestionScanner()
+    scan_result = scanner.scan_document(parsed["content"])
+    parsed.update({
+        "scan_result": scan_result,
+        "quarantine": scanner.should_quarantine(scan_result),
+        "redaction_log": None,
+        "action_taken": "none",
+        "warning": None,
+    })
+    if parsed["quarantine"]:
+        # Critical secrets: nothing of the text is kept
+        parsed["content"] = ""
+        parsed["parsed_chunks_json"] = None
+        parsed["action_taken"] = "quarantined"
+        return parsed
+
+    if scan_result["has_secrets"]:
+        # Redact PII
+        original = parsed["content"]
+        redact_res = scanner.redact_document(original, scan_result)
+        parsed["content"] = redact_res["redacted_text"]
+        parsed["redaction_log"] = redact_res["redaction_log"]
+        parsed["action_taken"] = "redacted"
+        parsed["warning"] = "Document contained PII which was redacted"
+
+        if parsed["parsed_chunks_json"] and docling_result is not None:
+            parsed["parsed_chunks_json"] = {
+                "chunks": _redact_docling_chunks(scanner, original, docling_result, scan_result)
+            }
+
+    return parsed
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """
+    Shared process pool for CPU-bound parsing, created on first use.
+    Workers are spawned, not forked: the pool starts after the ingest worker
+    threads, and forking a process with live threads (and possibly held locks)
+    can deadlock the children.
+    """
+    global _parse_pool
+    if _parse_pool is None:
+        workers = max(1, PARSE_POOL_WORKERS)
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_parse_worker,
+            initargs=(PARSE_POOL_WARM_DOCLING, threads_per_worker),
+        )
+        logger.info(f"Started document parse pool with {workers} worker(s), {threads_per_worker} thread(s) each")
+    return _parse_pool
+
+
+def warm_parse_pool() -> None:
+    """Spawn every pool process now (running the initializer) without waiting for it."""
+    pool = get_parse_pool()
+    for _ in range(max(1, PARSE_POOL_WORKERS)):
+        pool.submit(_noop)
+
+
+def shutdown_parse_pool() -> None:
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+    shutdown_page_pool()
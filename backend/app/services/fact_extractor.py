@@ -0,0 +1,69 @@
+import re
+from typing import List, Optional
+
+from app.services.conflict_detector import ConflictDetector
+
+# One name per ConflictDetector.FACTUAL_SIGNALS entry, in the same order
+FACT_TYPES = ["date", "year", "money", "percentage", "duration", "month_day_year", "month_year"]
+
+DURATION_UNIT = re.compile(r"(days|months|years|hours|weeks)\s*$", re.IGNORECASE)
+
+
+class FactExtractor:
+    """
+    Ingest-time extraction of typed facts (dates, years, money, percentages,
+    durations) from chunk text, stored as ChunkFact rows.
+    `value` is normalised exactly as ConflictDetector compares values, so the
+    detector can read stored facts instead of regexing; `numeric_value`/`unit`
+    back SQL aggregation in ComputationRouter.
+    """
+
+    def extract(self, text: str) -> List[dict]:
+        facts = []
+        seen = set()
+        for signal_index, pattern in enumerate(ConflictDetector.COMPILED_SIGNALS):
+            fact_type = FACT_TYPES[signal_index]
+            for match in pattern.finditer(text or ""):
+                # Same value findall() yields: the first group if the pattern has one
+                raw = match.group(1) if pattern.groups else match.group(0)
+                value = (raw or "").lower().strip()
+                if not value:
+                    continue
+                numeric_value, unit = self._numeric(fact_type, match)
+                key = (signal_index, value, numeric_value, unit)
+                if key in seen:
+                    continue
+                seen.add(key)
+                facts.append({
+                    "signal_index": signal_index,
+                    "fact_type": fact_type,
+                    "value": value[:128],
+                    "numeric_value": numeric_value,
+                    "unit": unit,
+                })
+        return facts
+
+    @staticmethod
+    def _numeric(fact_type: str, match: "re.Match") -> tuple:
+        text = match.group(0)
+        try:
+            if fact_type == "money":
+                return float(text.lstrip("$").replace(",", "")), "usd"
+            if fact_type == "percentage":
+                return float(match.group(1)), "percent"
+            if fact_type == "duration":
+                unit = DURATION_UNIT.search(text)
+                return float(match.group(1)), unit.group(1).lower() if unit else None
+            if fact_type == "year":
+                return float(match.group(1)), "year"
+        except ValueError:
+            pass
+        return None, None
+
+
+# Singleton instance
+fact_extractor = FactExtractor()
+
+
+def extract_facts(text: Optional[str]) -> List[dict]:
+    return fact_extractor.extract(text or "")
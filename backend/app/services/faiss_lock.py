@@ -0,0 +1,49 @@
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+# pg_advisory_lock(namespace, key) guarding the shared faiss_index directory
+_FAISS_LOCK_NAMESPACE = 4712
+_FAISS_LOCK_KEY = 0
+
+_thread_lock = threading.RLock()
+_local = threading.local()
+
+
+@contextmanager
+def faiss_write_lock(session: Optional[Session] = None):
+    """
+    Serialize load / modify / save_local of the single faiss_index shared by
+    all projects. Without it two jobs for different projects each load the
+    file, add their vectors and save, and the last writer drops the other's.
+
+    Threads of this process share one re-entrant lock. On Postgres the
+    outermost holder also takes a session-level advisory lock on a separate
+    connection (so commits inside the block do not release it), covering a
+    dedicated ingest_worker process next to the API.
+    """
+    with _thread_lock:
+        depth = getattr(_local, "depth", 0)
+        connection = None
+        if depth == 0 and session is not None and session.get_bind().dialect.name == "postgresql":
+            connection = session.get_bind().connect()
+            connection.execute(
+                text("SELECT pg_advisory_lock(:ns, :key)"),
+                {"ns": _FAISS_LOCK_NAMESPACE, "key": _FAISS_LOCK_KEY},
+            )
+        _local.depth = depth + 1
+        try:
+            yield
+        finally:
+            _local.depth = depth
+            if connection is not None:
+                try:
+                    connection.execute(
+                        text("SELECT pg_advisory_unlock(:ns, :key)"),
+                        {"ns": _FAISS_LOCK_NAMESPACE, "key": _FAISS_LOCK_KEY},
+                    )
+                finally:
+                    connection.close()
@@ -1,5 +1,6 @@
 import re
-from typing import List, Dict, Any
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple
 from enum import Enum
 
 class SecretSeverity(Enum):
@@ -9,6 +10,9 @@ class SecretSeverity(Enum):
     LOW = "low"              # Potential secrets, low confidence
 
 class IngestionScanner:
+    # Order matters: all patterns run as one alternation, so at any position the
+    # first listed (most severe) pattern that matches wins (e.g. credit_card
+    # before aadhaar).
     SECRET_PATTERNS = {
         # API Keys and tokens
         "openai_api_key": (
@@ -48,14 +52,14 @@ class IngestionScanner:
             r"\b\d{3}-\d{2}-\d{4}\b",
             SecretSeverity.HIGH
         ),
-        "aadhaar": (
-            r"\b\d{4}\s\d{4}\s\d{4}\b",
-            SecretSeverity.HIGH
-        ),
         "credit_card": (
             r"\b(?:\d{4}[- ]){3}\d{4}\b",
             SecretSeverity.HIGH
         ),
+        "aadhaar": (
+            r"\b\d{4}\s\d{4}\s\d{4}\b",
+            SecretSeverity.HIGH
+        ),
         "phone_number": (
             r"\b(?:\+91|0)?[6-9]\d{9}\b",
             SecretSeverity.MEDIUM
@@ -66,24 +70,122 @@ class IngestionScanner:
         ),
     }
     
+    SEVERITY_RANK = {
+        SecretSeverity.CRITICAL: 0,
+        SecretSeverity.HIGH: 1,
+        SecretSeverity.MEDIUM: 2,
+        SecretSeverity.LOW: 3,
+    }
+    SEVERITY_BY_TYPE = {name: severity for name, (_, severity) in SECRET_PATTERNS.items()}
+
+    # Patterns without a leading \b start with one of these literals (and may
+    # start mid-token, e.g. "X-API-Key", "db_password", "jdbc:postgresql://");
+    # every other pattern can only start at a word boundary.
+    UNANCHORED_PREFIXES = (
+        "sk-", "api", "pass", "pwd", "-----", "mongodb", "postgresql", "mysql", "redis", "akia", "aws",
+    )
+
+    @classmethod
+    def _combine(cls, names: List[str]) -> "re.Pattern":
+        """
+        One alternation of the given types as named groups, in SECRET_PATTERNS
+        order. The leading lookahead rejects positions no pattern can start at
+        (mid-word, or a word end) before any alternative is tried; it admits
+        every position where one of the patterns could match.
+        """
+        first_chars = "".join(sorted({p[0] for p in cls.UNANCHORED_PREFIXES}))
+        return re.compile(
+            # \b before a word char, or before a symbol email/phone may start with
+            r"(?=(?<!\w)\w|[+.%\-](?<=\w.)|"
+            # cheap first-character test before trying the literal prefixes
+            + "(?=[" + re.escape(first_chars) + "])(?:"
+            + "|".join(re.escape(p) for p in cls.UNANCHORED_PREFIXES) + "))(?:"
+            + "|".join(f"(?P<{name}>{cls.SECRET_PATTERNS[name][0]})" for name in names)
+            + ")",
+            re.IGNORECASE,
+        )
+
+    COMBINED_PATTERN = None  # built below the class body
+    # Per severity: the alternation of strictly more severe types, used to look
+    # inside a match for secrets the single pass stepped over
+    MORE_SEVERE_PATTERNS: Dict[SecretSeverity, Optional["re.Pattern"]] = {}
+
+    def _iter_matches(self, text: str):
+        """
+        Single left-to-right pass of the combined pattern, yielding
+        (start, end, type, severity) in position order.
+
+        The alternation reports non-overlapping matches, so a lower-severity
+        match (e.g. an email wrapped around an AWS key) could hide a more
+        severe one. Inside each such match the more severe patterns are
+        therefore tried at every offset; what they find is reported as well,
+        so the quarantine decision never depends on match order. A type is
+        never reported twice over the same characters.
+        """
+        type_end: Dict[str, int] = {}
+        for match in self.COMBINED_PATTERN.finditer(text):
+            start, end = match.span()
+            secret_type = match.lastgroup
+            if start >= type_end.get(secret_type, 0):
+                type_end[secret_type] = end
+                yield start, end, secret_type, self.SEVERITY_BY_TYPE[secret_type]
+
+            more_severe = self.MORE_SEVERE_PATTERNS[self.SEVERITY_BY_TYPE[secret_type]]
+            if more_severe is None:
+                continue
+            pos = start + 1
+            while pos < end:
+                inner = more_severe.match(text, pos)
+                if inner is None or inner.start() < type_end.get(inner.lastgroup, 0):
+                    pos += 1
+                    continue
+                type_end[inner.lastgroup] = inner.end()
+                yield inner.start(), inner.end(), inner.lastgroup, self.SEVERITY_BY_TYPE[inner.lastgroup]
+                pos = max(pos + 1, inner.end())
+
+    def _merge_spans(self, matches):
+        """
+        Collapse overlapping matches into one span each for redaction, labelled
+        with the most severe type inside it.
+        """
+        merged = []
+        for start, end, secret_type, severity in sorted(matches, key=lambda m: (m[0], -m[1])):
+            if merged and start < merged[-1][1]:
+                prev_start, prev_end, prev_type, prev_severity = merged[-1]
+                if self.SEVERITY_RANK[severity] < self.SEVERITY_RANK[prev_severity]:
+                    prev_type, prev_severity = secret_type, severity
+                merged[-1] = (prev_start, max(prev_end, end), prev_type, prev_severity)
+            else:
+                merged.append((start, end, secret_type, severity))
+        return merged
+
+    @staticmethod
+    def _line_locator(text: str):
+        """Offset -> 1-based line number via bisect over the newline offsets."""
+        newline_offsets = [m.start() for m in re.finditer("\n", text)]
+        return lambda offset: bisect_right(newline_offsets, offset - 1) + 1
+
     def scan_document(self, text: str) -> dict:
         """
         Scan full document text before chunking.
         Returns scan results with all detected secrets/PII.
         """
         findings = []
-        
-        for secret_type, (pattern, severity) in self.SECRET_PATTERNS.items():
-            matches = list(re.finditer(pattern, text, re.IGNORECASE))
-            for match in matches:
-                findings.append({
-                    "type": secret_type,
-                    "severity": severity.value,
-                    "position_start": match.start(),
-                    "position_end": match.end(),
-                    "preview": self._mask_value(match.group(0)),
-                    "line_number": text[:match.start()].count("\n") + 1
-                })
+        line_of = None
+        counts = {severity.value: 0 for severity in SecretSeverity}
+
+        for start, end, secret_type, severity in self._iter_matches(text):
+            if line_of is None:
+                line_of = self._line_locator(text)
+            counts[severity.value] += 1
+            findings.append({
+                "type": secret_type,
+                "severity": severity.value,
+                "position_start": start,
+                "position_end": end,
+                "preview": self._mask_value(text[start:end]),
+                "line_number": line_of(start)
+            })
         
         critical_findings = [
             f for f in findings 
@@ -95,50 +197,88 @@ class IngestionScanner:
             "has_critical_secrets": len(critical_findings) > 0,
             "total_findings": len(findings),
             "findings_by_severity": {
-                "critical": len([f for f in findings if f["severity"] == "critical"]),
-                "high": len([f for f in findings if f["severity"] == "high"]),
-                "medium": len([f for f in findings if f["severity"] == "medium"]),
-                "low": len([f for f in findings if f["severity"] == "low"]),
+                "critical": counts["critical"],
+                "high": counts["high"],
+                "medium": counts["medium"],
+                "low": counts["low"],
             },
             "findings": findings,
             "critical_findings": critical_findings
         }
     
-    def redact_document(self, text: str) -> dict:
+    def redaction_spans(self, text: str, scan_result: Optional[dict] = None) -> list:
+        """
+        Sorted, non-overlapping (start, end, type, severity) spans to redact.
+        Reuses the findings of a scan_document() result for the same text.
+        """
+        if scan_result is not None:
+            matches = [
+                (f["position_start"], f["position_end"], f["type"], SecretSeverity(f["severity"]))
+                for f in scan_result["findings"]
+            ]
+        else:
+            matches = list(self._iter_matches(text))
+        return self._merge_spans(matches)
+
+    def redact_document(self, text: str, scan_result: Optional[dict] = None) -> dict:
         """
-        Redact all detected secrets/PII in place.
-        Returns redacted text + redaction log.
+        Redact all detected secrets/PII.
+        Pass the scan_document() result for the same text to reuse its findings
+        instead of scanning again. Returns redacted text + redaction log.
         """
-        redacted_text = text
+        matches = self.redaction_spans(text, scan_result)
+
+        parts: List[str] = []
         redaction_log = []
-        
-        # Process in reverse order to preserve positions
-        all_matches = []
-        for secret_type, (pattern, severity) in self.SECRET_PATTERNS.items():
-            for match in re.finditer(pattern, redacted_text, re.IGNORECASE):
-                all_matches.append((match.start(), match.end(), secret_type, severity))
-        
-        # Sort by position descending (process from end to preserve offsets)
-        all_matches.sort(key=lambda x: x[0], reverse=True)
-        
-        for start, end, secret_type, severity in all_matches:
-            original_preview = self._mask_value(redacted_text[start:end])
+        line_of = self._line_locator(text) if matches else None
+        cursor = 0
+        for start, end, secret_type, severity in matches:
             replacement = f"[REDACTED:{secret_type.upper()}]"
-            redacted_text = redacted_text[:start] + replacement + redacted_text[end:]
+            parts.append(text[cursor:start])
+            parts.append(replacement)
+            cursor = end
             redaction_log.append({
                 "type": secret_type,
                 "severity": severity.value,
-                "original_preview": original_preview,
+                "original_preview": self._mask_value(text[start:end]),
                 "replacement": replacement,
-                "line_number": text[:start].count("\n") + 1
+                "line_number": line_of(start)
             })
+        parts.append(text[cursor:])
+        # Log keeps the historical last-to-first order
+        redaction_log.reverse()
         
         return {
-            "redacted_text": redacted_text,
+            "redacted_text": "".join(parts),
             "redaction_count": len(redaction_log),
             "redaction_log": redaction_log
         }
     
+    def redact_segments(self, text: str, segments: List[Tuple[int, int]], spans: list) -> List[str]:
+        """
+        Redacted copies of text[start:end] for each segment (sorted, non-overlapping),
+        cut from the redaction_spans() of the whole text without scanning again.
+        A span crossing a segment edge redacts the part inside each segment.
+        """
+        redacted = []
+        first = 0
+        for seg_start, seg_end in segments:
+            while first < len(spans) and spans[first][1] <= seg_start:
+                first += 1
+            parts = []
+            cursor = seg_start
+            k = first
+            while k < len(spans) and spans[k][0] < seg_end:
+                start, end, secret_type, _ = spans[k]
+                start = max(start, seg_start)
+                parts.append(text[cursor:start])
+                parts.append(f"[REDACTED:{secret_type.upper()}]")
+                cursor = min(end, seg_end)
+                k += 1
+            parts.append(text[cursor:seg_end])
+            redacted.append("".join(parts))
+        return redacted
+
     def _mask_value(self, value: str) -> str:
         """Show first 4 chars then mask rest."""
         if len(value) <= 4:
@@ -150,3 +290,13 @@ class IngestionScanner:
         Return True if document should be quarantined.
         """
         return scan_result["has_critical_secrets"]
+
+
+IngestionScanner.COMBINED_PATTERN = IngestionScanner._combine(list(IngestionScanner.SECRET_PATTERNS))
+IngestionScanner.MORE_SEVERE_PATTERNS = {
+    severity: IngestionScanner._combine([
+        name for name, more in IngestionScanner.SEVERITY_BY_TYPE.items()
+        if IngestionScanner.SEVERITY_RANK[more] < IngestionScanner.SEVERITY_RANK[severity]
+    ]) if severity != SecretSeverity.CRITICAL else None
+    for severity in SecretSeverity
+}
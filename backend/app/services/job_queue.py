@@ -0,0 +1,482 @@
+import os
+import socket
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text, update
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, func, select
+
+from app.models.job import IngestionJob
+
+logger = logging.getLogger(__name__)
+
+JOB_PROCESS_DOCUMENT = "process_document"
+JOB_RECHUNK_DOCUMENT = "rechunk_document"
+JOB_REINDEX_PROJECT = "reindex_project"
+JOB_COMPACT_INDEX = "compact_index"
+JOB_DELETE_PROJECT = "delete_project"
+
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+INGEST_RETRY_BACKOFF_SECONDS = int(os.getenv("INGEST_RETRY_BACKOFF_SECONDS", "30"))
+INGEST_PER_PROJECT_CONCURRENCY = int(os.getenv("INGEST_PER_PROJECT_CONCURRENCY", "1"))
+INGEST_JOB_LEASE_SECONDS = int(os.getenv("INGEST_JOB_LEASE_SECONDS", "900"))
+# How often a running job renews its lease, independent of handler progress
+INGEST_HEARTBEAT_SECONDS = int(os.getenv("INGEST_HEARTBEAT_SECONDS", str(max(5, INGEST_JOB_LEASE_SECONDS // 3))))
+INGEST_POLL_INTERVAL = float(os.getenv("INGEST_POLL_INTERVAL", "2"))
+
+# Namespace for pg_try_advisory_xact_lock(namespace, project_id) while claiming
+_CLAIM_LOCK_NAMESPACE = 4711
+
+
+class IngestionJobQueue:
+    """
+    Postgres-table backed job queue for ingestion work.
+
+    Jobs survive web-worker restarts, are claimed with FOR UPDATE SKIP LOCKED so
+    any number of workers can poll the same table, respect a per-project
+    concurrency cap, and are retried with exponential backoff. Running jobs
+    renew their lease through `heartbeat` for as long as the worker holds them;
+    jobs whose worker died are re-queued once their lease expires. Progress,
+    completion and failure only apply while `locked_by` is still the reporting
+    worker, so a worker whose lease was taken over cannot overwrite the new
+    owner's result. Works on SQLite for local development (without row locking).
+    """
+
+    def __init__(
+        self,
+        per_project_concurrency: int = INGEST_PER_PROJECT_CONCURRENCY,
+        lease_seconds: int = INGEST_JOB_LEASE_SECONDS,
+        retry_backoff_seconds: int = INGEST_RETRY_BACKOFF_SECONDS,
+    ):
+        self.per_project_concurrency = max(1, per_project_concurrency)
+        self.lease_seconds = lease_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+    @staticmethod
+    def _is_postgres(session: Session) -> bool:
+        return session.get_bind().dialect.name == "postgresql"
+
+    def enqueue(
+        self,
+        session: Session,
+        job_type: str,
+        document_id: Optional[int] = None,
+        project_id: Optional[int] = None,
+        payload: Optional[dict] = None,
+        priority: int = PRIORITY_NORMAL,
+        max_attempts: int = INGEST_MAX_ATTEMPTS,
+        commit: bool = True,
+    ) -> IngestionJob:
+        """
+        Queue a job. A still-queued job of the same type for the same document is
+        reused (its payload/priority updated) instead of piling up duplicates.
+        """
+        existing = None
+        if document_id is not None:
+            existing = session.exec(
+                select(IngestionJob)
+                .where(IngestionJob.document_id == document_id)
+                .where(IngestionJob.job_type == job_type)
+                .where(IngestionJob.status == "queued")
+            ).first()
+
+        if existing:
+            existing.payload = payload
+            existing.priority = max(existing.priority, priority)
+            job = existing
+        else:
+            job = IngestionJob(
+                job_type=job_type,
+                document_id=document_id,
+                project_id=project_id,
+                payload=payload,
+                priority=priority,
+                max_attempts=max_attempts,
+            )
+        session.add(job)
+        if commit:
+            session.commit()
+            session.refresh(job)
+        return job
+
+    def has_pending(self, session: Session, job_type: str, project_id: int) -> bool:
+        """
+        True if a project-level job of this type is still queued. A running one
+        does not count: it may have read the project's state before the change
+        that prompted the new job.
+        """
+        return session.exec(
+            select(IngestionJob.id)
+            .where(IngestionJob.project_id == project_id)
+            .where(IngestionJob.job_type == job_type)
+            .where(IngestionJob.status == "queued")
+        ).first() is not None
+
+    def enqueue_batch(
+        self,
+        session: Session,
+        job_type: str,
+        targets: List[Tuple[int, Optional[int]]],
+        priority: int = PRIORITY_NORMAL,
+        max_attempts: int = INGEST_MAX_ATTEMPTS,
+        commit: bool = True,
+    ) -> List[IngestionJob]:
+        """
+        Queue one job per (document_id, project_id) in a single flush, skipping the
+        duplicate check of `enqueue` (meant for freshly inserted documents).
+        """
+        jobs = [
+            IngestionJob(
+                job_type=job_type,
+                document_id=document_id,
+                project_id=project_id,
+                priority=priority,
+                max_attempts=max_attempts,
+            )
+            for document_id, project_id in targets
+        ]
+        session.add_all(jobs)
+        if commit:
+            session.commit()
+        else:
+            session.flush()
+        return jobs
+
+    def _running_counts(self, session: Session) -> Dict[int, int]:
+        rows = session.exec(
+            select(IngestionJob.project_id, func.count())
+            .where(IngestionJob.status == "running")
+            .group_by(IngestionJob.project_id)
+        ).all()
+        return {pid: n for pid, n in rows if pid is not None}
+
+    def claim(self, session: Session, worker_id: str) -> Optional[IngestionJob]:
+        """
+        Atomically take the next runnable job, or None if nothing is eligible.
+
+        The candidate is taken with a conditional UPDATE (still queued, project
+        below its running cap) so the claim holds even without row locks: on
+        SQLite two worker threads may pick the same candidate, but only one
+        UPDATE matches and the other sees rowcount 0 and backs off.
+        """
+        now = datetime.utcnow()
+        is_pg = self._is_postgres(session)
+
+        saturated = [
+            pid for pid, n in self._running_counts(session).items()
+            if n >= self.per_project_concurrency
+        ]
+        statement = (
+            select(IngestionJob)
+            .where(IngestionJob.status == "queued")
+            .where(IngestionJob.run_after <= now)
+        )
+        if saturated:
+            statement = statement.where(
+                (IngestionJob.project_id == None) | (IngestionJob.project_id.notin_(saturated))
+            )
+        statement = statement.order_by(IngestionJob.priority.desc(), IngestionJob.id).limit(1)
+        if is_pg:
+            statement = statement.with_for_update(skip_locked=True)
+
+        job = session.exec(statement).first()
+        if not job:
+            session.rollback()
+            return None
+
+        if is_pg and job.project_id is not None:
+            # Serialize claims within a project so two workers cannot both pass the cap check
+            locked = session.execute(
+                text("SELECT pg_try_advisory_xact_lock(:ns, :pid)"),
+                {"ns": _CLAIM_LOCK_NAMESPACE, "pid": job.project_id},
+            ).scalar()
+            running = session.exec(
+                select(func.count())
+                .select_from(IngestionJob)
+                .where(IngestionJob.project_id == job.project_id)
+                .where(IngestionJob.status == "running")
+            ).one()
+            if not locked or running >= self.per_project_concurrency:
+                session.rollback()
+                return None
+
+        claim = (
+            update(IngestionJob)
+            .where(IngestionJob.id == job.id)
+            .where(IngestionJob.status == "queued")
+            .values(
+                status="running",
+                attempts=IngestionJob.attempts + 1,
+                locked_by=worker_id,
+                heartbeat_at=now,
+                started_at=now,
+                progress=0.0,
+                progress_message="started",
+                error=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if job.project_id is not None:
+            running_job = aliased(IngestionJob)
+            running_count = (
+                select(func.count())
+                .select_from(running_job)
+                .where(running_job.project_id == job.project_id)
+                .where(running_job.status == "running")
+                .scalar_subquery()
+            )
+            claim = claim.where(running_count < self.per_project_concurrency)
+
+        if session.execute(claim).rowcount != 1:
+            # Another worker claimed it first, or the project filled up meanwhile
+            session.rollback()
+            return None
+        session.commit()
+        session.refresh(job)
+        return job
+
+    @staticmethod
+    def _owned(statement, job_id: int, worker_id: Optional[str]):
+        """Restrict an UPDATE to the job while it is running under worker_id."""
+        statement = (
+            statement.where(IngestionJob.id == job_id)
+            .where(IngestionJob.status == "running")
+            .execution_options(synchronize_session=False)
+        )
+        if worker_id is not None:
+            statement = statement.where(IngestionJob.locked_by == worker_id)
+        return statement
+
+    def heartbeat(self, session: Session, job_id: int, worker_id: Optional[str] = None) -> bool:
+        """Renew the job lease. Returns False once the job is no longer held by worker_id."""
+        renewed = session.execute(
+            self._owned(update(IngestionJob), job_id, worker_id).values(heartbeat_at=datetime.utcnow())
+        ).rowcount == 1
+        session.commit()
+        return renewed
+
+    def report_progress(
+        self,
+        session: Session,
+        job_id: int,
+        progress: float,
+        message: Optional[str] = None,
+        worker_id: Optional[str] = None,
+    ) -> bool:
+        """Record progress and renew the job lease. Returns False if the lease was lost."""
+        values = {"progress": max(0.0, min(1.0, progress)), "heartbeat_at": datetime.utcnow()}
+        if message is not None:
+            values["progress_message"] = message
+        renewed = session.execute(
+            self._owned(update(IngestionJob), job_id, worker_id).values(**values)
+        ).rowcount == 1
+        session.commit()
+        return renewed
+
+    def complete(self, session: Session, job_id: int, worker_id: Optional[str] = None) -> bool:
+        """Mark the job succeeded. Returns False if worker_id no longer holds it."""
+        done = session.execute(
+            self._owned(update(IngestionJob), job_id, worker_id).values(
+                status="succeeded",
+                progress=1.0,
+                progress_message="done",
+                locked_by=None,
+                finished_at=datetime.utcnow(),
+            )
+        ).rowcount == 1
+        session.commit()
+        return done
+
+    def fail(
+        self,
+        session: Session,
+        job_id: int,
+        error: str,
+        worker_id: Optional[str] = None,
+        heartbeat_before: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Re-queue with exponential backoff, or mark failed once attempts are exhausted.
+        Returns False if the job is no longer running under worker_id (or, with
+        heartbeat_before, was renewed after that time).
+        """
+        job = session.get(IngestionJob, job_id)
+        if not job:
+            return False
+        values = {"error": error[:2000], "locked_by": None}
+        if job.attempts < job.max_attempts:
+            delay = self.retry_backoff_seconds * (2 ** (job.attempts - 1))
+            values.update(
+                status="queued",
+                run_after=datetime.utcnow() + timedelta(seconds=delay),
+                progress_message=f"retrying in {delay}s (attempt {job.attempts}/{job.max_attempts})",
+            )
+        else:
+            values.update(status="failed", finished_at=datetime.utcnow(), progress_message="failed")
+        statement = self._owned(update(IngestionJob), job_id, worker_id)
+        if heartbeat_before is not None:
+            statement = statement.where(IngestionJob.heartbeat_at < heartbeat_before)
+        released = session.execute(statement.values(**values)).rowcount == 1
+        session.commit()
+        return released
+
+    def requeue_stale(self, session: Session) -> int:
+        """Return jobs whose worker stopped heartbeating to the queue (or fail them)."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        stale = session.exec(
+            select(IngestionJob.id, IngestionJob.locked_by)
+            .where(IngestionJob.status == "running")
+            .where(IngestionJob.heartbeat_at < cutoff)
+        ).all()
+        requeued = 0
+        for job_id, locked_by in stale:
+            # Conditional on the same owner and an unrenewed lease, so a heartbeat
+            # landing between the select and here keeps the job with its worker
+            if self.fail(
+                session,
+                job_id,
+                f"lease expired (worker {locked_by} stopped heartbeating)",
+                worker_id=locked_by,
+                heartbeat_before=cutoff,
+            ):
+                requeued += 1
+        return requeued
+
+    def latest_for_document(self, session: Session, document_id: int) -> Optional[IngestionJob]:
+        return session.exec(
+            select(IngestionJob)
+            .where(IngestionJob.document_id == document_id)
+            .order_by(IngestionJob.created_at.desc(), IngestionJob.id.desc())
+        ).first()
+
+
+JobHandler = Callable[[Session, IngestionJob, Callable[[float, Optional[str]], None]], None]
+
+
+class IngestionWorker:
+    """
+    Polls the queue and runs jobs through registered handlers. Each handler gets
+    (session, job, progress) where progress(fraction, message) records progress.
+    Runs `concurrency` polling threads; use run_forever() from a dedicated process
+    or start() for an in-process background worker.
+    """
+
+    def __init__(
+        self,
+        engine,
+        handlers: Dict[str, JobHandler],
+        queue: Optional[IngestionJobQueue] = None,
+        concurrency: int = 1,
+        poll_interval: float = INGEST_POLL_INTERVAL,
+        worker_name: Optional[str] = None,
+        heartbeat_interval: float = INGEST_HEARTBEAT_SECONDS,
+    ):
+        self.engine = engine
+        self.handlers = handlers
+        self.queue = queue or job_queue
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.worker_name = worker_name or f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _heartbeat(self, job_id: int, worker_id: str, done: threading.Event) -> None:
+        """Renew the lease until the job finishes, however long a step (embedding, lock wait) takes."""
+        while not done.wait(self.heartbeat_interval):
+            try:
+                with Session(self.engine) as session:
+                    if not self.queue.heartbeat(session, job_id, worker_id):
+                        logger.warning(f"Ingestion job {job_id} is no longer held by {worker_id}")
+                        return
+            except Exception as e:
+                logger.warning(f"Could not renew lease of job {job_id}: {e}")
+
+    def run_once(self, worker_id: str) -> bool:
+        """Claim and run a single job. Returns False when the queue had nothing runnable."""
+        with Session(self.engine) as session:
+            job = self.queue.claim(session, worker_id)
+            if not job:
+                return False
+            job_id = job.id
+            handler = self.handlers.get(job.job_type)
+
+            def progress(fraction: float, message: Optional[str] = None) -> None:
+                try:
+                    with Session(self.engine) as progress_session:
+                        self.queue.report_progress(progress_session, job_id, fraction, message, worker_id)
+                except Exception as e:
+                    logger.warning(f"Could not record progress for job {job_id}: {e}")
+
+            done = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(job_id, worker_id, done), daemon=True, name=f"ingest-heartbeat-{job_id}"
+            )
+            heartbeat.start()
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job type '{job.job_type}'")
+                handler(session, job, progress)
+            except Exception as exc:
+                logger.error(f"Ingestion job {job_id} ({job.job_type}) failed: {exc}")
+                session.rollback()
+                with Session(self.engine) as fail_session:
+                    if not self.queue.fail(fail_session, job_id, str(exc), worker_id):
+                        logger.warning(f"Ingestion job {job_id} was taken over; failure not recorded")
+                return True
+            finally:
+                done.set()
+                heartbeat.join()
+
+        with Session(self.engine) as session:
+            if not self.queue.complete(session, job_id, worker_id):
+                logger.warning(f"Ingestion job {job_id} was taken over; result not recorded")
+        return True
+
+    def _loop(self, worker_id: str) -> None:
+        last_reap = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_reap > 60:
+                    with Session(self.engine) as session:
+                        self.queue.requeue_stale(session)
+                    last_reap = time.monotonic()
+                if self.run_once(worker_id):
+                    continue
+            except Exception as e:
+                logger.error(f"Ingestion worker {worker_id} error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        for i in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._loop, args=(f"{self.worker_name}#{i}",), daemon=True, name=f"ingest-worker-{i}"
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Ingestion worker {self.worker_name} started with {self.concurrency} thread(s)")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def run_forever(self) -> None:
+        self.start()
+        try:
+            while any(t.is_alive() for t in self._threads):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stop()
+
+
+# Singleton instance
+job_queue = IngestionJobQueue()
@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from typing import Optional, List
 from enum import Enum
 
+from app.services.tokenizer_service import tokenizer
+
 class ResponseFormat(Enum):
     CONCISE = "concise"           # 1-3 sentences, factual queries
     STRUCTURED = "structured"     # bullet points, list queries
@@ -188,8 +190,8 @@ class OutputVerifier:
         """
         checks = {}
         
-        # Length check (approximate token count)
-        approx_tokens = len(response.split()) * 1.3
+        # Length check (tokenizer count)
+        approx_tokens = tokenizer.count(response)
         checks["length_compliant"] = approx_tokens <= contract.max_tokens * 1.2
         
         # Citation check
@@ -0,0 +1,22 @@
+import os
+
+
+def init_parse_worker(warm_docling: bool, threads_per_worker: int) -> None:
+    """
+    ProcessPoolExecutor initializer for the document parse pool.
+
+    Kept in a module with no heavy imports: a spawned worker imports only this
+    file before running it, so OMP_NUM_THREADS is in the environment before
+    anything can load torch (through Docling). Then caps the pypdf page-batch
+    processes so the pool's processes do not oversubscribe the cores, and
+    builds the converter.
+    """
+    os.environ.setdefault("OMP_NUM_THREADS", str(threads_per_worker))
+
+    from app.services.document_parsing import get_docling_parser
+    from app.services.pdf_text_extractor import limit_page_workers
+
+    limit_page_workers(threads_per_worker)
+    parser = get_docling_parser()
+    if warm_docling:
+        parser.warm_up()
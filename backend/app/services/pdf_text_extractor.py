@@ -0,0 +1,108 @@
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for page batches (0/1 = extract serially in the calling process)
+PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", str(max(1, (os.cpu_count() or 1) // 2))))
+# Below this many pages the process hop costs more than it saves
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_PAGE_BATCH_SIZE = int(os.getenv("PDF_PAGE_BATCH_SIZE", "16"))
+# Pages slower than this are logged and reported in parse stats
+PDF_SLOW_PAGE_SECONDS = float(os.getenv("PDF_SLOW_PAGE_SECONDS", "2.0"))
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+
+PageResult = Tuple[int, str, float]  # (page index, text, seconds)
+
+
+def extract_page_range(path: str, start: int, end: int) -> List[PageResult]:
+    """Extract pages [start, end) of a PDF. Each call opens its own reader so it can run in any process."""
+    reader = PdfReader(path)
+    results: List[PageResult] = []
+    for index in range(start, min(end, len(reader.pages))):
+        t0 = time.perf_counter()
+        try:
+            text = reader.pages[index].extract_text() or ""
+        except Exception as e:
+            logger.warning(f"pypdf could not extract page {index + 1} of {path}: {e}")
+            text = ""
+        results.append((index, text, time.perf_counter() - t0))
+    return results
+
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    global _page_pool
+    if _page_pool is None:
+        # Spawned: the calling process may already run Docling / torch threads
+        _page_pool = ProcessPoolExecutor(max_workers=PDF_PAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _page_pool
+
+
+def limit_page_workers(max_workers: int) -> None:
+    """Cap page-batch processes, e.g. inside a parse-pool process sharing the cores with its siblings."""
+    global PDF_PAGE_WORKERS
+    PDF_PAGE_WORKERS = max(1, min(PDF_PAGE_WORKERS, max_workers))
+
+
+def shutdown_page_pool() -> None:
+    global _page_pool
+    if _page_pool is not None:
+        _page_pool.shutdown(wait=False, cancel_futures=True)
+        _page_pool = None
+
+
+def extract_pdf_text(path: str, parallel: Optional[bool] = None) -> dict:
+    """
+    Basic (pypdf) text extraction. Large PDFs are split into page batches that
+    run across PDF_PAGE_WORKERS processes; page texts are joined once in page
+    order. Returns content, page_count, per-page timings and the slow pages.
+    """
+    page_count = len(PdfReader(path).pages)
+    if parallel is None:
+        parallel = PDF_PAGE_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+
+    started = time.perf_counter()
+    if parallel and page_count > PDF_PAGE_BATCH_SIZE:
+        pool = _get_page_pool()
+        futures = [
+            pool.submit(extract_page_range, path, start, start + PDF_PAGE_BATCH_SIZE)
+            for start in range(0, page_count, PDF_PAGE_BATCH_SIZE)
+        ]
+        pages: List[PageResult] = []
+        for future in futures:
+            pages.extend(future.result())
+    else:
+        parallel = False
+        pages = extract_page_range(path, 0, page_count)
+    elapsed = time.perf_counter() - started
+
+    content = "".join(text + "\n" for _, text, _ in pages)
+    page_timings = [
+        {"page": index + 1, "seconds": round(seconds, 4), "chars": len(text)}
+        for index, text, seconds in pages
+    ]
+    slow_pages = [t for t in page_timings if t["seconds"] >= PDF_SLOW_PAGE_SECONDS]
+    if slow_pages:
+        logger.warning(
+            f"Slow PDF pages in {os.path.basename(path)}: "
+            + ", ".join(f"p{t['page']} {t['seconds']:.1f}s" for t in slow_pages[:10])
+        )
+    logger.info(
+        f"Extracted {page_count} page(s) in {elapsed:.2f}s ({'parallel' if parallel else 'serial'})"
+    )
+
+    return {
+        "content": content,
+        "page_count": page_count,
+        "page_timings": page_timings,
+        "slow_pages": slow_pages,
+        "extraction_seconds": round(elapsed, 4),
+        "parallel": parallel,
+    }
@@ -0,0 +1,193 @@
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document as LCDocument
+from sqlalchemy import bindparam, text
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+# Embedding widths we build partial HNSW indexes for (see add_pgvector_store.py):
+# 768 = Google embedding-001, 384 = all-MiniLM-L6-v2
+INDEXED_DIMENSIONS = (768, 384)
+
+_column_available: Optional[bool] = None
+
+
+def _to_vector_literal(embedding: Iterable[float]) -> str:
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+class PgVectorStore:
+    """
+    Vector store backed by the `embedding` column on the chunk table (pgvector).
+
+    Embeddings live next to the chunk rows, so the ANN query can join Document
+    and apply project / active / document / source filters in SQL, and every
+    worker or node reads the same store instead of a local FAISS directory.
+
+    Implements the subset of the LangChain FAISS interface used by the ingestion
+    path (add_embeddings / delete / save_local) so DeltaIndexer can write to either.
+    """
+
+    def __init__(self, session: Session, embeddings):
+        self.session = session
+        self.embeddings = embeddings
+
+    @staticmethod
+    def is_available(session: Session) -> bool:
+        """True when running on Postgres with the embedding column migrated."""
+        global _column_available
+        if _column_available is None:
+            if session.get_bind().dialect.name != "postgresql":
+                _column_available = False
+            else:
+                row = session.execute(text(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = 'chunk' AND column_name = 'embedding'"
+                )).first()
+                _column_available = row is not None
+        return _column_available
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[Tuple[str, List[float]]],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Store precomputed embeddings on existing chunk rows, keyed by doc_id_version.
+        The chunk rows must already be flushed to the database.
+        """
+        pairs = list(text_embeddings)
+        if not pairs or not ids:
+            return []
+        params = [
+            {
+                "doc_id_version": chunk_id,
+                "embedding": _to_vector_literal(embedding),
+                "dim": len(embedding),
+            }
+            for chunk_id, (_, embedding) in zip(ids, pairs)
+        ]
+        self.session.execute(
+            text(
+                "UPDATE chunk SET embedding = CAST(:embedding AS vector), embedding_dim = :dim "
+                "WHERE doc_id_version = :doc_id_version"
+            ),
+            params,
+        )
+        return list(ids)
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None, ids: Optional[List[str]] = None) -> List[str]:
+        vectors = self.embeddings.embed_documents(list(texts))
+        return self.add_embeddings(zip(texts, vectors), metadatas, ids)
+
+    def delete(self, ids: Optional[List[str]] = None) -> None:
+        if not ids:
+            return
+        self.session.execute(
+            text(
+                "UPDATE chunk SET embedding = NULL, embedding_dim = NULL "
+                "WHERE doc_id_version IN :ids"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(ids)},
+        )
+
+    def save_local(self, folder_path: Optional[str] = None) -> None:
+        """No-op: embeddings are persisted with the chunk rows on commit."""
+        return None
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        project_id: Optional[int] = None,
+        filter_document_id: Optional[int] = None,
+        filter_sources: Optional[set[str]] = None,
+        filter: Optional[dict] = None,
+    ) -> List[Tuple[LCDocument, float]]:
+        """
+        Cosine-distance ANN search (lower is better, like FAISS L2 scores).
+        Filters are applied inside the query rather than post-hoc in Python.
+        Accepts FAISS-style filter={"project_id": ...} for drop-in callers.
+        """
+        if project_id is None and filter:
+            project_id = filter.get("project_id")
+        query_vector = self.embeddings.embed_query(query)
+        dim = int(len(query_vector))
+
+        filters = ["c.embedding_dim = :dim", "d.is_active = true"]
+        params = {"dim": dim, "q": _to_vector_literal(query_vector), "k": k}
+        if project_id is not None:
+            filters.append("d.project_id = :project_id")
+            params["project_id"] = project_id
+        if filter_document_id is not None:
+            filters.append("d.id = :document_id")
+            params["document_id"] = filter_document_id
+        statement_sql = (
+            "SELECT c.content, c.content_hash, c.doc_id_version, c.sentence_spans, d.id AS doc_id, "
+            "d.filename, d.project_id, "
+            f"(c.embedding::vector({dim})) <=> CAST(:q AS vector({dim})) AS distance "
+            "FROM chunk c JOIN document d ON d.id = c.document_id "
+            f"WHERE {' AND '.join(filters)}"
+        )
+        if filter_sources is not None:
+            if not filter_sources:
+                return []
+            statement_sql += " AND d.filename IN :sources"
+            params["sources"] = list(filter_sources)
+        statement_sql += " ORDER BY distance LIMIT :k"
+
+        statement = text(statement_sql)
+        if filter_sources is not None:
+            statement = statement.bindparams(bindparam("sources", expanding=True))
+
+        # Widen the HNSW candidate list so filtered queries still return k rows
+        self.session.execute(text(f"SET LOCAL hnsw.ef_search = {max(40, min(1000, k * 2))}"))
+        rows = self.session.execute(statement, params).all()
+
+        return [
+            (
+                LCDocument(
+                    page_content=row.content,
+                    metadata={
+                        "source": row.filename,
+                        "doc_id": row.doc_id,
+                        "project_id": row.project_id,
+                        "content_hash": row.content_hash,
+                        "doc_id_version": row.doc_id_version,
+                        "sentence_spans": row.sentence_spans,
+                    },
+                ),
+                float(row.distance),
+            )
+            for row in rows
+        ]
+
+    def index_project(self, project_id: int, batch_size: int = 64, only_missing: bool = False) -> int:
+        """
+        (Re-)embed chunks of a project's active, processed documents into the embedding column.
+        Returns the number of chunks embedded.
+        """
+        where_missing = " AND c.embedding IS NULL" if only_missing else ""
+        rows = self.session.execute(
+            text(
+                "SELECT c.doc_id_version, c.content FROM chunk c "
+                "JOIN document d ON d.id = c.document_id "
+                "WHERE d.project_id = :project_id AND d.is_active = true AND d.processed = true "
+                f"AND c.doc_id_version IS NOT NULL{where_missing} ORDER BY c.id"
+            ),
+            {"project_id": project_id},
+        ).all()
+
+        embedded = 0
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            texts = [r.content for r in batch]
+            vectors = self.embeddings.embed_documents(texts)
+            self.add_embeddings(zip(texts, vectors), ids=[r.doc_id_version for r in batch])
+            embedded += len(batch)
+        self.session.commit()
+        logger.info(f"pgvector: embedded {embedded} chunks for project {project_id}")
+        return embedded
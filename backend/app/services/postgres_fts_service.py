@@ -0,0 +1,119 @@
+import logging
+from typing import List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+FTS_LANGUAGE = "english"
+
+
+class PostgresFTSManager:
+    """
+    Lexical retrieval served by Postgres instead of pickled per-project BM25 files.
+
+    Uses the generated `chunk.content_tsv` column (GIN-indexed, see add_postgres_fts.py)
+    ranked with ts_rank_cd. Query terms are OR-ed like BM25 so partial keyword matches
+    still score. When full-text finds nothing (typos, odd codes) it falls back to
+    pg_trgm word similarity. Every worker reads the same index, and it is kept
+    current by Postgres on every chunk insert/update — no rebuild step.
+
+    Returns the same (chunk_text, score) contract as BM25IndexManager.search,
+    so results feed straight into hybrid_search_merge.
+    """
+
+    def __init__(self):
+        self._available: Optional[bool] = None
+
+    def is_available(self, session: Session) -> bool:
+        """True when running on Postgres with the content_tsv column migrated."""
+        if self._available is None:
+            if session.get_bind().dialect.name != "postgresql":
+                self._available = False
+            else:
+                row = session.execute(text(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = 'chunk' AND column_name = 'content_tsv'"
+                )).first()
+                self._available = row is not None
+        return self._available
+
+    def _filters(
+        self,
+        project_id: int,
+        filter_document_id: Optional[int],
+        filter_sources: Optional[set[str]],
+    ) -> Tuple[str, dict]:
+        clauses = ["d.project_id = :project_id", "d.is_active = true"]
+        params: dict = {"project_id": project_id}
+        if filter_document_id is not None:
+            clauses.append("d.id = :document_id")
+            params["document_id"] = filter_document_id
+        if filter_sources is not None:
+            clauses.append("d.filename IN :sources")
+            params["sources"] = list(filter_sources)
+        return " AND ".join(clauses), params
+
+    def _run(self, session: Session, sql: str, params: dict, expand_sources: bool) -> List[Tuple[str, float]]:
+        statement = text(sql)
+        if expand_sources:
+            statement = statement.bindparams(bindparam("sources", expanding=True))
+        rows = session.execute(statement, params).all()
+        return [(row.content, float(row.score)) for row in rows]
+
+    def search(
+        self,
+        session: Session,
+        project_id: int,
+        query: str,
+        top_k: int = 20,
+        filter_document_id: Optional[int] = None,
+        filter_sources: Optional[set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Full-text search within a project's active documents.
+        Returns list of (chunk_text, score), best first.
+        """
+        if not query or not query.strip():
+            return []
+        if filter_sources is not None and not filter_sources:
+            return []
+
+        where, params = self._filters(project_id, filter_document_id, filter_sources)
+        params.update({"q": query, "k": top_k})
+        expand = filter_sources is not None
+
+        try:
+            # plainto_tsquery ANDs terms; swap to OR to mirror BM25's bag-of-words matching
+            results = self._run(
+                session,
+                "WITH q AS (SELECT NULLIF(replace(plainto_tsquery("
+                f"'{FTS_LANGUAGE}', :q)::text, '&', '|'), '')::tsquery AS tsq) "
+                "SELECT c.content, ts_rank_cd(c.content_tsv, q.tsq) AS score "
+                "FROM chunk c JOIN document d ON d.id = c.document_id, q "
+                f"WHERE q.tsq IS NOT NULL AND c.content_tsv @@ q.tsq AND {where} "
+                "ORDER BY score DESC LIMIT :k",
+                params,
+                expand,
+            )
+            if results:
+                return results
+
+            return self._run(
+                session,
+                "SELECT c.content, word_similarity(:q, c.content) AS score "
+                "FROM chunk c JOIN document d ON d.id = c.document_id "
+                f"WHERE :q <% c.content AND {where} "
+                "ORDER BY score DESC LIMIT :k",
+                params,
+                expand,
+            )
+        except Exception as e:
+            logger.error(f"Postgres full-text search failed for project {project_id}: {e}")
+            session.rollback()
+            return []
+
+
+# Singleton instance
+postgres_fts = PostgresFTSManager()
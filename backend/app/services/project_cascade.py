@@ -0,0 +1,68 @@
+import os
+from typing import List
+
+from sqlalchemy import delete, or_
+from sqlmodel import Session, func, select
+
+from app.models.chat import ChatSession, Message
+from app.models.job import IngestionJob
+from app.models.query_log import QueryLog
+from app.models.rag import Chunk, ChunkAnchor, ChunkFact, Document, Project, RAGConfig
+
+# Projects with more chunks than this are deleted by a background job
+PROJECT_DELETE_SYNC_MAX_CHUNKS = int(os.getenv("PROJECT_DELETE_SYNC_MAX_CHUNKS", "5000"))
+
+
+class ProjectCascade:
+    """
+    Set-based delete of a project and every row hanging off it: one
+    DELETE ... WHERE per table (children first, keyed by project_id or a
+    subquery on it) instead of loading and deleting ORM objects one by one.
+    Index files and in-memory caches are cleaned up by RAGEngine.delete_project.
+    """
+
+    def chunk_count(self, session: Session, project_id: int) -> int:
+        return session.exec(
+            select(func.count())
+            .select_from(Chunk)
+            .join(Document, Chunk.document_id == Document.id)
+            .where(Document.project_id == project_id)
+        ).one()
+
+    def chat_session_ids(self, session: Session, project_id: int) -> List[int]:
+        return list(session.exec(select(ChatSession.id).where(ChatSession.project_id == project_id)).all())
+
+    def delete_rows(self, session: Session, project_id: int) -> dict:
+        """Delete the project's rows in one transaction. Returns rows deleted per table."""
+        doc_ids = select(Document.id).where(Document.project_id == project_id)
+        chat_ids = select(ChatSession.id).where(ChatSession.project_id == project_id)
+
+        statements = [
+            ("query_logs", delete(QueryLog).where(
+                or_(QueryLog.project_id == project_id, QueryLog.session_id.in_(chat_ids))
+            )),
+            ("messages", delete(Message).where(Message.session_id.in_(chat_ids))),
+            ("chat_sessions", delete(ChatSession).where(ChatSession.project_id == project_id)),
+            ("chunk_facts", delete(ChunkFact).where(ChunkFact.document_id.in_(doc_ids))),
+            ("chunk_anchors", delete(ChunkAnchor).where(ChunkAnchor.document_id.in_(doc_ids))),
+            ("chunks", delete(Chunk).where(Chunk.document_id.in_(doc_ids))),
+            ("jobs", delete(IngestionJob).where(
+                or_(IngestionJob.project_id == project_id, IngestionJob.document_id.in_(doc_ids))
+            )),
+            ("documents", delete(Document).where(Document.project_id == project_id)),
+            ("configs", delete(RAGConfig).where(RAGConfig.project_id == project_id)),
+            ("projects", delete(Project).where(Project.id == project_id)),
+        ]
+        counts = {}
+        try:
+            for name, statement in statements:
+                counts[name] = session.execute(statement.execution_options(synchronize_session=False)).rowcount
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return counts
+
+
+# Singleton instance
+project_cascade = ProjectCascade()
@@ -1,6 +1,11 @@
 import hashlib
 from typing import Optional, List
 
+from app.services.tokenizer_service import tokenizer
+
+# Prompts shorter than this are never served from the provider's prompt cache
+MIN_CACHEABLE_TOKENS = {"anthropic": 1024, "openai": 1024}
+
 class PromptCacheManager:
     """
     Manages prompt caching for LLM API calls.
@@ -118,6 +123,10 @@ class PromptCacheManager:
         """Track which system prompts are being cached."""
         return hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
     
+    def count_tokens(self, text: str, model: Optional[str] = None) -> int:
+        """Token count for `text` with the model family's tokenizer."""
+        return tokenizer.count(text, model)
+    
     def estimate_cache_savings(
         self,
         system_prompt_tokens: int,
@@ -133,6 +142,8 @@ class PromptCacheManager:
             "openai": 0.50,      # 50% reduction on cached input
             "groq": 0.0          # No caching support
         }.get(provider, 0.0)
+        if system_prompt_tokens < MIN_CACHEABLE_TOKENS.get(provider, 0):
+            savings_rate = 0.0
         
         # Approximate cost per token (Claude Sonnet)
         cost_per_token = 0.000003
@@ -0,0 +1,73 @@
+import os
+import queue
+import threading
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+# Documents with at least this much text are chunked/embedded/indexed as a stream
+STREAM_INDEX_MIN_CHARS = int(os.getenv("STREAM_INDEX_MIN_CHARS", str(2 * 1024 * 1024)))
+# Chunks embedded per embedding call
+STREAM_EMBED_BATCH = int(os.getenv("STREAM_EMBED_BATCH", "64"))
+# Chunked batches allowed to wait for the embedder before the chunker blocks
+STREAM_MAX_PENDING_BATCHES = int(os.getenv("STREAM_MAX_PENDING_BATCHES", "4"))
+# Batches between checkpoints (vector store save + DB commit)
+STREAM_CHECKPOINT_BATCHES = int(os.getenv("STREAM_CHECKPOINT_BATCHES", "8"))
+# Text handed to the chunker per step
+STREAM_SECTION_CHARS = int(os.getenv("STREAM_SECTION_CHARS", "256000"))
+
+_DONE = object()
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def prefetch(items: Iterable[T], max_pending: int) -> Iterator[T]:
+    """
+    Produce `items` on a background thread, at most `max_pending` ahead of the
+    consumer. The producer blocks when the consumer falls behind (backpressure);
+    producer exceptions are re-raised in the consumer. Closing the generator
+    stops the producer.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as exc:
+            put(exc)
+
+    thread = threading.Thread(target=produce, daemon=True, name="stream-index-producer")
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join(timeout=5)
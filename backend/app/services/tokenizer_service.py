@@ -0,0 +1,120 @@
+import os
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Threads tiktoken may use for batch encoding
+TOKENIZER_BATCH_THREADS = int(os.getenv("TOKENIZER_BATCH_THREADS", "4"))
+
+DEFAULT_ENCODING = "cl100k_base"
+
+# Model-name prefix -> tiktoken encoding. Models without a public BPE (Gemini,
+# Llama on Groq, Claude, HF embedders) are counted with cl100k_base, which
+# tracks their tokenizers far more closely than a characters/4 estimate.
+MODEL_FAMILY_ENCODINGS = [
+    ("gpt-4o", "o200k_base"),
+    ("gpt-4.1", "o200k_base"),
+    ("o1", "o200k_base"),
+    ("o3", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("gpt-3.5", "cl100k_base"),
+    ("text-embedding", "cl100k_base"),
+]
+
+
+class TokenizerService:
+    """
+    Token counting with one cached tiktoken encoder per encoding (model family).
+    Falls back to the ~4 chars/token estimate when tiktoken or its BPE files
+    are unavailable (e.g. offline without a TIKTOKEN_CACHE_DIR).
+    """
+
+    def __init__(self):
+        self._encoders: Dict[str, object] = {}
+        self._failed: set = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def encoding_name_for(model: Optional[str]) -> str:
+        name = (model or "").lower()
+        for prefix, encoding in MODEL_FAMILY_ENCODINGS:
+            if name.startswith(prefix):
+                return encoding
+        return DEFAULT_ENCODING
+
+    def _encoder(self, model: Optional[str]):
+        encoding_name = self.encoding_name_for(model)
+        encoder = self._encoders.get(encoding_name)
+        if encoder is not None or encoding_name in self._failed:
+            return encoder
+        with self._lock:
+            if encoding_name in self._encoders:
+                return self._encoders[encoding_name]
+            try:
+                import tiktoken
+                encoder = tiktoken.get_encoding(encoding_name)
+                self._encoders[encoding_name] = encoder
+            except Exception as e:
+                logger.warning(f"tiktoken encoding {encoding_name} unavailable, estimating tokens: {e}")
+                self._failed.add(encoding_name)
+                encoder = None
+        return encoder
+
+    @staticmethod
+    def _estimate(text: str) -> int:
+        return (len(text) + 3) // 4
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        if not text:
+            return 0
+        encoder = self._encoder(model)
+        if encoder is None:
+            return self._estimate(text)
+        return len(encoder.encode_ordinary(text))
+
+    def count_batch(self, texts: List[str], model: Optional[str] = None) -> List[int]:
+        if not texts:
+            return []
+        encoder = self._encoder(model)
+        if encoder is None:
+            return [self._estimate(t) for t in texts]
+        encoded = encoder.encode_ordinary_batch(texts, num_threads=TOKENIZER_BATCH_THREADS)
+        return [len(tokens) for tokens in encoded]
+
+    def encode(self, text: str, model: Optional[str] = None) -> Optional[List[int]]:
+        """Token ids, or None when only the estimate is available."""
+        encoder = self._encoder(model)
+        return encoder.encode_ordinary(text) if encoder is not None else None
+
+    def split_to_limit(self, text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+        """Cut text into pieces of at most max_tokens tokens, preferring whitespace boundaries."""
+        total = self.count(text, model)
+        if total <= max_tokens:
+            return [text]
+        pieces = []
+        chars_per_token = len(text) / total
+        start = 0
+        while start < len(text):
+            end = min(len(text), start + max(1, int(max_tokens * chars_per_token)))
+            # The window is sized from the average density, so any piece (the
+            # last one included) may hold more tokens than that; shrink until it fits
+            while end > start + 1 and self.count(text[start:end], model) > max_tokens:
+                end = start + int((end - start) * 0.9)
+            if end < len(text):
+                space = text.rfind(" ", start + 1, end)
+                end = space if space > start else end
+            piece = text[start:end].strip()
+            if piece:
+                pieces.append(piece)
+            start = end
+        return pieces
+
+
+# Singleton instance
+tokenizer = TokenizerService()
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    return tokenizer.count(text, model)
@@ -23,7 +23,11 @@ class VersionedSemanticCache:
     def set(self, query: str, response: str, project_id: int, kb_version: int):
         """Cache query response with versioned key."""
         versioned_query = self._build_key(query, project_id, kb_version)
-        self.base_cache.set(versioned_query, response)
+        self.base_cache.set(versioned_query, response, project_id=project_id)
+
+    def invalidate_project(self, project_id: int) -> int:
+        """Drop every cached response of a project (e.g. when it is deleted)."""
+        return self.base_cache.discard(project_id)
 
     @property
     def stats(self) -> dict:
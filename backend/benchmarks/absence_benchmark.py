@@ -0,0 +1,124 @@
+"""
+AbsenceProver benchmark at 100k chunks.
+
+Seeds one project with synthetic chunks, then times `scan_corpus` for a
+keyword set that is absent and one that is present. On PostgreSQL (with
+add_postgres_fts.py applied) the pg_trgm index lookup is timed against the
+streamed Python scan, and both must return the same counts. Runs against a
+scratch SQLite database (Python scan only) unless DATABASE_URL is set:
+
+    cd backend
+    python -m benchmarks.absence_benchmark --chunks 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    _scratch = os.path.join(tempfile.mkdtemp(prefix="ragops-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}"
+
+from sqlalchemy import delete  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from app.db import engine, init_db  # noqa: E402
+from app.models.rag import Chunk, ChunkFact, Document, Project  # noqa: E402
+from app.services import absence_prover  # noqa: E402
+from app.services.absence_prover import AbsenceProver  # noqa: E402
+
+WORDS = (
+    "invoice contract revenue policy retention compliance quarterly audit vendor payment "
+    "schedule clause liability renewal termination security incident response customer"
+).split()
+ABSENT_KEYWORDS = ["photosynthesis", "zeppelin"]
+PRESENT_KEYWORDS = ["indemnification", "zeppelin"]
+
+
+def seed(session: Session, n_chunks: int, n_docs: int, seed_value: int = 17) -> int:
+    rng = random.Random(seed_value)
+    project = Project(name="absence-benchmark")
+    session.add(project)
+    session.commit()
+    session.refresh(project)
+
+    docs = [Document(project_id=project.id, filename=f"bench_{i}.txt", content="", processed=True) for i in range(n_docs)]
+    session.add_all(docs)
+    session.commit()
+    doc_ids = [d.id for d in docs]
+
+    batch = []
+    for i in range(n_chunks):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(80, 160))]
+        if i % 5000 == 0:
+            # A handful of chunks carry the "present" keyword
+            words.insert(rng.randrange(len(words)), "indemnification")
+        batch.append(Chunk(document_id=doc_ids[i % n_docs], content=" ".join(words), chunk_index=i))
+        if len(batch) >= 5000:
+            session.add_all(batch)
+            session.commit()
+            batch = []
+    if batch:
+        session.add_all(batch)
+        session.commit()
+    return project.id
+
+
+def cleanup(session: Session, project_id: int) -> None:
+    doc_ids = [d.id for d in session.query(Document).filter(Document.project_id == project_id)]
+    session.execute(delete(ChunkFact).where(ChunkFact.document_id.in_(doc_ids)))
+    session.execute(delete(Chunk).where(Chunk.document_id.in_(doc_ids)))
+    session.execute(delete(Document).where(Document.project_id == project_id))
+    session.execute(delete(Project).where(Project.id == project_id))
+    session.commit()
+
+
+def timed_scan(prover: AbsenceProver, keywords, project_id: int, use_index: bool) -> dict:
+    absence_prover._trigram_index_available = None if use_index else False
+    t0 = time.perf_counter()
+    proof = prover.scan_corpus(keywords, project_id)
+    proof["wall_seconds"] = time.perf_counter() - t0
+    return proof
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AbsenceProver scan benchmark")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--docs", type=int, default=200)
+    args = parser.parse_args()
+
+    init_db()
+    with Session(engine) as session:
+        t0 = time.perf_counter()
+        project_id = seed(session, args.chunks, args.docs)
+        print(f"seeded {args.chunks} chunks in {time.perf_counter() - t0:.1f}s ({engine.dialect.name})")
+
+        prover = AbsenceProver(session)
+        modes = [False]
+        if engine.dialect.name == "postgresql":
+            modes.insert(0, True)
+        try:
+            for label, keywords in (("absent", ABSENT_KEYWORDS), ("present", PRESENT_KEYWORDS)):
+                counts = set()
+                for use_index in modes:
+                    proof = timed_scan(prover, keywords, project_id, use_index)
+                    counts.add((proof["total_chunks_scanned"], proof["matching_chunk_count"]))
+                    print(f"  {label:<8} {proof['scan_method']:<14} {proof['wall_seconds'] * 1000:>9.1f} ms  "
+                          f"scanned={proof['total_chunks_scanned']} matched={proof['matching_chunk_count']} "
+                          f"absent={proof['absence_proven']}")
+                if len(counts) > 1:
+                    print(f"MISMATCH for {label}: {counts}")
+                    return 1
+            if len(modes) == 1:
+                print("  (trigram path needs PostgreSQL with add_postgres_fts.py applied)")
+        finally:
+            absence_prover._trigram_index_available = None
+            cleanup(session, project_id)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+End-to-end bulk ingestion benchmark (documents/minute).
+
+Compares the one-request-per-file path (hash, dedup query, inline parse,
+insert, enqueue, commit per document) with `bulk_ingest` (one dedup query,
+process-pool parsing, batched inserts/enqueues) on a synthetic corpus.
+Runs against a scratch SQLite database unless DATABASE_URL is set:
+
+    cd backend
+    python -m benchmarks.bulk_ingest_benchmark --docs 2000
+    python -m benchmarks.bulk_ingest_benchmark --docs 200 --process   # also chunk + embed (MiniLM)
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+if not os.getenv("DATABASE_URL"):
+    _scratch = os.path.join(tempfile.mkdtemp(prefix="ragops-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_scratch}"
+
+from sqlmodel import Session, select  # noqa: E402
+
+from app.db import engine, init_db  # noqa: E402
+from app.models.job import IngestionJob  # noqa: E402
+from app.models.rag import Document, Project, RAGConfig  # noqa: E402
+from app.rag.bulk_ingest import bulk_ingest  # noqa: E402
+from app.services.document_parsing import (  # noqa: E402
+    prepare_document,
+    remove_spooled,
+    shutdown_parse_pool,
+    spool_stream,
+)
+from app.services.job_queue import JOB_PROCESS_DOCUMENT, job_queue  # noqa: E402
+
+WORDS = (
+    "invoice contract revenue policy retention compliance quarterly audit vendor payment "
+    "schedule clause liability renewal termination security incident response customer "
+    "support escalation pricing discount region warehouse shipment inventory forecast"
+).split()
+
+
+def synthetic_corpus(n_docs: int, paragraphs: int, duplicate_ratio: float, seed: int = 7):
+    rng = random.Random(seed)
+    files = []
+    for i in range(n_docs):
+        if files and rng.random() < duplicate_ratio:
+            files.append((f"dup_{i}.txt", files[rng.randrange(len(files))][1]))
+            continue
+        body = "\n\n".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) + "."
+            for _ in range(paragraphs)
+        )
+        files.append((f"doc_{i}.md", f"# Document {i}\n\n{body}\n".encode("utf-8")))
+    return files
+
+
+def make_project(name: str) -> int:
+    with Session(engine) as session:
+        project = Project(name=name)
+        session.add(project)
+        session.commit()
+        session.refresh(project)
+        session.add(RAGConfig(project_id=project.id, embedding_model="huggingface-minilm"))
+        session.commit()
+        return project.id
+
+
+def spool_corpus(files):
+    """Write the corpus to temp files the way the upload routes spool request bodies."""
+    return [spool_stream(io.BytesIO(raw_bytes), filename) for filename, raw_bytes in files]
+
+
+def ingest_sequential(project_id: int, files) -> None:
+    """Mirrors POST /upload once per file."""
+    with Session(engine) as session:
+        for filename, raw_bytes in files:
+            spooled = spool_stream(io.BytesIO(raw_bytes), filename)
+            try:
+                exists = session.exec(
+                    select(Document.id)
+                    .where(Document.project_id == project_id)
+                    .where(Document.document_hash == spooled.sha256)
+                    .where(Document.is_active == True)
+                ).first()
+                if exists:
+                    continue
+                prepared = prepare_document(filename, spooled.path)
+            finally:
+                remove_spooled(spooled)
+            doc = Document(
+                filename=filename,
+                content=prepared["content"],
+                project_id=project_id,
+                file_size_bytes=spooled.size,
+                document_hash=spooled.sha256,
+                parsing_method=prepared["parsing_method"],
+                redaction_log=prepared["redaction_log"],
+            )
+            session.add(doc)
+            session.commit()
+            session.refresh(doc)
+            job_queue.enqueue(session, JOB_PROCESS_DOCUMENT, document_id=doc.id, project_id=project_id)
+
+
+def ingest_bulk(project_id: int, files) -> dict:
+    with Session(engine) as session:
+        return asyncio.run(bulk_ingest(session, project_id, None, spool_corpus(files)))
+
+
+def drain_jobs(project_id: int) -> int:
+    from app.rag.ingest_jobs import build_worker
+
+    worker = build_worker(concurrency=1)
+    processed = 0
+    while worker.run_once("benchmark"):
+        processed += 1
+    with Session(engine) as session:
+        failed = session.exec(
+            select(IngestionJob.id)
+            .where(IngestionJob.project_id == project_id)
+            .where(IngestionJob.status == "failed")
+        ).all()
+    if failed:
+        print(f"  {len(failed)} job(s) failed")
+    return processed
+
+
+def report(label: str, n_docs: int, seconds: float) -> float:
+    rate = n_docs / seconds * 60 if seconds else float("inf")
+    print(f"{label:<34} {n_docs:>6} docs  {seconds:>8.2f}s  {rate:>10.0f} docs/min")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingestion docs/minute benchmark")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--duplicates", type=float, default=0.05, help="fraction of duplicate files")
+    parser.add_argument("--process", action="store_true", help="also run chunking/embedding jobs")
+    args = parser.parse_args()
+
+    init_db()
+    files = synthetic_corpus(args.docs, args.paragraphs, args.duplicates)
+    print(f"Database: {engine.url}")
+    print(f"Corpus: {len(files)} files, {sum(len(b) for _, b in files) / 1e6:.1f} MB\n")
+
+    seq_project = make_project(f"bench-seq-{time.time_ns()}")
+    t0 = time.perf_counter()
+    ingest_sequential(seq_project, files)
+    seq_rate = report("sequential (per-file upload path)", len(files), time.perf_counter() - t0)
+
+    bulk_project = make_project(f"bench-bulk-{time.time_ns()}")
+    t0 = time.perf_counter()
+    result = ingest_bulk(bulk_project, files)
+    bulk_seconds = time.perf_counter() - t0
+    bulk_rate = report("bulk_ingest", len(files), bulk_seconds)
+    print(f"  totals: {result['totals']}")
+    print(f"  speedup: {bulk_rate / seq_rate:.1f}x")
+
+    if args.process:
+        t0 = time.perf_counter()
+        processed = drain_jobs(bulk_project)
+        job_seconds = time.perf_counter() - t0
+        report("chunk + embed jobs", processed, job_seconds)
+        report("end-to-end (bulk + jobs)", len(files), bulk_seconds + job_seconds)
+
+    shutdown_parse_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
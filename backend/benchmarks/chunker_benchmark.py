@@ -0,0 +1,103 @@
+"""
+Recursive splitter benchmark at 1 MB / 10 MB.
+
+Times the offset-based `AdaptiveChunker._recursive_chunk` against the previous
+string-concatenating splitter (reproduced below as `legacy_recursive_split`,
+which re-splits oversized pieces and recomputes overlap by splitting the
+previous chunk into words each time).
+
+    cd backend
+    python -m benchmarks.chunker_benchmark --sizes 1 10 --chunk-size 1000 --overlap 200
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from app.services.adaptive_chunker import AdaptiveChunker
+
+WORDS = (
+    "invoice contract revenue policy retention compliance quarterly audit vendor payment "
+    "schedule clause liability renewal termination security incident response customer"
+).split()
+
+
+def synthetic_text(size_mb: float, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    size = 0
+    while size < target:
+        # Mostly normal paragraphs, some very long run-on ones to force deeper recursion
+        n_words = rng.randint(20, 200) if rng.random() < 0.9 else rng.randint(800, 3000)
+        sentences = []
+        while n_words > 0:
+            k = min(n_words, rng.randint(6, 25))
+            sentences.append(" ".join(rng.choice(WORDS) for _ in range(k)).capitalize() + ".")
+            n_words -= k
+        paragraph = " ".join(sentences) + rng.choice(["\n\n", "\n"])
+        parts.append(paragraph)
+        size += len(paragraph)
+    return "".join(parts)[:target]
+
+
+def legacy_recursive_split(text, separators, chunk_size, chunk_overlap):
+    if len(text) <= chunk_size:
+        return [text] if text.strip() else []
+    separator = separators[0] if separators else ""
+    splits = text.split(separator) if separator else list(text)
+    chunks = []
+    current = ""
+    for split in splits:
+        if len(current) + len(split) + len(separator) <= chunk_size:
+            current += (separator if current else "") + split
+        else:
+            if current:
+                chunks.append(current)
+            if len(split) > chunk_size and len(separators) > 1:
+                chunks.extend(legacy_recursive_split(split, separators[1:], chunk_size, chunk_overlap))
+            else:
+                current = split
+    if current:
+        chunks.append(current)
+    if chunk_overlap > 0:
+        overlapped = []
+        for i, chunk in enumerate(chunks):
+            if i > 0:
+                prev_words = chunks[i - 1].split()[-chunk_overlap // 10:]
+                chunk = " ".join(prev_words) + " " + chunk
+            overlapped.append(chunk)
+        return overlapped
+    return chunks
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recursive splitter benchmark")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 10], help="input sizes in MB")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--overlap", type=int, default=200)
+    args = parser.parse_args()
+
+    chunker = AdaptiveChunker(chunk_size=args.chunk_size, chunk_overlap=args.overlap)
+    print(f"{'size':>8}  {'splitter':<14} {'chunks':>8} {'time':>9} {'MB/s':>8}")
+    for size_mb in args.sizes:
+        text = synthetic_text(size_mb)
+        legacy, legacy_s = timed(
+            legacy_recursive_split, text, AdaptiveChunker.RECURSIVE_SEPARATORS, args.chunk_size, args.overlap
+        )
+        (chunks, _), new_s = timed(chunker._recursive_chunk, text)
+        for label, n, seconds in (("legacy", len(legacy), legacy_s), ("offset-based", len(chunks), new_s)):
+            print(f"{size_mb:>6.0f}MB  {label:<14} {n:>8} {seconds:>8.2f}s {size_mb / seconds:>8.1f}")
+        print(f"          speedup {legacy_s / new_s:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+ContextualCompressor latency benchmark.
+
+Times `compress_chunks` (one TF-IDF fit and one sparse product per request)
+against the previous per-sentence scorer, reproduced below as
+`legacy_compress_chunks`, which fitted a new TfidfVectorizer for every
+(query, sentence) pair and ran six uncompiled regexes per sentence.
+
+    cd backend
+    python -m benchmarks.compressor_benchmark --chunks 8 --sentences 30 --runs 20
+"""
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+
+from app.services.contextual_compressor import ContextualCompressor
+
+WORDS = (
+    "invoice contract revenue policy retention compliance quarterly audit vendor payment "
+    "schedule clause liability renewal termination security incident response customer "
+    "the a of for with under within after before"
+).split()
+QUERY = "what is the retention policy for customer invoices after contract termination"
+
+
+def synthetic_chunks(n_chunks: int, n_sentences: int, seed: int = 5) -> list:
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(n_chunks):
+        sentences = []
+        for _ in range(n_sentences):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(8, 24))]
+            if rng.random() < 0.15:
+                words.insert(rng.randrange(len(words)), f"{rng.randint(1, 99)}%")
+            sentences.append(" ".join(words).capitalize() + ".")
+        chunks.append({"content": " ".join(sentences)})
+    return chunks
+
+
+def legacy_relevance(query: str, sentence: str) -> float:
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        vectorizer = TfidfVectorizer(stop_words="english", min_df=1)
+        tfidf_matrix = vectorizer.fit_transform([query, sentence])
+        return float(cosine_similarity(tfidf_matrix[0], tfidf_matrix[1])[0][0])
+    except Exception:
+        query_words = set(query.lower().split())
+        sent_words = set(sentence.lower().split())
+        return len(query_words & sent_words) / max(len(query_words), 1)
+
+
+def legacy_factual(sentence: str) -> bool:
+    factual_patterns = [
+        r"\b\d+(?:\.\d+)?%",
+        r"\$[\d,]+(?:\.\d{2})?",
+        r"\b\d{4}\b",
+        r"\b\d+\s+(?:days|months|years|hours|weeks)\b",
+        r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+\b",
+        r"\b(?:section|clause|article)\s+[\d\.]+",
+    ]
+    return any(re.search(p, sentence, re.IGNORECASE) for p in factual_patterns)
+
+
+def legacy_compress_chunks(compressor: ContextualCompressor, query: str, chunks: list) -> int:
+    kept_total = 0
+    for chunk in chunks:
+        sentences = compressor._split_sentences(chunk["content"])
+        kept = [
+            s for s in sentences
+            if legacy_relevance(query, s) >= compressor.similarity_threshold or legacy_factual(s)
+        ]
+        kept_total += len(kept)
+    return kept_total
+
+
+def timed_runs(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ContextualCompressor latency benchmark")
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--sentences", type=int, default=30, help="sentences per chunk")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    compressor = ContextualCompressor()
+    chunks = synthetic_chunks(args.chunks, args.sentences)
+
+    legacy_s = timed_runs(lambda: legacy_compress_chunks(compressor, QUERY, chunks), args.runs)
+    new_s = timed_runs(lambda: compressor.compress_chunks(QUERY, chunks, max_total_tokens=10 ** 6), args.runs)
+
+    print(f"{args.chunks} chunks x {args.sentences} sentences, median of {args.runs} runs")
+    print(f"  legacy (fit per sentence)  {legacy_s * 1000:>9.2f} ms")
+    print(f"  vectorized (one fit)       {new_s * 1000:>9.2f} ms")
+    print(f"  speedup                    {legacy_s / new_s:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+ConflictDetector benchmark at 10 / 50 / 200 chunks.
+
+Times `detect_conflicts` (facts extracted once per chunk, chunks bucketed by
+fact type and value set) against the previous all-pairs detector, reproduced
+below as `legacy_detect_conflicts`, which re-ran every pattern over both
+texts for each of the n*(n-1)/2 pairs. Both must report the same pairs.
+
+    cd backend
+    python -m benchmarks.conflict_benchmark --sizes 10 50 200
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from itertools import combinations
+
+from app.services.conflict_detector import ConflictDetector
+
+FILLER = (
+    "The service agreement covers maintenance, support and upgrades for the platform. "
+    "Either party may raise a dispute through the escalation process described below. "
+)
+FACTS = [
+    "Payment is due within {n} days of invoice.",
+    "The annual fee is ${n},000.",
+    "Uptime is guaranteed at {p}%.",
+    "The contract was signed in {year}.",
+    "Renewal happens on {month} {year}.",
+    "The notice period is {n} months.",
+]
+MONTHS = ["january", "march", "june", "september", "december"]
+
+
+def synthetic_chunks(n_chunks: int, seed: int = 9) -> list:
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(n_chunks):
+        parts = [FILLER * rng.randint(2, 6)]
+        for fact in rng.sample(FACTS, rng.randint(0, 3)):
+            parts.append(fact.format(
+                n=rng.choice([30, 45, 60, 90]),
+                p=rng.choice([99.5, 99.9]),
+                year=rng.choice([2022, 2023, 2024]),
+                month=rng.choice(MONTHS),
+            ))
+        chunks.append({"content": " ".join(parts), "source": f"doc_{i % 7}.pdf", "id": str(i)})
+    return chunks
+
+
+def legacy_detect_conflicts(chunks: list) -> list:
+    pairs = []
+    for i, j in combinations(range(len(chunks)), 2):
+        conflicts = []
+        for pattern in ConflictDetector.FACTUAL_SIGNALS:
+            values_a = set(v.lower().strip() for v in re.findall(pattern, chunks[i]["content"], re.IGNORECASE)
+                           if isinstance(v, str) and v.strip())
+            values_b = set(v.lower().strip() for v in re.findall(pattern, chunks[j]["content"], re.IGNORECASE)
+                           if isinstance(v, str) and v.strip())
+            if values_a and values_b and values_a != values_b:
+                conflicts.append(pattern)
+        if conflicts:
+            pairs.append((i, j, tuple(conflicts)))
+    return pairs
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConflictDetector scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200], help="chunk counts")
+    args = parser.parse_args()
+
+    detector = ConflictDetector()
+    print(f"{'chunks':>7} {'pairs':>8} {'legacy':>10} {'indexed':>10} {'speedup':>8}")
+    for n in args.sizes:
+        chunks = synthetic_chunks(n)
+        legacy, legacy_s = timed(legacy_detect_conflicts, chunks)
+        result, new_s = timed(detector.detect_conflicts, chunks, "")
+        indexed = [
+            (p["chunk_a_index"], p["chunk_b_index"], tuple(c["pattern_type"] for c in p["conflicting_values"]))
+            for p in result["conflict_pairs"]
+        ]
+        if indexed != legacy:
+            print(f"MISMATCH at {n} chunks: {len(legacy)} legacy vs {len(indexed)} indexed pairs")
+            return 1
+        print(f"{n:>7} {len(indexed):>8} {legacy_s * 1000:>8.1f}ms {new_s * 1000:>8.1f}ms {legacy_s / new_s:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
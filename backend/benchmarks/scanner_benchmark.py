@@ -0,0 +1,132 @@
+"""
+IngestionScanner benchmark on a large synthetic text file.
+
+Times the scanner (single combined-pattern pass, bisect line numbers,
+single-join redaction) against the previous implementation, reproduced below
+as `legacy_scan` / `legacy_redact`. The new scanner resolves matches starting
+at the same offset by severity, so it reports fewer findings; the benchmark
+checks it still reaches the same quarantine decision and covers every span
+the legacy scanner found.
+The legacy path is quadratic in findings x offset, so it runs on a smaller
+slice by default.
+
+    cd backend
+    python -m benchmarks.scanner_benchmark --mb 50 --legacy-mb 2
+"""
+
+import argparse
+import random
+from bisect import bisect_right
+import re
+import sys
+import time
+
+from app.services.ingestion_scanner import IngestionScanner
+
+FILLER = (
+    "The vendor agreement renews annually unless terminated with ninety days notice. "
+    "Quarterly audit findings are shared with the compliance team for review.\n"
+)
+SECRETS = [
+    "contact: jane.doe@example.com",
+    "call 9876543210 for support",
+    "SSN 123-45-6789 on file",
+    "card 4111 1111 1111 1111 expires soon",
+    "aadhaar 2345 6789 0123 verified",
+]
+
+
+def synthetic_text(size_mb: float, secrets_per_mb: int, seed: int = 11) -> str:
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    lines_per_mb = (1024 * 1024) // len(FILLER)
+    parts = []
+    size = 0
+    while size < target:
+        for _ in range(lines_per_mb):
+            if rng.random() < secrets_per_mb / lines_per_mb:
+                line = rng.choice(SECRETS) + "\n"
+            else:
+                line = FILLER
+            parts.append(line)
+            size += len(line)
+    return "".join(parts)[:target]
+
+
+def legacy_scan(text: str) -> list:
+    findings = []
+    for secret_type, (pattern, severity) in IngestionScanner.SECRET_PATTERNS.items():
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            findings.append((
+                secret_type, severity.value, match.start(), match.end(), text[:match.start()].count("\n") + 1
+            ))
+    return findings
+
+
+def same_outcome(new_scan: dict, old_findings: list) -> bool:
+    """Same quarantine decision, and every legacy span overlaps a reported one."""
+    old_critical = any(severity == "critical" for _, severity, _, _, _ in old_findings)
+    if new_scan["has_critical_secrets"] != old_critical:
+        return False
+    spans = sorted((f["position_start"], f["position_end"]) for f in new_scan["findings"])
+    starts = [start for start, _ in spans]
+    for _, _, start, end, _ in old_findings:
+        i = bisect_right(starts, end - 1)
+        if not any(s < end and start < e for s, e in spans[max(0, i - 8):i]):
+            return False
+    return True
+
+
+def legacy_redact(text: str) -> str:
+    redacted = text
+    matches = []
+    for secret_type, (pattern, _) in IngestionScanner.SECRET_PATTERNS.items():
+        for match in re.finditer(pattern, redacted, re.IGNORECASE):
+            matches.append((match.start(), match.end(), secret_type))
+    matches.sort(key=lambda x: x[0], reverse=True)
+    for start, end, secret_type in matches:
+        redacted = redacted[:start] + f"[REDACTED:{secret_type.upper()}]" + redacted[end:]
+        text[:start].count("\n")
+    return redacted
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IngestionScanner throughput benchmark")
+    parser.add_argument("--mb", type=float, default=50)
+    parser.add_argument("--legacy-mb", type=float, default=2, help="size for the legacy comparison (0 to skip)")
+    parser.add_argument("--secrets-per-mb", type=int, default=200)
+    args = parser.parse_args()
+
+    scanner = IngestionScanner()
+
+    text = synthetic_text(args.mb, args.secrets_per_mb)
+    scan, scan_s = timed(scanner.scan_document, text)
+    redact, redact_s = timed(scanner.redact_document, text, scan)
+    print(f"scanner      {args.mb:>6.1f} MB  {scan['total_findings']:>8} findings  "
+          f"scan {scan_s:>7.2f}s ({args.mb / scan_s:>6.1f} MB/s)  redact {redact_s:>6.2f}s")
+
+    if args.legacy_mb:
+        small = synthetic_text(args.legacy_mb, args.secrets_per_mb)
+        new_scan, new_scan_s = timed(scanner.scan_document, small)
+        _, new_redact_s = timed(scanner.redact_document, small, new_scan)
+        old_findings, old_scan_s = timed(legacy_scan, small)
+        _, old_redact_s = timed(legacy_redact, small)
+        if not same_outcome(new_scan, old_findings):
+            print("MISMATCH: quarantine decision or coverage differs from the legacy scanner")
+            return 1
+        print(f"\n{args.legacy_mb:.1f} MB comparison ({len(old_findings)} legacy / "
+              f"{new_scan['total_findings']} findings, same outcome)")
+        print(f"  legacy       scan {old_scan_s:>7.2f}s  redact {old_redact_s:>7.2f}s")
+        print(f"  scanner      scan {new_scan_s:>7.2f}s  redact {new_redact_s:>7.2f}s")
+        print(f"  speedup      scan {old_scan_s / new_scan_s:>6.1f}x  redact {old_redact_s / new_redact_s:>6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
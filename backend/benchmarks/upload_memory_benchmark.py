@@ -0,0 +1,84 @@
+"""
+Upload memory benchmark: peak Python heap while receiving one file.
+
+Compares the previous upload path (`await file.read()` of the whole body, then
+hashing the bytes) with `spool_upload`, which streams the body to a temp file
+in UPLOAD_READ_CHUNK pieces while hashing incrementally. The request body is
+served from a SpooledTemporaryFile, as Starlette does for multipart uploads.
+
+    cd backend
+    python -m benchmarks.upload_memory_benchmark --sizes 10 50 200
+"""
+
+import argparse
+import asyncio
+import hashlib
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from starlette.datastructures import UploadFile
+
+from app.services.document_parsing import UPLOAD_READ_CHUNK, remove_spooled, spool_upload
+
+LINE = b"The quarterly compliance audit covers vendor payments, renewals and retention.\n"
+
+
+def make_upload(size_mb: int) -> UploadFile:
+    body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    block = LINE * (UPLOAD_READ_CHUNK // len(LINE))
+    remaining = size_mb * 1024 * 1024
+    while remaining > 0:
+        piece = block[:remaining]
+        body.write(piece)
+        remaining -= len(piece)
+    body.seek(0)
+    return UploadFile(file=body, filename=f"bench_{size_mb}mb.txt")
+
+
+async def read_all(upload: UploadFile) -> str:
+    raw_bytes = await upload.read()
+    return hashlib.sha256(raw_bytes).hexdigest()
+
+
+async def streamed(upload: UploadFile) -> str:
+    spooled = await spool_upload(upload, upload.filename)
+    remove_spooled(spooled)
+    return spooled.sha256
+
+
+def measure(fn, size_mb: int):
+    upload = make_upload(size_mb)
+    try:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        digest = asyncio.run(fn(upload))
+        seconds = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        upload.file.close()
+    return digest, peak, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload peak-memory benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200], help="upload sizes in MB")
+    args = parser.parse_args()
+
+    print(f"{'size':>8}  {'method':<10} {'peak heap':>12} {'time':>9}")
+    for size_mb in args.sizes:
+        rows = []
+        for label, fn in (("read()", read_all), ("streamed", streamed)):
+            digest, peak, seconds = measure(fn, size_mb)
+            rows.append(digest)
+            print(f"{size_mb:>6}MB  {label:<10} {peak / 1e6:>10.1f}MB {seconds:>8.2f}s")
+        if rows[0] != rows[1]:
+            print("  hash mismatch between methods!")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
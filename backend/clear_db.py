@@ -12,6 +12,9 @@ def clear_db():
         session.exec(text("DELETE FROM message"))
         print("Deleting ChatSessions...")
         session.exec(text("DELETE FROM chatsession"))
+        print("Deleting Chunk facts and anchors...")
+        session.exec(text("DELETE FROM chunkfact"))
+        session.exec(text("DELETE FROM chunkanchor"))
         print("Deleting Chunks...")
         session.exec(text("DELETE FROM chunk"))
         print("Deleting Documents...")
@@ -0,0 +1,30 @@
+"""
+Dedicated ingestion worker process.
+
+Claims jobs from the ingestionjob table (document processing, re-chunking,
+project re-indexing) so heavy work runs outside the API workers:
+
+    python ingest_worker.py --concurrency 2
+
+Set INGEST_EMBEDDED_WORKER=false on the API when running this.
+"""
+
+import argparse
+import logging
+
+from app.db import init_db
+from app.rag.ingest_jobs import INGEST_WORKER_CONCURRENCY, build_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the RAGOps ingestion worker")
+    parser.add_argument("--concurrency", type=int, default=INGEST_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_db()
+    build_worker(concurrency=args.concurrency).run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from app.services.tokenizer_service import DEFAULT_ENCODING, TokenizerService
+
+
+class DenseTailEncoder:
+    """Stand-in BPE: ASCII costs ~4 chars per token, every other character one token."""
+
+    def encode_ordinary(self, text):
+        ascii_chars = sum(1 for c in text if ord(c) < 128)
+        return [0] * ((ascii_chars + 3) // 4 + (len(text) - ascii_chars))
+
+
+def test_split_to_limit_checks_token_dense_tail():
+    tokenizer = TokenizerService()
+    tokenizer._encoders[DEFAULT_ENCODING] = DenseTailEncoder()
+    text = "word " * 400 + "字" * 300
+
+    pieces = tokenizer.split_to_limit(text, max_tokens=100)
+
+    assert all(tokenizer.count(piece) <= 100 for piece in pieces)
+    assert "".join(pieces).replace(" ", "") == text.replace(" ", "")
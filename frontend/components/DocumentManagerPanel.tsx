@@ -4,6 +4,7 @@ import { useCallback, useEffect, useState } from "react";
 import { motion } from "framer-motion";
 import {
   getDocuments,
+  getDocument,
   getDocumentStatus,
   deleteDocument,
   rechunkDocument,
@@ -66,6 +67,8 @@ export function DocumentManagerPanel({
   const [chunks, setChunks] = useState<Chunk[]>([]);
   const [chunkPage, setChunkPage] = useState(1);
   const [chunkTotalPages, setChunkTotalPages] = useState(1);
+  // chunkCursors[p - 1] is the keyset cursor ("after" chunk_index) that loads page p
+  const [chunkCursors, setChunkCursors] = useState<(number | null)[]>([null]);
   const [retrievalQuery, setRetrievalQuery] = useState("");
   const [retrievalResults, setRetrievalResults] = useState<DebugSearchResult[]>([]);
   const [rechunkTarget, setRechunkTarget] = useState<Document | null>(null);
@@ -135,10 +138,16 @@ export function DocumentManagerPanel({
   const openPreview = async (doc: Document) => {
     setPreviewDoc(doc);
     setChunkPage(1);
+    setChunkCursors([null]);
+    // The document list omits full text; fetch it for the preview tab
+    getDocument(doc.id)
+      .then((full) => setPreviewDoc((cur) => (cur && cur.id === full.id ? full : cur)))
+      .catch(() => {});
     try {
       const page = await getDocumentChunksPaged(doc.id, 1, 15);
       setChunks(page.chunks);
       setChunkTotalPages(page.pages);
+      setChunkCursors([null, page.next_cursor]);
     } catch {
       toast.error("Could not load chunks");
     }
@@ -146,10 +155,16 @@ export function DocumentManagerPanel({
 
   const loadChunkPage = async (docId: number, page: number) => {
     try {
-      const data = await getDocumentChunksPaged(docId, page, 15);
+      const after = chunkCursors[page - 1] ?? null;
+      const data = await getDocumentChunksPaged(docId, page, 15, after);
       setChunks(data.chunks);
-      setChunkPage(data.page);
+      setChunkPage(page);
       setChunkTotalPages(data.pages);
+      setChunkCursors((prev) => {
+        const next = prev.slice(0, page);
+        next[page] = data.next_cursor;
+        return next;
+      });
     } catch {
       toast.error("Chunk page failed");
     }
@@ -74,12 +74,15 @@ export interface Document {
       block_integrity: number;
       reference_completeness: number;
       chunk_count: number;
+      sampled?: boolean; // scored on a sample of a large document
+      cached?: boolean; // strategy reused from earlier documents of this type
     }>;
   } | null;
 }
 
 export interface Chunk {
   id: number;
+  chunk_index?: number | null;
   content: string;
   token_count: number;
 }
@@ -281,7 +284,7 @@ export const uploadDocument = async (projectId: number, file: File) => {
       'Content-Type': 'multipart/form-data',
     },
   });
-  return response.data as { message: string; doc_id: number; status: string };
+  return response.data as { message: string; doc_id: number; job_id: number; status: string };
 };
 
 export const getDocuments = async (projectId: number, includeInactive = false) => {
@@ -291,10 +294,28 @@ export const getDocuments = async (projectId: number, includeInactive = false) =
   return response.data;
 };
 
+export const getDocument = async (docId: number) => {
+  const response = await api.get<Document>(`/rag/ingest/documents/${docId}`);
+  return response.data;
+};
+
 export const getDocumentStatus = async (docId: number) => {
-  const response = await api.get<{ status: string; error: string | null; processed: boolean }>(
-    `/rag/ingest/documents/${docId}/status`
-  );
+  const response = await api.get<{
+    status: string;
+    error: string | null;
+    processed: boolean;
+    job: {
+      id: number;
+      type: string;
+      status: string;
+      progress: number;
+      message: string | null;
+      attempts: number;
+      max_attempts: number;
+      next_run_at: string | null;
+      error: string | null;
+    } | null;
+  }>(`/rag/ingest/documents/${docId}/status`);
   return response.data;
 };
 
@@ -311,13 +332,21 @@ export const rechunkDocument = async (docId: number, chunkSize: number, chunkOve
   return response.data as { status: string; doc_id: number };
 };
 
-export const getDocumentChunksPaged = async (docId: number, page = 1, limit = 20) => {
+export const getDocumentChunksPaged = async (
+  docId: number,
+  page = 1,
+  limit = 20,
+  after: number | null = null
+) => {
   const response = await api.get<{
     chunks: Chunk[];
     total: number;
     page: number;
     pages: number;
-  }>(`/rag/ingest/documents/${docId}/chunks`, { params: { page, limit } });
+    next_cursor: number | null;
+  }>(`/rag/ingest/documents/${docId}/chunks`, {
+    params: after === null ? { page, limit } : { page, limit, after },
+  });
   return response.data;
 };
 